@@ -0,0 +1,32 @@
+# Generated by Django 4.2.30 on 2026-10-18 03:48
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_active_user_count(apps, schema_editor):
+    Account = apps.get_model('accounts', 'Account')
+    User = apps.get_model('users', 'User')
+    users = User.objects.filter(account=OuterRef('pk'), is_active=True).order_by().values('account')
+    Account.objects.update(active_user_count=Coalesce(
+        Subquery(users.annotate(n=Count('pk')).values('n'), output_field=IntegerField()),
+        0
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_remove_account_account_id_and_more'),
+        ('users', '0010_email_outbox'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='account',
+            name='active_user_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of active users in this account'),
+        ),
+        migrations.RunPython(populate_active_user_count, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,8 @@
 from django.db import models
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.core.validators import RegexValidator
-import uuid
+from zeroqueue.ids import uuid7
 
 
 class Account(models.Model):
@@ -10,7 +12,7 @@ class Account(models.Model):
     """
     
     # Unique identifiers
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     # account_id = models.CharField(
     #     max_length=20, 
     #     unique=True,
@@ -87,6 +89,13 @@ class Account(models.Model):
         help_text='Maximum number of users allowed for this account'
     )
     
+    # Denormalized counter maintained by User.save() and the user post_delete signal
+    active_user_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text='Number of active users in this account'
+    )
+    
     # subscription_type = models.CharField(
     #     max_length=50,
     #     choices=[
@@ -116,7 +125,42 @@ class Account(models.Model):
     @property
     def user_count(self):
         """Returns the current number of users associated with this account."""
-        return self.users.filter(is_active=True).count()
+        return self.active_user_count
+    
+    @classmethod
+    def adjust_active_user_count(cls, account_id, delta, enforce_limit=False):
+        """
+        Atomically move active_user_count by ``delta``. With ``enforce_limit``
+        the increment only applies if it keeps the account within max_users,
+        so concurrent creations can't overshoot. Returns False if nothing changed.
+        """
+        queryset = cls.objects.filter(pk=account_id)
+        if enforce_limit:
+            queryset = queryset.filter(active_user_count__lte=F('max_users') - delta)
+        elif delta < 0:
+            queryset = queryset.filter(active_user_count__gte=-delta)
+        return bool(queryset.update(active_user_count=F('active_user_count') + delta))
+    
+    @classmethod
+    def actual_active_user_count(cls):
+        """Subquery expression counting active users per account."""
+        from django.contrib.auth import get_user_model
+        
+        users = get_user_model().objects.filter(
+            account=OuterRef('pk'), is_active=True
+        ).order_by().values('account')
+        return Coalesce(
+            Subquery(users.annotate(n=Count('pk')).values('n'), output_field=IntegerField()),
+            0
+        )
+    
+    @classmethod
+    def recount_active_users(cls, account_ids=None):
+        """Recompute active_user_count from the users table; returns rows updated."""
+        queryset = cls.objects.all()
+        if account_ids is not None:
+            queryset = queryset.filter(pk__in=account_ids)
+        return queryset.update(active_user_count=cls.actual_active_user_count())
     
     @property
     def can_add_users(self):
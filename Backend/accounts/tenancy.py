@@ -0,0 +1,202 @@
+"""
+Tenant resolution for API requests.
+
+TenantMiddleware attaches a lazily resolved ``request.tenant``: the account
+the requester acts for, taken from ``User.account``. Superusers act for every
+account unless they narrow themselves to one with an X-Account-Id header;
+anyone else without an account sees no tenant data at all.
+
+Viewsets mix in TenantScopedMixin and pass their base queryset through
+``scope_to_tenant()``, which adds the account filter on ``tenant_field``.
+The mixin also puts the tenant in the serializer context, where
+TenantScopedSerializerMixin limits writable related fields to the tenant and
+pins new rows to the tenant's account.
+Downstream caches key their entries with TenantCache, so each account has
+its own namespace that can be invalidated without touching the others.
+"""
+
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.functional import SimpleLazyObject
+from rest_framework import serializers
+
+ALL_TENANTS = 'all'
+ACCOUNT_HEADER = 'HTTP_X_ACCOUNT_ID'
+
+
+class Tenant:
+    """The account a request is scoped to; ``unrestricted`` means every account."""
+
+    def __init__(self, account_id=None, unrestricted=False):
+        self.account_id = account_id
+        self.unrestricted = unrestricted
+
+    def __repr__(self):
+        return f'<Tenant {ALL_TENANTS if self.unrestricted else self.account_id}>'
+
+    def filter(self, queryset, field='account'):
+        """Restrict ``queryset`` to this tenant through ``field``."""
+        if self.unrestricted:
+            return queryset
+        if self.account_id is None:
+            return queryset.none()
+        return queryset.filter(**{field: self.account_id})
+
+    def cache(self, namespace):
+        return TenantCache(None if self.unrestricted else self.account_id, namespace)
+
+
+def resolve_tenant(request):
+    """Work out the tenant for ``request`` from its authenticated user."""
+    if not settings.TENANT_SCOPING:
+        return Tenant(unrestricted=True)
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_superuser:
+        account_id = request.META.get(ACCOUNT_HEADER)
+        if account_id:
+            try:
+                return Tenant(uuid.UUID(account_id))
+            except ValueError:
+                return Tenant()
+        return Tenant(unrestricted=True)
+    if user is None or not user.is_authenticated:
+        return Tenant()
+    return Tenant(user.account_id)
+
+
+def get_tenant(request):
+    """Return ``request.tenant``, resolving it here if the middleware is not installed."""
+    tenant = getattr(request, 'tenant', None)
+    if tenant is None:
+        tenant = resolve_tenant(request)
+    return tenant
+
+
+class TenantMiddleware:
+    """
+    Attach ``request.tenant``. It is resolved on first use, so DRF token
+    authentication (which runs inside the view) is already done by then.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.tenant = SimpleLazyObject(lambda: resolve_tenant(request))
+        return self.get_response(request)
+
+
+class TenantScopedMixin:
+    """
+    Viewset mixin that limits querysets to the requester's account.
+    ``tenant_field`` is the lookup from the model to Account.
+    """
+
+    tenant_field = 'account'
+
+    @property
+    def tenant(self):
+        return get_tenant(self.request)
+
+    def scope_to_tenant(self, queryset):
+        return self.tenant.filter(queryset, self.tenant_field)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['tenant'] = self.tenant
+        return context
+
+
+class TenantScopedSerializerMixin:
+    """
+    Serializer mixin for writes under ``context['tenant']``.
+
+    ``tenant_fields`` maps related field names to the lookup from the related
+    model to Account; their querysets are limited to the tenant, so ids from
+    other accounts fail validation as "does not exist". When
+    ``tenant_account_field`` names the model's account field, rows created
+    without one get the tenant's account, and a requester with no account
+    cannot create any.
+    """
+
+    tenant_fields = {}
+    tenant_account_field = None
+
+    @property
+    def tenant(self):
+        return self.context.get('tenant')
+
+    def get_fields(self):
+        fields = super().get_fields()
+        tenant = self.tenant
+        if tenant is None or tenant.unrestricted:
+            return fields
+        for name, lookup in self.tenant_fields.items():
+            field = fields.get(name)
+            # many=True relations keep the queryset on their child
+            field = getattr(field, 'child_relation', field)
+            if getattr(field, 'queryset', None) is not None:
+                field.queryset = tenant.filter(field.queryset, lookup)
+        if self.tenant_account_field in fields:
+            # Filled in from the tenant by to_internal_value()
+            fields[self.tenant_account_field].required = False
+        return fields
+
+    def to_internal_value(self, data):
+        # Before the validators run, so unique-together checks see the account
+        attrs = super().to_internal_value(data)
+        tenant = self.tenant
+        field = self.tenant_account_field
+        if field is None or tenant is None or tenant.unrestricted or self.instance is not None:
+            return attrs
+        if tenant.account_id is None:
+            raise serializers.ValidationError({field: ['Your user is not linked to an account.']})
+        if attrs.get(field) is None:
+            from .models import Account
+            attrs[field] = Account.objects.get(pk=tenant.account_id)
+        return attrs
+
+
+class TenantCache:
+    """
+    Cache namespace for one account. Keys carry the account's version stamp,
+    so invalidate() retires every entry at once; stale entries simply expire.
+    ``account_id`` None is the cross-account namespace used by superusers.
+    """
+
+    def __init__(self, account_id, namespace):
+        self.tenant = str(account_id) if account_id else ALL_TENANTS
+        self.namespace = namespace
+
+    @property
+    def version_key(self):
+        return f'tenant:{self.tenant}:{self.namespace}:version'
+
+    def get_version(self):
+        version = cache.get(self.version_key)
+        if version is None:
+            # Restart from the clock, not 1, so an evicted stamp never comes
+            # back as a version that older entries were stored under
+            cache.add(self.version_key, time.time_ns(), timeout=None)
+            version = cache.get(self.version_key)
+        return version
+
+    def invalidate(self):
+        try:
+            cache.incr(self.version_key)
+        except ValueError:
+            # No version stored yet, so nothing can be cached under it either
+            pass
+
+    def key(self, *parts):
+        suffix = ':'.join('' if part is None else str(part) for part in parts)
+        return f'tenant:{self.tenant}:{self.namespace}:v{self.get_version()}:{suffix}'
+
+
+def invalidate_tenant(account_id, namespace):
+    """Invalidate ``namespace`` for an account and the cross-account rollup."""
+    for tenant in {account_id or None, None}:
+        TenantCache(tenant, namespace).invalidate()
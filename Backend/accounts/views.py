@@ -1,19 +1,32 @@
-from rest_framework import viewsets, permissions
+from rest_framework import viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.db.models import Q
 from .models import Account
 from .serializers import AccountSerializer, AccountListSerializer
+from roles_permissions.permissions import HasRolePermission
+from .tenancy import TenantScopedMixin
 
 
-class AccountViewSet(viewsets.ModelViewSet):
+class AccountViewSet(TenantScopedMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing company accounts.
     Provides CRUD operations for accounts.
     """
     queryset = Account.objects.all()
     serializer_class = AccountSerializer
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [HasRolePermission]
+    permission_resource = 'accounts'
+    tenant_field = 'pk'
+    required_permissions = {
+        'deactivate': 'edit_accounts',
+        'activate': 'edit_accounts',
+    }
+    
+    def get_cursor_ordering(self):
+        if self.action in ('users', 'admins'):
+            return ('last_name', 'first_name', 'id')
+        return ('account_name', 'id')
     
     def get_serializer_class(self):
         if self.action == 'list':
@@ -21,7 +34,7 @@ class AccountViewSet(viewsets.ModelViewSet):
         return AccountSerializer
     
     def get_queryset(self):
-        queryset = Account.objects.all()
+        queryset = self.scope_to_tenant(Account.objects.all())
         
         # Filter by search query
         search = self.request.query_params.get('search', None)
@@ -50,8 +63,9 @@ class AccountViewSet(viewsets.ModelViewSet):
         users = account.get_active_users()
         
         from users.serializers import UserListSerializer
-        serializer = UserListSerializer(users, many=True)
-        return Response(serializer.data)
+        page = self.paginate_queryset(users)
+        serializer = UserListSerializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
     
     @action(detail=True, methods=['get'])
     def admins(self, request, pk=None):
@@ -60,8 +74,9 @@ class AccountViewSet(viewsets.ModelViewSet):
         admins = account.get_admin_users()
         
         from users.serializers import UserListSerializer
-        serializer = UserListSerializer(admins, many=True)
-        return Response(serializer.data)
+        page = self.paginate_queryset(admins)
+        serializer = UserListSerializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
     
     @action(detail=True, methods=['post'])
     def deactivate(self, request, pk=None):
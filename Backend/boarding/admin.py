@@ -3,7 +3,8 @@ from django.utils.html import format_html
 from django.urls import reverse, path
 from django.shortcuts import render, redirect
 from django.contrib import messages
-from .models import JourneyTemplate, JourneyStep, JourneyInstance, JourneyStepInstance
+from django.db import transaction
+from .models import JourneyTemplate, JourneyStep, JourneyInstance, JourneyStepInstance, TaskInboxEntry
 
 
 class JourneyStepInline(admin.TabularInline):
@@ -256,7 +257,8 @@ class JourneyInstanceAdmin(admin.ModelAdmin):
         'template__journey_type',
         'template__department',
         'start_date',
-        'expected_completion_date'
+        'expected_completion_date',
+        'is_overdue'
     ]
     
     search_fields = [
@@ -401,7 +403,8 @@ class JourneyStepInstanceAdmin(admin.ModelAdmin):
         'status',
         'step_template__step_type',
         'due_date',
-        'completed_date'
+        'completed_date',
+        'is_overdue'
     ]
     
     search_fields = [
@@ -483,7 +486,11 @@ class JourneyStepInstanceAdmin(admin.ModelAdmin):
     
     def mark_in_progress(self, request, queryset):
         """Admin action to mark selected steps as in progress."""
-        updated = queryset.filter(status='pending').update(status='in_progress')
+        step_ids = list(queryset.filter(status='pending').values_list('pk', flat=True))
+        with transaction.atomic():
+            updated = JourneyStepInstance.objects.filter(pk__in=step_ids, status='pending').update(status='in_progress')
+            # update() skips post_save, so bring the task inbox rows in line
+            TaskInboxEntry.refresh(JourneyStepInstance.objects.filter(pk__in=step_ids))
         self.message_user(request, f"Marked {updated} steps as in progress.")
     mark_in_progress.short_description = "Mark selected steps as in progress"
     
@@ -0,0 +1,103 @@
+"""
+Dashboard analytics for boarding journeys.
+
+All counters come from a single conditional-aggregation query, and results
+are cached in each account's tenant cache namespace. Any change to
+templates, journeys or step instances bumps the account's version (see
+boarding.signals), so stale entries are never read again and simply expire.
+"""
+
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+from accounts.tenancy import TenantCache, invalidate_tenant
+
+from .models import JourneyTemplate, JourneyInstance, JourneyStepInstance
+
+CACHE_TIMEOUT = 300
+CACHE_NAMESPACE = 'analytics'
+
+
+def invalidate(account_id):
+    """Invalidate cached analytics for an account and the all-accounts rollup."""
+    invalidate_tenant(account_id, CACHE_NAMESPACE)
+
+
+def invalidate_for_journey(journey_id):
+    """Invalidate analytics for the account owning a journey."""
+    account_id = JourneyInstance.objects.filter(pk=journey_id).values_list(
+        'template__account_id', flat=True
+    ).first()
+    invalidate(account_id)
+
+
+def compute_dashboard(account_id=None, date_from=None, date_to=None, template_id=None):
+    """
+    Build the dashboard counters.
+
+    Templates are grouped by journey_type and every journey status is a
+    conditional COUNT over the joined instances, so one query yields all
+    template and journey counters regardless of how many metrics we add.
+    Date filters apply to the journeys' created_at.
+    """
+    templates = JourneyTemplate.objects.all()
+    if account_id:
+        templates = templates.filter(account_id=account_id)
+
+    journey_filter = Q()
+    if date_from:
+        journey_filter &= Q(instances__created_at__date__gte=date_from)
+    if date_to:
+        journey_filter &= Q(instances__created_at__date__lte=date_to)
+
+    status_counts = {
+        status: Count('instances', filter=journey_filter & Q(instances__status=status))
+        for status, _ in JourneyInstance.STATUS_CHOICES
+    }
+    # Read from the stored flag kept current by boarding.overdue.sweep()
+    status_counts['overdue'] = Count('instances', filter=journey_filter & Q(instances__is_overdue=True))
+    rows = templates.order_by().values('journey_type').annotate(
+        template_count=Count('pk', distinct=True),
+        **status_counts
+    )
+
+    journeys = {
+        journey_type: {status: 0 for status in status_counts}
+        for journey_type, _ in JourneyTemplate.JOURNEY_TYPE_CHOICES
+    }
+    template_counts = {journey_type: 0 for journey_type in journeys}
+    for row in rows:
+        template_counts[row['journey_type']] = row['template_count']
+        journeys[row['journey_type']] = {status: row[status] for status in status_counts}
+
+    steps_completed = None
+    if template_id:
+        steps = JourneyStepInstance.objects.filter(
+            journey__template_id=template_id, status='completed'
+        )
+        if account_id:
+            steps = steps.filter(journey__template__account_id=account_id)
+        if date_from:
+            steps = steps.filter(journey__created_at__date__gte=date_from)
+        if date_to:
+            steps = steps.filter(journey__created_at__date__lte=date_to)
+        steps_completed = steps.count()
+
+    return {
+        "onboarding_template_count": template_counts['onboarding'],
+        "offboarding_template_count": template_counts['offboarding'],
+        "completed_onboarding_journeys": journeys['onboarding']['completed'],
+        "completed_offboarding_journeys": journeys['offboarding']['completed'],
+        "steps_completed_for_template": steps_completed,
+        "journeys_by_type": journeys,
+    }
+
+
+def get_dashboard(account_id=None, date_from=None, date_to=None, template_id=None):
+    """Return dashboard counters, served from the per-account cache when fresh."""
+    key = TenantCache(account_id, CACHE_NAMESPACE).key(date_from, date_to, template_id)
+    data = cache.get(key)
+    if data is None:
+        data = compute_dashboard(account_id, date_from, date_to, template_id)
+        cache.set(key, data, CACHE_TIMEOUT)
+    return data
@@ -0,0 +1,104 @@
+"""
+Streaming CSV / NDJSON exports of journeys and their step instances.
+
+Rows are read with ``values_list()`` projections and ``iterator()``, so no
+model instances are built and only one chunk of rows is held at a time; on
+Postgres ``iterator()`` uses a server-side cursor. Each row is encoded and
+handed to StreamingHttpResponse as soon as it is read.
+"""
+
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+
+from .models import JourneyStepInstance
+
+CHUNK_SIZE = 2000
+
+# (column name, lookup) pairs
+JOURNEY_COLUMNS = [
+    ('journey_id', 'id'),
+    ('template', 'template__title'),
+    ('journey_type', 'template__journey_type'),
+    ('username', 'user__username'),
+    ('email', 'user__email'),
+    ('first_name', 'user__first_name'),
+    ('last_name', 'user__last_name'),
+    ('status', 'status'),
+    ('start_date', 'start_date'),
+    ('expected_completion_date', 'expected_completion_date'),
+    ('actual_completion_date', 'actual_completion_date'),
+    ('is_overdue', 'is_overdue'),
+    ('total_steps', 'total_steps'),
+    ('completed_steps', 'completed_steps'),
+    ('created_at', 'created_at'),
+]
+
+STEP_COLUMNS = [
+    ('journey_id', 'journey_id'),
+    ('template', 'journey__template__title'),
+    ('email', 'journey__user__email'),
+    ('journey_status', 'journey__status'),
+    ('step_order', 'step_template__order'),
+    ('step', 'step_template__title'),
+    ('step_type', 'step_template__step_type'),
+    ('status', 'status'),
+    ('assigned_to', 'assigned_to__email'),
+    ('due_date', 'due_date'),
+    ('is_overdue', 'is_overdue'),
+    ('started_date', 'started_date'),
+    ('completed_date', 'completed_date'),
+]
+
+OUTPUT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+}
+
+
+class Echo:
+    """File-like object whose write() returns the value, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(rows, columns):
+    writer = csv.writer(Echo())
+    yield writer.writerow([name for name, _ in columns])
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def iter_ndjson(rows, columns):
+    names = [name for name, _ in columns]
+    for row in rows:
+        yield json.dumps(dict(zip(names, row)), cls=DjangoJSONEncoder) + '\n'
+
+
+def iter_rows(queryset, columns, ordering):
+    return queryset.order_by(*ordering).values_list(
+        *[lookup for _, lookup in columns]
+    ).iterator(chunk_size=CHUNK_SIZE)
+
+
+def stream_export(queryset, columns, ordering, output, filename):
+    """Return a StreamingHttpResponse of ``queryset`` in the ``output`` format."""
+    content_type, extension = OUTPUT_FORMATS[output]
+    rows = iter_rows(queryset, columns, ordering)
+    encode = iter_csv if output == 'csv' else iter_ndjson
+    response = StreamingHttpResponse(encode(rows, columns), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{extension}"'
+    return response
+
+
+def export_journeys(journeys, output='csv'):
+    return stream_export(journeys, JOURNEY_COLUMNS, ('-created_at', '-id'), output, 'journeys')
+
+
+def export_steps(journeys, output='csv'):
+    """Export the step instances of every journey in ``journeys``."""
+    steps = JourneyStepInstance.objects.filter(journey_id__in=journeys.order_by().values('pk'))
+    return stream_export(steps, STEP_COLUMNS, ('journey_id', 'step_template__order', 'id'), output, 'journey_steps')
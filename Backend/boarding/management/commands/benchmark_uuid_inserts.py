@@ -0,0 +1,80 @@
+"""
+Management command to compare insert speed of random (uuid4) and
+time-ordered (uuid7) primary keys on a large table.
+
+For each key type a scratch table shaped like journey_step_instances' key is
+filled to --rows rows in batches, reporting the insert rate of each tenth of
+the run; with random keys the rate falls off as the primary key index
+outgrows the cache, with time-ordered keys it stays flat. The scratch tables
+are dropped afterwards.
+"""
+
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from zeroqueue.ids import uuid7
+
+KEY_TYPES = {
+    'uuid4': uuid.uuid4,
+    'uuid7': uuid7,
+}
+
+
+class Command(BaseCommand):
+    help = 'Benchmark bulk inserts with uuid4 vs uuid7 primary keys'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10_000_000, help='Rows inserted per key type')
+        parser.add_argument('--batch-size', type=int, default=10_000, help='Rows per INSERT batch')
+
+    def key_column(self):
+        # Same column type Django uses for UUIDField on each backend
+        return 'uuid' if connection.vendor == 'postgresql' else 'char(32)'
+
+    def handle(self, *args, **options):
+        rows, batch_size = options['rows'], options['batch_size']
+        report_every = max(batch_size, rows // 10)
+        results = {}
+
+        for name, make_key in KEY_TYPES.items():
+            table = f'uuid_benchmark_{name}'
+            with connection.cursor() as cursor:
+                cursor.execute(f'DROP TABLE IF EXISTS {table}')
+                cursor.execute(
+                    f'CREATE TABLE {table} (id {self.key_column()} NOT NULL PRIMARY KEY, '
+                    f'journey_id {self.key_column()} NOT NULL, status varchar(20) NOT NULL)'
+                )
+            encode = str if connection.vendor == 'postgresql' else (lambda key: key.hex)
+            journey_id = encode(uuid.uuid4())
+
+            self.stdout.write(f"⏱️  {name}: inserting {rows:,} rows")
+            inserted = 0
+            started = segment_started = time.perf_counter()
+            segment_rows = 0
+            try:
+                while inserted < rows:
+                    count = min(batch_size, rows - inserted)
+                    batch = [(encode(make_key()), journey_id, 'pending') for _ in range(count)]
+                    with transaction.atomic(), connection.cursor() as cursor:
+                        cursor.executemany(
+                            f'INSERT INTO {table} (id, journey_id, status) VALUES (%s, %s, %s)', batch
+                        )
+                    inserted += count
+                    segment_rows += count
+                    if segment_rows >= report_every or inserted == rows:
+                        elapsed = time.perf_counter() - segment_started
+                        self.stdout.write(f"   {inserted:>12,} rows  {segment_rows / elapsed:>10,.0f} rows/sec")
+                        segment_started, segment_rows = time.perf_counter(), 0
+                results[name] = rows / (time.perf_counter() - started)
+            finally:
+                with connection.cursor() as cursor:
+                    cursor.execute(f'DROP TABLE IF EXISTS {table}')
+
+        for name, rate in results.items():
+            self.stdout.write(f"{name:>6}: {rate:,.0f} rows/sec overall")
+        self.stdout.write(self.style.SUCCESS(
+            f"uuid7 inserts ran at {results['uuid7'] / results['uuid4']:.2f}x the uuid4 rate"
+        ))
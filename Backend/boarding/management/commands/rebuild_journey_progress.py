@@ -0,0 +1,61 @@
+"""
+Management command to rebuild the denormalized progress counters on journeys.
+
+completed_steps is maintained incrementally by JourneyStepInstance; run this
+when drift is suspected (e.g. after raw SQL fixes or bulk status updates).
+"""
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from boarding.models import JourneyInstance, JourneyStepInstance
+
+
+class Command(BaseCommand):
+    help = 'Recompute total_steps and completed_steps for journeys from their step instances'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only report journeys whose counters drifted')
+
+    def handle(self, *args, **options):
+        step_counts = JourneyStepInstance.objects.filter(
+            journey=OuterRef('pk')
+        ).order_by().values('journey')
+
+        actual_total = Coalesce(
+            Subquery(step_counts.annotate(n=Count('pk')).values('n'), output_field=IntegerField()),
+            0
+        )
+        actual_completed = Coalesce(
+            Subquery(
+                step_counts.filter(status='completed').annotate(n=Count('pk')).values('n'),
+                output_field=IntegerField()
+            ),
+            0
+        )
+
+        # Journeys that were never started have no step instances and keep total_steps=0
+        started = JourneyInstance.objects.exclude(status='not_started')
+
+        drifted = started.annotate(
+            actual_total=actual_total,
+            actual_completed=actual_completed,
+        ).exclude(
+            total_steps=F('actual_total'),
+            completed_steps=F('actual_completed'),
+        )
+        drift_count = drifted.count()
+        self.stdout.write(f"🔍 Journeys with drifted counters: {drift_count}")
+
+        if options['dry_run'] or not drift_count:
+            return
+
+        with transaction.atomic():
+            updated = started.update(
+                total_steps=actual_total,
+                completed_steps=actual_completed,
+            )
+
+        self.stdout.write(self.style.SUCCESS(f"✅ Rebuilt progress counters for {updated} journeys"))
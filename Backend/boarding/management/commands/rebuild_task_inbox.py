@@ -0,0 +1,33 @@
+"""
+Management command to rebuild the denormalized task inbox behind my_tasks.
+
+TaskInboxEntry rows are maintained by signals and by the bulk enrollment
+service; run this after raw SQL changes or queryset.update() calls on step
+instances, which bypass both.
+"""
+
+from django.core.management.base import BaseCommand
+
+from boarding.models import JourneyStepInstance, TaskInboxEntry
+
+
+class Command(BaseCommand):
+    help = 'Recreate task inbox entries from open, assigned step instances'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Only rebuild the inbox of this username')
+
+    def handle(self, *args, **options):
+        step_instances = JourneyStepInstance.objects.all()
+        inbox = TaskInboxEntry.objects.all()
+        if options['user']:
+            step_instances = step_instances.filter(assigned_to__username=options['user'])
+            inbox = inbox.filter(assignee__username=options['user'])
+
+        before = inbox.count()
+        # Entries whose step was reassigned away from the user are removed too
+        inbox.delete()
+        TaskInboxEntry.refresh(step_instances)
+        after = inbox.count()
+
+        self.stdout.write(self.style.SUCCESS(f"✅ Rebuilt task inbox: {before} entries before, {after} after"))
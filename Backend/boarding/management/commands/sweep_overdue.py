@@ -0,0 +1,29 @@
+"""
+Management command that updates the stored is_overdue flags.
+Run it from cron (at least once a day, ideally hourly so each account's
+midnight is picked up promptly), or with --loop as a long-running worker.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from boarding.overdue import sweep
+
+
+class Command(BaseCommand):
+    help = 'Flag journeys and step instances that became overdue in their account timezone, and clear stale flags'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Keep sweeping instead of exiting')
+        parser.add_argument('--interval', type=float, default=900.0, help='Seconds between sweeps with --loop')
+
+    def handle(self, *args, **options):
+        while True:
+            stats = sweep()
+            for model_name, counts in stats.items():
+                self.stdout.write(f"⏰ {model_name}: {counts['flagged']} now overdue, {counts['cleared']} cleared")
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+        self.stdout.write(self.style.SUCCESS("Done."))
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.30 on 2026-10-18 04:09
+
+from django.db import migrations, models
+import zeroqueue.ids
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('boarding', '0004_alter_journeytemplate_unique_together_and_more'),
+    ]
+
+    # The default is applied in Python, so only the migration state changes;
+    # running AlterField would make SQLite rebuild every table.
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='journeyinstance',
+                    name='id',
+                    field=models.UUIDField(default=zeroqueue.ids.uuid7, editable=False, primary_key=True, serialize=False),
+                ),
+                migrations.AlterField(
+                    model_name='journeystep',
+                    name='id',
+                    field=models.UUIDField(default=zeroqueue.ids.uuid7, editable=False, primary_key=True, serialize=False),
+                ),
+                migrations.AlterField(
+                    model_name='journeystepinstance',
+                    name='id',
+                    field=models.UUIDField(default=zeroqueue.ids.uuid7, editable=False, primary_key=True, serialize=False),
+                ),
+                migrations.AlterField(
+                    model_name='journeytemplate',
+                    name='id',
+                    field=models.UUIDField(default=zeroqueue.ids.uuid7, editable=False, primary_key=True, serialize=False),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.30 on 2026-10-18 04:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('boarding', '0005_alter_journeyinstance_id_alter_journeystep_id_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='journeyinstance',
+            index=models.Index(fields=['status', 'expected_completion_date'], name='journey_inst_status_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='journeystepinstance',
+            index=models.Index(fields=['assigned_to', 'status', 'due_date', 'id'], name='step_inst_assignee_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='journeystepinstance',
+            index=models.Index(fields=['status', 'due_date', 'id'], name='step_inst_status_due_idx'),
+        ),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 4.2.30 on 2026-10-18 04:13
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_task_inbox(apps, schema_editor):
+    JourneyStepInstance = apps.get_model('boarding', 'JourneyStepInstance')
+    TaskInboxEntry = apps.get_model('boarding', 'TaskInboxEntry')
+    open_steps = JourneyStepInstance.objects.filter(
+        assigned_to__isnull=False,
+        status__in=['pending', 'in_progress']
+    ).values_list(
+        'id', 'assigned_to_id', 'journey_id', 'journey__user_id', 'status', 'due_date',
+        'step_template__title', 'step_template__step_type', 'journey__template__title',
+        'journey__user__username', 'journey__user__first_name', 'journey__user__last_name',
+    )
+    batch = []
+    for (step_id, assignee_id, journey_id, owner_id, status, due_date, step_title,
+         step_type, template_title, username, first_name, last_name) in open_steps.iterator():
+        batch.append(TaskInboxEntry(
+            step_instance_id=step_id,
+            assignee_id=assignee_id,
+            owner_id=owner_id,
+            journey_id=journey_id,
+            step_title=step_title,
+            step_type=step_type,
+            owner_name=f"{first_name} {last_name}" if first_name and last_name else username,
+            template_title=template_title,
+            status=status,
+            due_date=due_date,
+        ))
+        if len(batch) >= 500:
+            TaskInboxEntry.objects.bulk_create(batch)
+            batch = []
+    TaskInboxEntry.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('boarding', '0006_task_inbox_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskInboxEntry',
+            fields=[
+                ('step_instance', models.OneToOneField(help_text='Step instance this entry mirrors', on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='inbox_entry', serialize=False, to='boarding.journeystepinstance')),
+                ('journey_id', models.UUIDField(help_text='Journey the step belongs to')),
+                ('step_title', models.CharField(max_length=200)),
+                ('step_type', models.CharField(max_length=50)),
+                ('owner_name', models.CharField(max_length=301)),
+                ('template_title', models.CharField(max_length=200)),
+                ('status', models.CharField(max_length=20)),
+                ('due_date', models.DateField()),
+                ('assignee', models.ForeignKey(db_index=False, help_text='User the step is assigned to', on_delete=django.db.models.deletion.CASCADE, related_name='task_inbox', to=settings.AUTH_USER_MODEL)),
+                ('owner', models.ForeignKey(help_text='User undergoing the journey', on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Task Inbox Entry',
+                'verbose_name_plural': 'Task Inbox Entries',
+                'db_table': 'task_inbox_entries',
+                'ordering': ['due_date'],
+                'indexes': [models.Index(fields=['assignee', 'due_date', 'step_instance'], name='task_inbox_assignee_due_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_task_inbox, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 4.2.30 on 2026-10-18 04:17
+
+from zoneinfo import ZoneInfo
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def flag_overdue_rows(apps, schema_editor):
+    Account = apps.get_model('accounts', 'Account')
+    JourneyInstance = apps.get_model('boarding', 'JourneyInstance')
+    JourneyStepInstance = apps.get_model('boarding', 'JourneyStepInstance')
+    TaskInboxEntry = apps.get_model('boarding', 'TaskInboxEntry')
+    now = timezone.now()
+    for timezone_name in Account.objects.order_by().values_list('timezone', flat=True).distinct():
+        today = timezone.localdate(now, ZoneInfo(timezone_name))
+        JourneyInstance.objects.filter(
+            template__account__timezone=timezone_name,
+            status__in=['not_started', 'in_progress'],
+            expected_completion_date__lt=today,
+        ).update(is_overdue=True)
+        JourneyStepInstance.objects.filter(
+            journey__template__account__timezone=timezone_name,
+            status__in=['pending', 'in_progress'],
+            due_date__lt=today,
+        ).update(is_overdue=True)
+    TaskInboxEntry.objects.filter(
+        step_instance__in=JourneyStepInstance.objects.filter(is_overdue=True).values('pk')
+    ).update(is_overdue=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_alter_account_id'),
+        ('boarding', '0007_task_inbox'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='journeyinstance',
+            name='is_overdue',
+            field=models.BooleanField(default=False, editable=False, help_text='Open and past its expected completion date (set by sweep_overdue)'),
+        ),
+        migrations.AddField(
+            model_name='journeystepinstance',
+            name='is_overdue',
+            field=models.BooleanField(default=False, editable=False, help_text='Open and past its due date (set by sweep_overdue)'),
+        ),
+        migrations.AddField(
+            model_name='taskinboxentry',
+            name='is_overdue',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddIndex(
+            model_name='journeyinstance',
+            index=models.Index(condition=models.Q(('is_overdue', True)), fields=['created_at', 'id'], name='journey_inst_overdue_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='journeystepinstance',
+            index=models.Index(condition=models.Q(('is_overdue', True)), fields=['due_date', 'id'], name='step_inst_overdue_idx'),
+        ),
+        migrations.RunPython(flag_overdue_rows, migrations.RunPython.noop),
+    ]
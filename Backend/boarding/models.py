@@ -1,10 +1,41 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.core.exceptions import ValidationError
 from django.contrib.auth import get_user_model
-import uuid
+from zeroqueue.ids import uuid7
 
 User = get_user_model()
 
+# Statuses the task inbox and overdue queries filter on (see the Meta indexes)
+OPEN_JOURNEY_STATUSES = ['not_started', 'in_progress']
+OPEN_STEP_STATUSES = ['pending', 'in_progress']
+
+
+def _count_subquery(queryset, field):
+    """Correlated COUNT(*) of ``queryset`` rows whose ``field`` is the outer pk."""
+    return Coalesce(
+        Subquery(
+            queryset.filter(**{field: OuterRef('pk')}).order_by().values(field)
+            .annotate(n=Count('pk')).values('n'),
+            output_field=IntegerField()
+        ),
+        0
+    )
+
+
+class JourneyTemplateQuerySet(models.QuerySet):
+    
+    def with_counts(self):
+        """
+        Annotate step and assigned user counts so serializers don't issue a
+        COUNT per template. Subqueries keep the two counts from multiplying.
+        """
+        return self.annotate(
+            annotated_step_count=_count_subquery(JourneyStep.objects.all(), 'template'),
+            annotated_user_count=_count_subquery(User.objects.all(), 'template'),
+        )
+
 
 class JourneyTemplate(models.Model):
     """
@@ -12,7 +43,7 @@ class JourneyTemplate(models.Model):
     Defines the structure and steps for employee boarding processes.
     """
     
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     
     # Journey type
     JOURNEY_TYPE_CHOICES = [
@@ -97,6 +128,8 @@ class JourneyTemplate(models.Model):
         help_text='User who created this template'
     )
     
+    objects = JourneyTemplateQuerySet.as_manager()
+    
     class Meta:
         db_table = 'journey_templates'
         verbose_name = 'Journey Template'
@@ -129,6 +162,14 @@ class JourneyTemplate(models.Model):
     #                 f'A default {self.journey_type} template already exists{job_title_str}.'
     #             )
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Lets search.suggest drop the template from the account it moved away from
+        if 'account_id' in field_names:
+            instance._loaded_account_id = instance.account_id
+        return instance
+    
     def save(self, *args, **kwargs):
         self.clean()
         super().save(*args, **kwargs)
@@ -136,8 +177,17 @@ class JourneyTemplate(models.Model):
     @property
     def step_count(self):
         """Return the number of steps in this template."""
+        if hasattr(self, 'annotated_step_count'):
+            return self.annotated_step_count
         return self.steps.count()
     
+    @property
+    def user_count(self):
+        """Return the number of users assigned this template."""
+        if hasattr(self, 'annotated_user_count'):
+            return self.annotated_user_count
+        return self.assigned_users.count()
+    
     def get_steps_ordered(self):
         """Get steps ordered by their order field."""
         return self.steps.all().order_by('order', 'due_days_from_start')
@@ -149,7 +199,7 @@ class JourneyStep(models.Model):
     Defines specific tasks and requirements for the boarding process.
     """
     
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     
     # Relationship to template
     template = models.ForeignKey(
@@ -304,7 +354,7 @@ class JourneyInstance(models.Model):
     Tracks the progress of an individual's boarding process.
     """
     
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     
     # Relationships
     template = models.ForeignKey(
@@ -375,6 +425,12 @@ class JourneyInstance(models.Model):
     
     # Audit fields
     created_at = models.DateTimeField(auto_now_add=True)
+    is_overdue = models.BooleanField(
+        default=False,
+        editable=False,
+        help_text='Open and past its expected completion date (set by sweep_overdue)'
+    )
+    
     updated_at = models.DateTimeField(auto_now=True)
     created_by = models.ForeignKey(
         User,
@@ -391,6 +447,16 @@ class JourneyInstance(models.Model):
         verbose_name_plural = 'Journey Instances'
         ordering = ['-created_at']
         unique_together = ['template', 'user']
+        indexes = [
+            # JourneyInstanceViewSet.overdue / ?overdue=true: open journeys past their date
+            models.Index(fields=['status', 'expected_completion_date'], name='journey_inst_status_due_idx'),
+            # overdue / ?overdue=true, newest first; partial, so only flagged rows are indexed
+            models.Index(
+                fields=['created_at', 'id'],
+                condition=models.Q(is_overdue=True),
+                name='journey_inst_overdue_idx'
+            ),
+        ]
         
     def __str__(self):
         return f"{self.user.get_full_name()} - {self.template.title}"
@@ -402,15 +468,6 @@ class JourneyInstance(models.Model):
             return 0
         return round((self.completed_steps / self.total_steps) * 100, 1)
     
-    @property
-    def is_overdue(self):
-        """Check if journey is overdue."""
-        if not self.expected_completion_date or self.status == 'completed':
-            return False
-        
-        from django.utils import timezone
-        return timezone.now().date() > self.expected_completion_date
-    
     def start_journey(self, started_by=None):
         """Start the journey and create step instances."""
         if self.status != 'not_started':
@@ -419,25 +476,42 @@ class JourneyInstance(models.Model):
         from django.utils import timezone
         from datetime import timedelta
         
-        self.status = 'in_progress'
-        self.start_date = timezone.now().date()
-        self.expected_completion_date = self.start_date + timedelta(
-            days=self.template.estimated_duration_days
-        )
-        self.total_steps = self.template.step_count
-        self.save()
+        with transaction.atomic():
+            # One fetch of the template's steps drives both total_steps and
+            # the step instances, which are written with a single bulk INSERT.
+            steps = list(self.template.get_steps_ordered())
+            
+            self.status = 'in_progress'
+            self.start_date = timezone.now().date()
+            self.expected_completion_date = self.start_date + timedelta(
+                days=self.template.estimated_duration_days
+            )
+            self.total_steps = len(steps)
+            self.save()
+            
+            JourneyStepInstance.objects.bulk_create(
+                self.build_step_instances(steps, started_by=started_by),
+                batch_size=500
+            )
+            # bulk_create sends no post_save, so fill the assignees' inboxes here
+            TaskInboxEntry.refresh_for_journeys([self.pk])
+        
+        return True
+    
+    def build_step_instances(self, steps, started_by=None):
+        """Return unsaved step instances for this journey, one per template step."""
+        from datetime import timedelta
         
-        # Create step instances
-        for step in self.template.get_steps_ordered():
-            JourneyStepInstance.objects.create(
+        return [
+            JourneyStepInstance(
                 journey=self,
                 step_template=step,
                 due_date=self.start_date + timedelta(days=step.due_days_from_start),
-                assigned_to=step.responsible_party,
+                assigned_to_id=step.responsible_party_id,
                 created_by=started_by
             )
-        
-        return True
+            for step in steps
+        ]
     
     def complete_journey(self, completed_by=None):
         """Mark journey as completed."""
@@ -449,9 +523,68 @@ class JourneyInstance(models.Model):
         self.status = 'completed'
         self.actual_completion_date = timezone.now().date()
         self.completed_steps = self.total_steps
+        self.is_overdue = False
         self.save()
         
         return True
+    
+    @classmethod
+    def apply_completed_steps_delta(cls, journey_id, delta):
+        """
+        Atomically move ``completed_steps`` by ``delta`` in the database.
+        Returns True when this update is the one that completed the journey.
+        """
+        from django.utils import timezone
+        
+        now = timezone.now()
+        if delta > 0:
+            cls.objects.filter(pk=journey_id).update(
+                completed_steps=F('completed_steps') + delta,
+                updated_at=now
+            )
+            # Only one concurrent caller can flip the status, so the row count
+            # tells us whether this completion finished the journey.
+            completed = bool(cls.objects.filter(
+                pk=journey_id,
+                status__in=['in_progress', 'on_hold'],
+                completed_steps__gte=F('total_steps')
+            ).update(
+                status='completed',
+                actual_completion_date=now.date(),
+                is_overdue=False,
+                updated_at=now
+            ))
+            if completed:
+                cls.status_changed(journey_id)
+            return completed
+        
+        cls.objects.filter(pk=journey_id, completed_steps__gte=-delta).update(
+            completed_steps=F('completed_steps') + delta,
+            updated_at=now
+        )
+        # A reopened step puts a finished journey back in progress
+        if cls.objects.filter(
+            pk=journey_id,
+            status='completed',
+            completed_steps__lt=F('total_steps')
+        ).update(
+            status='in_progress',
+            actual_completion_date=None,
+            updated_at=now
+        ):
+            cls.status_changed(journey_id)
+        return False
+    
+    @classmethod
+    def status_changed(cls, journey_id):
+        """Queryset updates send no post_save, so patch the typeahead index on commit."""
+        def update_suggestions():
+            from search import suggest
+            journey = cls.objects.filter(pk=journey_id).only('id', 'status', 'template_id').first()
+            if journey is not None:
+                suggest.journey_changed(journey)
+        
+        transaction.on_commit(update_suggestions)
 
 
 class JourneyStepInstance(models.Model):
@@ -460,7 +593,7 @@ class JourneyStepInstance(models.Model):
     Tracks the completion status of each step.
     """
     
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     
     # Relationships
     journey = models.ForeignKey(
@@ -535,6 +668,12 @@ class JourneyStepInstance(models.Model):
         help_text='User who marked this step as completed'
     )
     
+    is_overdue = models.BooleanField(
+        default=False,
+        editable=False,
+        help_text='Open and past its due date (set by sweep_overdue)'
+    )
+    
     # Audit fields
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -552,18 +691,51 @@ class JourneyStepInstance(models.Model):
         verbose_name = 'Journey Step Instance'
         verbose_name_plural = 'Journey Step Instances'
         ordering = ['journey', 'step_template__order']
+        indexes = [
+            # my_tasks: open steps for one assignee, in due_date (cursor) order
+            models.Index(fields=['assigned_to', 'status', 'due_date', 'id'], name='step_inst_assignee_due_idx'),
+            # overdue / ?overdue=true: open steps by due date
+            models.Index(fields=['status', 'due_date', 'id'], name='step_inst_status_due_idx'),
+            # overdue / ?overdue=true, in due_date (cursor) order; partial, so only flagged rows are indexed
+            models.Index(
+                fields=['due_date', 'id'],
+                condition=models.Q(is_overdue=True),
+                name='step_inst_overdue_idx'
+            ),
+        ]
         
     def __str__(self):
         return f"{self.journey.user.get_full_name()} - {self.step_template.title}"
     
-    @property
-    def is_overdue(self):
-        """Check if step is overdue."""
-        if self.status == 'completed':
-            return False
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored status so save() can keep the journey's
+        # completed_steps counter in step
+        instance._loaded_status = instance.__dict__.get('status')
+        return instance
+    
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        track_status = update_fields is None or 'status' in update_fields
+        previous = getattr(self, '_loaded_status', None)
         
-        from django.utils import timezone
-        return timezone.now().date() > self.due_date
+        # Closed steps stop being overdue right away; the sweeper handles dates
+        if track_status and self.is_overdue and self.status not in OPEN_STEP_STATUSES:
+            self.is_overdue = False
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'is_overdue'}
+        
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if track_status and (previous == 'completed') != (self.status == 'completed'):
+                if self.status == 'completed':
+                    JourneyInstance.apply_completed_steps_delta(self.journey_id, 1)
+                elif previous is not None:
+                    JourneyInstance.apply_completed_steps_delta(self.journey_id, -1)
+        
+        if track_status:
+            self._loaded_status = self.status
     
     def mark_completed(self, completed_by=None, notes=""):
         """Mark step as completed."""
@@ -572,20 +744,154 @@ class JourneyStepInstance(models.Model):
         
         from django.utils import timezone
         
+        now = timezone.now()
+        with transaction.atomic():
+            # Conditional UPDATE so two approvers can't both count this step
+            claimed = JourneyStepInstance.objects.filter(pk=self.pk).exclude(
+                status='completed'
+            ).update(
+                status='completed',
+                completed_date=now,
+                completed_by=completed_by,
+                completion_notes=notes,
+                is_overdue=False,
+                updated_at=now
+            )
+            if not claimed:
+                return False
+            TaskInboxEntry.objects.filter(step_instance_id=self.pk).delete()
+            
+            # Update journey progress in the database; completion is detected
+            # from the counter update itself
+            JourneyInstance.apply_completed_steps_delta(self.journey_id, 1)
+            
+            # Queryset updates skip post_save, so drop cached analytics here
+            from .analytics import invalidate_for_journey
+            journey_id = self.journey_id
+            transaction.on_commit(lambda: invalidate_for_journey(journey_id))
+        
         self.status = 'completed'
-        self.completed_date = timezone.now()
+        self.completed_date = now
         self.completed_by = completed_by
         self.completion_notes = notes
-        self.save()
+        self.is_overdue = False
+        self.updated_at = now
+        self._loaded_status = self.status
         
-        # Update journey progress
-        self.journey.completed_steps = self.journey.step_instances.filter(
-            status='completed'
-        ).count()
-        self.journey.save()
-        
-        # Check if journey is complete
-        if self.journey.completed_steps >= self.journey.total_steps:
-            self.journey.complete_journey(completed_by)
+        if JourneyStepInstance.journey.is_cached(self):
+            self.journey.refresh_from_db(
+                fields=['completed_steps', 'status', 'actual_completion_date', 'updated_at']
+            )
         
         return True
+
+
+class TaskInboxEntry(models.Model):
+    """
+    Denormalized copy of an open, assigned step instance for its assignee's
+    task inbox, so my_tasks is one indexed range scan with no joins.
+    
+    Rows are kept in step by boarding.signals (assignment, status and due date
+    changes, plus renames of steps, templates and journey owners) and by
+    refresh() after bulk inserts; rebuild_task_inbox recreates the table.
+    """
+    
+    step_instance = models.OneToOneField(
+        JourneyStepInstance,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='inbox_entry',
+        help_text='Step instance this entry mirrors'
+    )
+    
+    assignee = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='task_inbox',
+        db_index=False,  # Covered by task_inbox_assignee_due_idx
+        help_text='User the step is assigned to'
+    )
+    
+    owner = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+        help_text='User undergoing the journey'
+    )
+    
+    journey_id = models.UUIDField(help_text='Journey the step belongs to')
+    step_title = models.CharField(max_length=200)
+    step_type = models.CharField(max_length=50)
+    owner_name = models.CharField(max_length=301)
+    template_title = models.CharField(max_length=200)
+    status = models.CharField(max_length=20)
+    due_date = models.DateField()
+    is_overdue = models.BooleanField(default=False)
+    
+    class Meta:
+        db_table = 'task_inbox_entries'
+        verbose_name = 'Task Inbox Entry'
+        verbose_name_plural = 'Task Inbox Entries'
+        ordering = ['due_date']
+        indexes = [
+            models.Index(fields=['assignee', 'due_date', 'step_instance'], name='task_inbox_assignee_due_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.step_title} ({self.owner_name})"
+    
+    SOURCE_FIELDS = [
+        'id', 'assigned_to_id', 'journey_id', 'journey__user_id', 'status', 'due_date', 'is_overdue',
+        'step_template__title', 'step_template__step_type', 'journey__template__title',
+        'journey__user__username', 'journey__user__first_name', 'journey__user__last_name',
+    ]
+    
+    @staticmethod
+    def display_name(username, first_name, last_name):
+        """Same rule as User.get_full_name()."""
+        if first_name and last_name:
+            return f"{first_name} {last_name}"
+        return username
+    
+    @classmethod
+    def refresh(cls, step_instances, batch_size=500):
+        """
+        Recreate the entries for a queryset of step instances: open, assigned
+        steps get an entry and every other step loses its entry.
+        """
+        with transaction.atomic():
+            cls.objects.filter(step_instance__in=step_instances.values('pk')).delete()
+            open_steps = step_instances.filter(
+                assigned_to__isnull=False,
+                status__in=OPEN_STEP_STATUSES
+            ).order_by().values_list(*cls.SOURCE_FIELDS)
+            
+            batch = []
+            for (step_id, assignee_id, journey_id, owner_id, status, due_date, is_overdue, step_title,
+                 step_type, template_title, username, first_name, last_name) in open_steps.iterator():
+                batch.append(cls(
+                    step_instance_id=step_id,
+                    assignee_id=assignee_id,
+                    owner_id=owner_id,
+                    journey_id=journey_id,
+                    step_title=step_title,
+                    step_type=step_type,
+                    owner_name=cls.display_name(username, first_name, last_name),
+                    template_title=template_title,
+                    status=status,
+                    due_date=due_date,
+                    is_overdue=is_overdue,
+                ))
+                if len(batch) >= batch_size:
+                    cls.objects.bulk_create(batch)
+                    batch = []
+            cls.objects.bulk_create(batch)
+    
+    @classmethod
+    def refresh_for_journeys(cls, journey_ids, batch_size=500):
+        """Refresh the entries of every step in the given journeys."""
+        journey_ids = list(journey_ids)
+        for start in range(0, len(journey_ids), batch_size):
+            cls.refresh(JourneyStepInstance.objects.filter(
+                journey_id__in=journey_ids[start:start + batch_size]
+            ))
@@ -0,0 +1,80 @@
+"""
+Overdue detection for journeys and step instances.
+
+is_overdue is a stored, indexed flag instead of a date check run per row at
+read time. sweep() moves it with set-based UPDATEs, one pass per distinct
+account timezone so "today" is each account's local date, and sends
+boarding.signals.overdue_changed with the ids that flipped so the task
+inbox and dashboards follow changes rather than recomputing on every read.
+
+Completing a step or journey clears its flag immediately; every other
+transition (dates moving, journeys cancelled or reopened) is picked up by
+the next sweep, so run sweep_overdue at least daily.
+"""
+
+from zoneinfo import ZoneInfo
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from accounts.models import Account
+
+from .models import JourneyInstance, JourneyStepInstance, OPEN_JOURNEY_STATUSES, OPEN_STEP_STATUSES
+from .signals import overdue_changed
+
+CHUNK_SIZE = 1000
+
+# (model, date field, statuses that can be overdue, path to the account)
+SWEPT_MODELS = [
+    (JourneyInstance, 'expected_completion_date', OPEN_JOURNEY_STATUSES, 'template__account'),
+    (JourneyStepInstance, 'due_date', OPEN_STEP_STATUSES, 'journey__template__account'),
+]
+
+
+def local_today(timezone_name, now=None):
+    """The current date in ``timezone_name``."""
+    return timezone.localdate(now or timezone.now(), ZoneInfo(timezone_name))
+
+
+def flip(model, queryset, overdue, account_path):
+    """
+    Set is_overdue=``overdue`` on the rows of ``queryset``, CHUNK_SIZE at a
+    time, announcing each chunk. Returns the number of rows changed.
+    """
+    rows = queryset.order_by().values_list('pk', f'{account_path}_id')
+    changed = 0
+    while True:
+        with transaction.atomic():
+            # Updated rows drop out of ``queryset``, so each slice is fresh
+            chunk = list(rows[:CHUNK_SIZE])
+            if not chunk:
+                return changed
+            instance_ids = [pk for pk, _ in chunk]
+            model.objects.filter(pk__in=instance_ids).update(is_overdue=overdue)
+            overdue_changed.send(
+                sender=model,
+                instance_ids=instance_ids,
+                account_ids={account_id for _, account_id in chunk},
+                overdue=overdue,
+            )
+        changed += len(chunk)
+
+
+def sweep(now=None):
+    """
+    Bring every is_overdue flag up to date. Returns
+    {model name: {'flagged': n, 'cleared': n}}.
+    """
+    now = now or timezone.now()
+    timezone_names = list(Account.objects.order_by().values_list('timezone', flat=True).distinct())
+    stats = {}
+    for model, date_field, open_statuses, account_path in SWEPT_MODELS:
+        counts = {'flagged': 0, 'cleared': 0}
+        for timezone_name in timezone_names:
+            late = Q(status__in=open_statuses, **{f'{date_field}__lt': local_today(timezone_name, now)})
+            rows = model.objects.filter(**{f'{account_path}__timezone': timezone_name})
+            counts['flagged'] += flip(model, rows.filter(late, is_overdue=False), True, account_path)
+            counts['cleared'] += flip(model, rows.filter(is_overdue=True).exclude(late), False, account_path)
+        stats[model._meta.model_name] = counts
+    return stats
@@ -1,9 +1,13 @@
+from django.conf import settings
+from django.db import transaction
 from rest_framework import serializers
-from .models import JourneyTemplate, JourneyStep, JourneyInstance, JourneyStepInstance
+from accounts.tenancy import TenantScopedSerializerMixin
+from .models import JourneyTemplate, JourneyStep, JourneyInstance, JourneyStepInstance, TaskInboxEntry
 
 
-class JourneyStepSerializer(serializers.ModelSerializer):
+class JourneyStepSerializer(TenantScopedSerializerMixin, serializers.ModelSerializer):
     responsible_display = serializers.ReadOnlyField()
+    tenant_fields = {'responsible_party': 'account'}
     
     class Meta:
         model = JourneyStep
@@ -17,7 +21,9 @@ class JourneyStepSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
 
 
-class JourneyStepCreateSerializer(serializers.ModelSerializer):
+class JourneyStepCreateSerializer(TenantScopedSerializerMixin, serializers.ModelSerializer):
+    tenant_fields = {'responsible_party': 'account'}
+    
     class Meta:
         model = JourneyStep
         fields = [
@@ -32,7 +38,7 @@ class JourneyTemplateSerializer(serializers.ModelSerializer):
     steps = JourneyStepSerializer(many=True, read_only=True)
     step_count = serializers.ReadOnlyField()
     # job_title_name = serializers.CharField(source='job_title.title', read_only=True)
-    user_count = serializers.SerializerMethodField()  # <-- FIXED
+    user_count = serializers.ReadOnlyField()
 
     class Meta:
         model = JourneyTemplate
@@ -44,19 +50,12 @@ class JourneyTemplateSerializer(serializers.ModelSerializer):
             'created_at', 'updated_at', 'created_by'
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
-    def get_step_count(self, obj):
-        return obj.steps.count()
-
-    def get_user_count(self, obj):
-        # Assumes User model has a ForeignKey to JourneyTemplate as 'template'
-        return obj.assigned_users.count()
 
-    
 
 class JourneyTemplateListSerializer(serializers.ModelSerializer):
     step_count = serializers.ReadOnlyField()
     account_name = serializers.CharField(source='account.account_name', read_only=True)
-    user_count = serializers.SerializerMethodField()  # <-- FIXED
+    user_count = serializers.ReadOnlyField()
     
     class Meta:
         model = JourneyTemplate
@@ -65,12 +64,11 @@ class JourneyTemplateListSerializer(serializers.ModelSerializer):
             'estimated_duration_days', 'account_name', 'is_active',
             'is_default', 'step_count', 'created_at', 'user_count'
         ]
-    def get_user_count(self, obj):
-        # Assumes User model has a ForeignKey to JourneyTemplate as 'template'
-        return obj.assigned_users.count()
 
-class JourneyTemplateCreateSerializer(serializers.ModelSerializer):
+class JourneyTemplateCreateSerializer(TenantScopedSerializerMixin, serializers.ModelSerializer):
     steps_data = JourneyStepCreateSerializer(many=True, write_only=True, required=False)
+    tenant_fields = {'account': 'pk'}
+    tenant_account_field = 'account'
     
     class Meta:
         model = JourneyTemplate
@@ -131,15 +129,20 @@ class JourneyTemplateCreateSerializer(serializers.ModelSerializer):
             for step_data in steps_data:
                 JourneyStep.objects.create(template=instance, **step_data)
         
+        # One bump for the whole rewrite, whatever the step signals did
+        from . import template_cache
+        template_id = instance.pk
+        transaction.on_commit(lambda: template_cache.invalidate(template_id))
+        
         return instance
 
 
-class JourneyStepInstanceSerializer(serializers.ModelSerializer):
+class JourneyStepInstanceSerializer(TenantScopedSerializerMixin, serializers.ModelSerializer):
     step_title = serializers.CharField(source='step_template.title', read_only=True)
     step_type = serializers.CharField(source='step_template.step_type', read_only=True)
     assigned_to_name = serializers.CharField(source='assigned_to.get_full_name', read_only=True)
     completed_by_name = serializers.CharField(source='completed_by.get_full_name', read_only=True)
-    is_overdue = serializers.ReadOnlyField()
+    tenant_fields = {'step_template': 'template__account', 'assigned_to': 'account'}
     
     class Meta:
         model = JourneyStepInstance
@@ -152,13 +155,38 @@ class JourneyStepInstanceSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
 
 
-class JourneyInstanceSerializer(serializers.ModelSerializer):
+class TaskInboxEntrySerializer(serializers.ModelSerializer):
+    """
+    A my_tasks row, read from the denormalized task inbox. Inbox columns keep
+    the JourneyStepInstanceSerializer names (assignee as assigned_to).
+    """
+    id = serializers.UUIDField(source='step_instance_id', read_only=True)
+    assigned_to = serializers.PrimaryKeyRelatedField(source='assignee', read_only=True)
+    assigned_to_name = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = TaskInboxEntry
+        fields = [
+            'id', 'step_title', 'step_type', 'assigned_to', 'assigned_to_name',
+            'status', 'due_date', 'is_overdue', 'journey_id', 'owner',
+            'owner_name', 'template_title'
+        ]
+    
+    def get_assigned_to_name(self, obj):
+        # my_tasks rows all belong to the requester, so no join is needed
+        request = self.context.get('request')
+        if request is not None and request.user.pk == obj.assignee_id:
+            return request.user.get_full_name()
+        return obj.assignee.get_full_name()
+
+
+class JourneyInstanceSerializer(TenantScopedSerializerMixin, serializers.ModelSerializer):
     step_instances = JourneyStepInstanceSerializer(many=True, read_only=True)
     template_title = serializers.CharField(source='template.title', read_only=True)
     template_type = serializers.CharField(source='template.journey_type', read_only=True)
     user_name = serializers.CharField(source='user.get_full_name', read_only=True)
     progress_percentage = serializers.ReadOnlyField()
-    is_overdue = serializers.ReadOnlyField()
+    tenant_fields = {'template': 'account', 'user': 'account'}
     
     class Meta:
         model = JourneyInstance
@@ -177,7 +205,6 @@ class JourneyInstanceListSerializer(serializers.ModelSerializer):
     template_type = serializers.CharField(source='template.journey_type', read_only=True)
     user_name = serializers.CharField(source='user.get_full_name', read_only=True)
     progress_percentage = serializers.ReadOnlyField()
-    is_overdue = serializers.ReadOnlyField()
     
     class Meta:
         model = JourneyInstance
@@ -188,7 +215,9 @@ class JourneyInstanceListSerializer(serializers.ModelSerializer):
         ]
 
 
-class JourneyInstanceCreateSerializer(serializers.ModelSerializer):
+class JourneyInstanceCreateSerializer(TenantScopedSerializerMixin, serializers.ModelSerializer):
+    tenant_fields = {'template': 'account', 'user': 'account'}
+    
     class Meta:
         model = JourneyInstance
         fields = ['template', 'user', 'notes']
@@ -203,3 +232,18 @@ class JourneyInstanceCreateSerializer(serializers.ModelSerializer):
                 "Journey already exists for this user and template."
             )
         return data
+
+
+class JourneyBulkEnrollSerializer(TenantScopedSerializerMixin, serializers.Serializer):
+    """Input for enrolling a cohort of users in one template."""
+    template = serializers.PrimaryKeyRelatedField(queryset=JourneyTemplate.objects.all())
+    tenant_fields = {'template': 'account'}
+    user_ids = serializers.ListField(child=serializers.CharField(), allow_empty=False)
+    start = serializers.BooleanField(default=True)
+    notes = serializers.CharField(required=False, allow_blank=True, default='')
+    
+    def validate_user_ids(self, value):
+        limit = settings.BULK_ENROLLMENT_MAX_USERS
+        if len(value) > limit:
+            raise serializers.ValidationError(f"At most {limit} users can be enrolled per request.")
+        return value
@@ -0,0 +1,115 @@
+import uuid
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+
+from search import suggest
+
+from . import analytics
+from .models import JourneyInstance, JourneyStepInstance, TaskInboxEntry
+
+User = get_user_model()
+
+
+class CohortEnrollmentService:
+    """
+    Enroll a whole cohort of users in a journey template at once.
+
+    Existing (template, user) pairs are found with one query, then the new
+    journeys and their step instances are written with bulk INSERTs inside a
+    single transaction. bulk_create sends no post_save signals, so the task
+    inbox is filled and the caches those signals would have invalidated are
+    invalidated here instead.
+    """
+
+    batch_size = 500
+
+    @staticmethod
+    def parse_user_ids(raw_ids):
+        """Split raw ids into (unique UUIDs in order, ids that are not UUIDs)."""
+        user_ids, invalid, seen = [], [], set()
+        for raw_id in raw_ids:
+            try:
+                user_id = uuid.UUID(str(raw_id))
+            except ValueError:
+                invalid.append(raw_id)
+                continue
+            if user_id not in seen:
+                seen.add(user_id)
+                user_ids.append(user_id)
+        return user_ids, invalid
+
+    @classmethod
+    def enroll(cls, template, raw_user_ids, start=True, notes='', created_by=None, users=None):
+        """
+        Create journeys from ``template`` for every user in ``raw_user_ids``.
+
+        With ``start`` the journeys begin today and get their step instances,
+        as if ``start_journey`` had been called on each. ``users`` limits who
+        can be enrolled (the requester's tenant); anyone outside it is
+        reported as user_not_found. Returns a report with one result per
+        requested user id.
+        """
+        user_ids, invalid = cls.parse_user_ids(raw_user_ids)
+        if users is None:
+            users = User.objects.all()
+        known = set(users.filter(pk__in=user_ids).values_list('pk', flat=True))
+        existing = dict(JourneyInstance.objects.filter(
+            template=template, user_id__in=user_ids
+        ).values_list('user_id', 'id'))
+
+        results = [{'user_id': raw_id, 'status': 'invalid_id'} for raw_id in invalid]
+        journeys = []
+        steps = list(template.get_steps_ordered()) if start else []
+        today = timezone.now().date()
+
+        for user_id in user_ids:
+            if user_id not in known:
+                results.append({'user_id': str(user_id), 'status': 'user_not_found'})
+                continue
+            if user_id in existing:
+                results.append({
+                    'user_id': str(user_id),
+                    'status': 'already_enrolled',
+                    'journey_id': str(existing[user_id]),
+                })
+                continue
+
+            journey = JourneyInstance(
+                template=template,
+                user_id=user_id,
+                notes=notes,
+                created_by=created_by,
+            )
+            if start:
+                journey.status = 'in_progress'
+                journey.start_date = today
+                journey.expected_completion_date = today + timedelta(days=template.estimated_duration_days)
+                journey.total_steps = len(steps)
+            journeys.append(journey)
+            results.append({'user_id': str(user_id), 'status': 'created', 'journey_id': str(journey.pk)})
+
+        with transaction.atomic():
+            JourneyInstance.objects.bulk_create(journeys, batch_size=cls.batch_size)
+            if steps:
+                step_instances = []
+                for journey in journeys:
+                    step_instances.extend(journey.build_step_instances(steps, started_by=created_by))
+                    if len(step_instances) >= cls.batch_size * 10:
+                        JourneyStepInstance.objects.bulk_create(step_instances, batch_size=cls.batch_size)
+                        step_instances = []
+                JourneyStepInstance.objects.bulk_create(step_instances, batch_size=cls.batch_size)
+                TaskInboxEntry.refresh_for_journeys([journey.pk for journey in journeys])
+
+            if journeys:
+                account_id = template.account_id
+                transaction.on_commit(lambda: analytics.invalidate(account_id))
+                transaction.on_commit(lambda: suggest.invalidate_account(account_id))
+
+        summary = {'created': len(journeys), 'already_enrolled': 0, 'user_not_found': 0, 'invalid_id': len(invalid)}
+        for result in results:
+            if result['status'] in ('already_enrolled', 'user_not_found'):
+                summary[result['status']] += 1
+        return {'summary': summary, 'results': results}
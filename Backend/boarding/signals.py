@@ -0,0 +1,133 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, pre_delete
+from django.dispatch import Signal, receiver
+
+from . import analytics, template_cache
+from .models import JourneyTemplate, JourneyStep, JourneyInstance, JourneyStepInstance, TaskInboxEntry
+
+User = get_user_model()
+
+INBOX_STEP_FIELDS = {
+    'status', 'assigned_to', 'assigned_to_id', 'due_date', 'step_template', 'step_template_id', 'is_overdue'
+}
+
+# Sent by boarding.overdue.sweep() inside its transaction whenever is_overdue
+# flips, with sender=JourneyInstance or JourneyStepInstance and the arguments
+# instance_ids, account_ids and overdue (the new value).
+overdue_changed = Signal()
+
+
+@receiver(post_save, sender=JourneyTemplate)
+@receiver(post_delete, sender=JourneyTemplate)
+def template_changed(sender, instance, **kwargs):
+    """Invalidate cached analytics when a template changes."""
+    transaction.on_commit(lambda: analytics.invalidate(instance.account_id))
+
+
+@receiver(post_save, sender=JourneyInstance)
+@receiver(post_delete, sender=JourneyInstance)
+def journey_changed(sender, instance, **kwargs):
+    """Invalidate cached analytics when a journey changes."""
+    account_id = JourneyTemplate.objects.filter(pk=instance.template_id).values_list(
+        'account_id', flat=True
+    ).first()
+    transaction.on_commit(lambda: analytics.invalidate(account_id))
+
+
+@receiver(post_save, sender=JourneyStepInstance)
+def step_instance_changed(sender, instance, **kwargs):
+    """Invalidate cached analytics when a step instance changes."""
+    journey_id = instance.journey_id
+    transaction.on_commit(lambda: analytics.invalidate_for_journey(journey_id))
+
+
+@receiver(post_save, sender=JourneyStepInstance)
+def refresh_inbox_entry(sender, instance, update_fields=None, **kwargs):
+    """Mirror assignment, status and due date changes into the task inbox."""
+    if update_fields is not None and not INBOX_STEP_FIELDS & set(update_fields):
+        return
+    TaskInboxEntry.refresh(JourneyStepInstance.objects.filter(pk=instance.pk))
+
+
+@receiver(post_save, sender=JourneyStep)
+def rename_inbox_step(sender, instance, created=False, update_fields=None, **kwargs):
+    """Copy step title/type changes to the inbox entries of its instances."""
+    if created or (update_fields is not None and not {'title', 'step_type'} & set(update_fields)):
+        return
+    TaskInboxEntry.objects.filter(step_instance__step_template=instance).exclude(
+        step_title=instance.title, step_type=instance.step_type
+    ).update(step_title=instance.title, step_type=instance.step_type)
+
+
+@receiver(post_save, sender=JourneyTemplate)
+def rename_inbox_template(sender, instance, created=False, update_fields=None, **kwargs):
+    """Copy template title changes to the inbox entries of its journeys."""
+    if created or (update_fields is not None and 'title' not in update_fields):
+        return
+    TaskInboxEntry.objects.filter(step_instance__journey__template=instance).exclude(
+        template_title=instance.title
+    ).update(template_title=instance.title)
+
+
+@receiver(post_save, sender=User)
+def rename_inbox_owner(sender, instance, created=False, update_fields=None, **kwargs):
+    """Copy journey owner name changes to the inbox entries of their journeys."""
+    if created or (update_fields is not None and not {'username', 'first_name', 'last_name'} & set(update_fields)):
+        return
+    owner_name = TaskInboxEntry.display_name(instance.username, instance.first_name, instance.last_name)
+    TaskInboxEntry.objects.filter(owner=instance).exclude(owner_name=owner_name).update(owner_name=owner_name)
+
+
+@receiver(post_save, sender=JourneyTemplate)
+@receiver(post_delete, sender=JourneyTemplate)
+def template_detail_changed(sender, instance, **kwargs):
+    """Retire the cached detail payload of a changed template."""
+    transaction.on_commit(lambda: template_cache.invalidate(instance.pk))
+
+
+@receiver(post_save, sender=JourneyStep)
+@receiver(post_delete, sender=JourneyStep)
+def template_step_changed(sender, instance, **kwargs):
+    """Retire the cached detail payload of the template a step belongs to."""
+    template_id = instance.template_id
+    transaction.on_commit(lambda: template_cache.invalidate(template_id))
+
+
+@receiver(post_save, sender=User)
+def template_user_changed(sender, instance, created=False, update_fields=None, **kwargs):
+    """
+    Retire cached template payloads that show this user: the templates whose
+    user_count they moved between, and those where they are a step's
+    responsible party (responsible_display is their name).
+    """
+    previous = getattr(instance, '_loaded_template_id', None)
+    template_ids = set()
+    if created or previous != instance.template_id:
+        template_ids = {previous, instance.template_id}
+    instance._loaded_template_id = instance.template_id
+    if not created and (update_fields is None or {'first_name', 'last_name', 'username'} & set(update_fields)):
+        template_ids.update(
+            JourneyStep.objects.filter(responsible_party=instance).values_list('template_id', flat=True).distinct()
+        )
+    if template_ids:
+        transaction.on_commit(lambda: template_cache.invalidate(*template_ids))
+
+
+@receiver(pre_delete, sender=User)
+def template_user_deleted(sender, instance, **kwargs):
+    """Retire payloads of templates a deleted user counted towards or was responsible in."""
+    template_ids = set(
+        JourneyStep.objects.filter(responsible_party=instance).values_list('template_id', flat=True).distinct()
+    )
+    template_ids.add(instance.template_id)
+    transaction.on_commit(lambda: template_cache.invalidate(*template_ids))
+
+
+@receiver(overdue_changed)
+def overdue_flags_changed(sender, instance_ids, account_ids, overdue, **kwargs):
+    """Copy swept step flags into the task inbox and refresh dashboards."""
+    if sender is JourneyStepInstance:
+        TaskInboxEntry.objects.filter(step_instance_id__in=instance_ids).update(is_overdue=overdue)
+    for account_id in account_ids:
+        transaction.on_commit(lambda account_id=account_id: analytics.invalidate(account_id))
@@ -0,0 +1,135 @@
+"""
+Read-through cache of serialized journey template detail.
+
+JourneyTemplateSerializer renders every step plus the step and assigned user
+counts, so each detail GET costs several queries. The rendered payload is
+cached in two tiers keyed by template id and a version stamp:
+
+- an LRU-bounded dict in this process (TEMPLATE_CACHE_LRU_SIZE templates,
+  each kept at most TEMPLATE_CACHE_LOCAL_TTL seconds);
+- the Django cache, shared between processes (TEMPLATE_CACHE_TIMEOUT seconds).
+
+Versions live in the Django cache and are bumped after commit whenever the
+template, one of its steps, a step's responsible party or the set of users
+assigned to it changes (see boarding.signals), so stale payloads are never
+read again. That only reaches other workers when the Django cache is shared
+(CACHE_BACKEND db or redis); the local TTL bounds how long a worker can serve
+a stale template if it is not. A version that is evicted restarts from the current time in
+nanoseconds, which keeps it from reusing an older stamp.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Prefetch
+
+from .models import JourneyStep, JourneyTemplate
+from .serializers import JourneyTemplateSerializer
+
+VERSION_KEY = 'boarding:template:{}:version'
+DATA_KEY = 'boarding:template:{}:v{}'
+
+
+class TemplateDetailCache:
+    """Two-tier (process LRU, then Django cache) store of template payloads."""
+
+    def __init__(self, max_size, local_ttl):
+        self.max_size = max_size
+        self.local_ttl = local_ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.stats = {'local_hits': 0, 'shared_hits': 0, 'misses': 0, 'invalidations': 0, 'evictions': 0}
+
+    def get_version(self, template_id):
+        key = VERSION_KEY.format(template_id)
+        version = cache.get(key)
+        if version is None:
+            cache.add(key, time.time_ns(), timeout=None)
+            version = cache.get(key)
+        return version
+
+    def invalidate(self, template_id):
+        """Retire every cached payload for ``template_id``."""
+        try:
+            cache.incr(VERSION_KEY.format(template_id))
+        except ValueError:
+            # No version stored yet, so nothing can be cached under it either
+            pass
+        with self.lock:
+            self.entries.pop(str(template_id), None)
+            self.stats['invalidations'] += 1
+
+    def get(self, template_id, build):
+        """
+        Return the payload for ``template_id``, calling ``build()`` to render
+        it when neither tier holds the current version. ``build()`` returns
+        None for a missing template, which is not cached.
+        """
+        template_id = str(template_id)
+        version = self.get_version(template_id)
+        with self.lock:
+            entry = self.entries.get(template_id)
+            if entry is not None and entry[0] == version and entry[2] > time.monotonic():
+                self.entries.move_to_end(template_id)
+                self.stats['local_hits'] += 1
+                return entry[1]
+
+        key = DATA_KEY.format(template_id, version)
+        data = cache.get(key)
+        if data is None:
+            data = build()
+            if data is None:
+                return None
+            cache.set(key, data, settings.TEMPLATE_CACHE_TIMEOUT)
+            stat = 'misses'
+        else:
+            stat = 'shared_hits'
+
+        with self.lock:
+            self.stats[stat] += 1
+            self.entries[template_id] = (version, data, time.monotonic() + self.local_ttl)
+            self.entries.move_to_end(template_id)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+                self.stats['evictions'] += 1
+        return data
+
+    def metrics(self):
+        """Counters for this process since it started; other workers keep their own."""
+        with self.lock:
+            stats = dict(self.stats)
+            stats['size'] = len(self.entries)
+        stats['scope'] = 'process'
+        stats['pid'] = os.getpid()
+        stats['max_size'] = self.max_size
+        stats['local_ttl'] = self.local_ttl
+        lookups = stats['local_hits'] + stats['shared_hits'] + stats['misses']
+        stats['hit_rate'] = round((stats['local_hits'] + stats['shared_hits']) / lookups, 4) if lookups else None
+        return stats
+
+
+template_cache = TemplateDetailCache(settings.TEMPLATE_CACHE_LRU_SIZE, settings.TEMPLATE_CACHE_LOCAL_TTL)
+
+
+def get_template_data(template_id):
+    """Serialized JourneyTemplateSerializer payload for a template, or None if it doesn't exist."""
+    def build():
+        template = JourneyTemplate.objects.with_counts().prefetch_related(
+            Prefetch('steps', queryset=JourneyStep.objects.select_related('responsible_party'))
+        ).filter(pk=template_id).first()
+        if template is None:
+            return None
+        # Plain dicts so the payload pickles cleanly into the shared cache
+        return dict(JourneyTemplateSerializer(template).data)
+
+    return template_cache.get(template_id, build)
+
+
+def invalidate(*template_ids):
+    for template_id in template_ids:
+        if template_id:
+            template_cache.invalidate(template_id)
@@ -0,0 +1,35 @@
+"""
+The mark_in_progress admin action updates steps with a queryset UPDATE and
+must keep their task inbox rows in step.
+"""
+
+from unittest import mock
+
+import pytest
+from django.contrib import admin
+from django.test import RequestFactory
+
+from accounts.models import Account
+from boarding.admin import JourneyStepInstanceAdmin
+from boarding.models import JourneyInstance, JourneyStep, JourneyStepInstance, JourneyTemplate, TaskInboxEntry
+from users.models import User
+
+pytestmark = pytest.mark.django_db
+
+
+def test_mark_in_progress_updates_task_inbox():
+    account = Account.objects.create(account_name='Admin Co')
+    assignee = User.objects.create_user(username='helper', email='helper@example.com', password='helper-pass-123', account=account)
+    owner = User.objects.create_user(username='joiner', email='joiner@example.com', password='joiner-pass-123', account=account)
+    template = JourneyTemplate.objects.create(
+        account=account, journey_type='onboarding', title='Admin', estimated_duration_days=5
+    )
+    JourneyStep.objects.create(template=template, title='Badge', order=1, due_days_from_start=1, responsible_party=assignee)
+    JourneyInstance.objects.create(template=template, user=owner).start_journey()
+    assert TaskInboxEntry.objects.get(assignee=assignee).status == 'pending'
+
+    step_admin = JourneyStepInstanceAdmin(JourneyStepInstance, admin.site)
+    with mock.patch.object(step_admin, 'message_user'):
+        step_admin.mark_in_progress(RequestFactory().post('/admin/'), JourneyStepInstance.objects.all())
+
+    assert TaskInboxEntry.objects.get(assignee=assignee).status == 'in_progress'
@@ -0,0 +1,82 @@
+"""
+Cursors are client input: values that don't fit the ordering fields are an
+invalid cursor (404), not a server error.
+"""
+
+import base64
+import json
+
+import pytest
+from rest_framework.test import APIClient
+
+from accounts.models import Account
+from boarding.models import JourneyInstance, JourneyStep, JourneyTemplate
+from users.models import User
+
+pytestmark = pytest.mark.django_db
+
+
+def cursor(values, reverse=False):
+    data = json.dumps({'v': values, 'r': reverse}).encode('ascii')
+    return base64.urlsafe_b64encode(data).decode('ascii')
+
+
+@pytest.fixture
+def client():
+    admin = User.objects.create_superuser(username='cursor-admin', email='cursor-admin@example.com', password='cursor-pass-123')
+    client = APIClient()
+    client.force_authenticate(admin)
+    return client
+
+
+@pytest.mark.parametrize('values', [
+    ['not-a-date', 'nope'],
+    ['2026-01-01', 'not-a-uuid'],
+    [{'due': 'date'}, []],
+    ['2026-01-01'],
+])
+def test_malformed_cursor_values_are_rejected(client, values):
+    response = client.get('/api/boarding/step-instances/overdue/', {'cursor': cursor(values)})
+
+    assert response.status_code == 404
+    assert response.data['detail'] == 'Invalid cursor'
+
+
+def test_well_formed_cursor_is_accepted(client):
+    response = client.get('/api/boarding/step-instances/overdue/', {
+        'cursor': cursor(['2026-01-01', '01a14d5f-c876-7185-950e-b3097af00e42']),
+    })
+
+    assert response.status_code == 200
+    assert response.data['results'] == []
+
+
+@pytest.mark.parametrize('url', [
+    # ('journey_id', 'step_template__order', 'id'): a foreign key and a related path
+    '/api/boarding/step-instances/',
+    # ('due_date', 'pk') on the inbox table
+    '/api/boarding/step-instances/my_tasks/',
+])
+def test_next_links_page_through_every_row(client, url):
+    account = Account.objects.create(account_name='Paging Co')
+    owner = User.objects.create_user(username='pager', email='pager@example.com', password='pager-pass-123', account=account)
+    template = JourneyTemplate.objects.create(
+        account=account, journey_type='onboarding', title='Paging', estimated_duration_days=5
+    )
+    admin = User.objects.get(username='cursor-admin')
+    for order in (1, 2, 3):
+        JourneyStep.objects.create(
+            template=template, title=f'Step {order}', order=order, due_days_from_start=order, responsible_party=admin
+        )
+    JourneyInstance.objects.create(template=template, user=owner).start_journey()
+
+    seen = []
+    response = client.get(url, {'page_size': 1})
+    while True:
+        assert response.status_code == 200
+        seen += [row['id'] for row in response.data['results']]
+        if not response.data['next']:
+            break
+        response = client.get(response.data['next'])
+
+    assert len(seen) == len(set(seen)) == 3
@@ -0,0 +1,48 @@
+"""
+my_tasks reads the task inbox but keeps the step instance field names for
+the columns the inbox stores.
+"""
+
+import pytest
+from rest_framework.test import APIClient
+
+from accounts.models import Account
+from boarding.models import JourneyInstance, JourneyStep, JourneyTemplate
+from users.models import User
+
+pytestmark = pytest.mark.django_db
+
+
+def test_my_tasks_keeps_step_instance_field_names():
+    account = Account.objects.create(account_name='Inbox Co')
+    assignee = User.objects.create_user(
+        username='it-lead', email='it-lead@example.com', password='it-lead-pass-123',
+        first_name='Ida', last_name='Lead', account=account
+    )
+    owner = User.objects.create_user(
+        username='new-hire', email='new-hire@example.com', password='new-hire-pass-123',
+        first_name='Nia', last_name='Hire', account=account
+    )
+    template = JourneyTemplate.objects.create(
+        account=account, journey_type='onboarding', title='Engineering', estimated_duration_days=10
+    )
+    step = JourneyStep.objects.create(
+        template=template, title='Issue laptop', order=1, due_days_from_start=2, responsible_party=assignee
+    )
+    journey = JourneyInstance.objects.create(template=template, user=owner)
+    journey.start_journey()
+
+    client = APIClient()
+    client.force_authenticate(assignee)
+    response = client.get('/api/boarding/step-instances/my_tasks/')
+
+    assert response.status_code == 200
+    [task] = response.data['results']
+    assert task['id'] == str(journey.step_instances.get().pk)
+    assert task['step_title'] == 'Issue laptop'
+    assert task['step_type'] == step.step_type
+    assert task['assigned_to'] == assignee.pk
+    assert task['assigned_to_name'] == 'Ida Lead'
+    assert task['owner'] == owner.pk
+    assert task['owner_name'] == 'Nia Hire'
+    assert task['template_title'] == 'Engineering'
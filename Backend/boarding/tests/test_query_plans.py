@@ -0,0 +1,40 @@
+"""
+The task inbox and overdue endpoints depend on dedicated indexes; check the
+planner still picks them for the queries those views page through.
+"""
+
+import pytest
+
+from boarding.models import JourneyInstance, JourneyStepInstance, TaskInboxEntry
+from users.models import User
+
+# KeysetCursorPagination fetches page_size + 1 rows
+PAGE = 51
+
+pytestmark = pytest.mark.django_db
+
+
+def test_my_tasks_uses_inbox_index():
+    user = User.objects.create_user(username='inbox-user', email='inbox-user@example.com', password='inbox-pass-123')
+    # JourneyStepInstanceViewSet.my_tasks, in its ('due_date', 'pk') cursor order
+    tasks = TaskInboxEntry.objects.filter(assignee=user).order_by('due_date', 'pk')[:PAGE]
+
+    assert 'task_inbox_assignee_due_idx' in tasks.explain()
+
+
+def test_step_overdue_uses_partial_index():
+    # JourneyStepInstanceViewSet.overdue, in its ('due_date', 'id') cursor order
+    steps = JourneyStepInstance.objects.select_related(
+        'journey__user', 'journey__template', 'step_template', 'assigned_to'
+    ).filter(is_overdue=True).order_by('due_date', 'id')[:PAGE]
+
+    assert 'step_inst_overdue_idx' in steps.explain()
+
+
+def test_journey_overdue_uses_partial_index():
+    # JourneyInstanceViewSet.overdue, in its ('-created_at', '-id') cursor order
+    journeys = JourneyInstance.objects.select_related(
+        'template', 'user', 'created_by'
+    ).filter(is_overdue=True).order_by('-created_at', '-id')[:PAGE]
+
+    assert 'journey_inst_overdue_idx' in journeys.explain()
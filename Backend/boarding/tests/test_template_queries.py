@@ -0,0 +1,60 @@
+"""
+The template list must cost a fixed number of queries however many templates
+it returns: step and user counts are annotated, not counted per row.
+"""
+
+import pytest
+from rest_framework.test import APIClient
+
+from accounts.models import Account
+from boarding.models import JourneyStep, JourneyTemplate
+from users.models import User
+
+TEMPLATE_COUNT = 500
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def client():
+    admin = User.objects.create_superuser(username='query-admin', email='query-admin@example.com', password='admin-pass-123')
+    client = APIClient()
+    client.force_authenticate(admin)
+    return client
+
+
+def create_templates(count):
+    account = Account.objects.create(account_name='Query Count Co')
+    templates = JourneyTemplate.objects.bulk_create(
+        JourneyTemplate(
+            account=account,
+            journey_type='onboarding',
+            title=f'Template {index:03}',
+            estimated_duration_days=30,
+        )
+        for index in range(count)
+    )
+    JourneyStep.objects.bulk_create(
+        JourneyStep(template=template, title=f'Step {order}', order=order, due_days_from_start=order)
+        for template in templates
+        for order in (1, 2)
+    )
+    return templates
+
+
+def list_templates(client, page_size):
+    response = client.get('/api/boarding/templates/', {'page_size': page_size})
+    assert response.status_code == 200
+    return response.data['results']
+
+
+def test_list_queries_do_not_grow_with_templates(client, django_assert_num_queries):
+    create_templates(TEMPLATE_COUNT)
+    list_templates(client, 1)  # warm per-process caches (permissions, content types)
+
+    with django_assert_num_queries(1):
+        results = list_templates(client, TEMPLATE_COUNT)
+
+    assert len(results) == TEMPLATE_COUNT
+    assert {row['step_count'] for row in results} == {2}
+    assert {row['user_count'] for row in results} == {0}
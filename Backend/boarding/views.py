@@ -1,57 +1,83 @@
-from rest_framework import viewsets, permissions, status
+from rest_framework import viewsets, status
 from rest_framework.decorators import action,api_view, permission_classes
 from rest_framework.response import Response
-from django.db.models import Q, Count
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError
+from django.db.models import Count, Prefetch
 from django.shortcuts import get_object_or_404
-from .models import JourneyTemplate, JourneyStep, JourneyInstance, JourneyStepInstance
+from django.utils.dateparse import parse_date
+from . import analytics, exports, template_cache
+from .models import JourneyTemplate, JourneyStep, JourneyInstance, JourneyStepInstance, TaskInboxEntry
 from .serializers import (
     JourneyTemplateSerializer, JourneyTemplateListSerializer, JourneyTemplateCreateSerializer,
     JourneyStepSerializer, JourneyInstanceSerializer, JourneyInstanceListSerializer,
-    JourneyInstanceCreateSerializer, JourneyStepInstanceSerializer
+    JourneyInstanceCreateSerializer, JourneyStepInstanceSerializer, JourneyBulkEnrollSerializer,
+    TaskInboxEntrySerializer
 )
-from rest_framework.permissions import IsAuthenticated
+from .services import CohortEnrollmentService
+from search.backends import get_search_backend
+from roles_permissions.permissions import HasRolePermission, permission_required, scope_queryset
+from accounts.tenancy import TenantScopedMixin, get_tenant
+
+User = get_user_model()
 
 
 
 @api_view(['GET'])
-@permission_classes([IsAuthenticated])
+@permission_classes([permission_required('view_reports')])
 def analytics_dashboard(request):
-    # Total templates by type
-    onboarding_templates = JourneyTemplate.objects.filter(journey_type='onboarding').count()
-    offboarding_templates = JourneyTemplate.objects.filter(journey_type='offboarding').count()
-    
-    # Total journeys by type and status
-    completed_onboarding = JourneyInstance.objects.filter(
-        template__journey_type='onboarding', status='completed'
-    ).count()
-    completed_offboarding = JourneyInstance.objects.filter(
-        template__journey_type='offboarding', status='completed'
-    ).count()
-    
-    # Steps completed for a particular onboarding template (example: template_id from query param)
+    """
+    Dashboard counters for templates and journeys.
+    
+    Optional filters: account_id (superusers only; everyone else gets their own
+    account), date_from and date_to (YYYY-MM-DD, on journey creation date) and
+    template_id.
+    """
+    tenant = get_tenant(request)
+    if tenant.unrestricted:
+        account_id = request.query_params.get('account_id')
+    else:
+        account_id = tenant.account_id
+        if account_id is None:
+            return Response(
+                {'error': 'Your user is not linked to an account'},
+                status=status.HTTP_403_FORBIDDEN
+            )
     template_id = request.query_params.get('template_id')
-    steps_completed = None
-    if template_id:
-        steps_completed = JourneyStepInstance.objects.filter(
-            journey__template_id=template_id, status='completed'
-        ).count()
-    
-    return Response({
-        "onboarding_template_count": onboarding_templates,
-        "offboarding_template_count": offboarding_templates,
-        "completed_onboarding_journeys": completed_onboarding,
-        "completed_offboarding_journeys": completed_offboarding,
-        "steps_completed_for_template": steps_completed,
-    })
+    
+    try:
+        date_from = parse_date(request.query_params.get('date_from') or '')
+        date_to = parse_date(request.query_params.get('date_to') or '')
+    except ValueError:
+        date_from = date_to = None
+    if (request.query_params.get('date_from') and not date_from) or \
+            (request.query_params.get('date_to') and not date_to):
+        return Response(
+            {'error': 'date_from and date_to must be valid dates (YYYY-MM-DD)'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    return Response(analytics.get_dashboard(
+        account_id=account_id,
+        date_from=date_from,
+        date_to=date_to,
+        template_id=template_id
+    ))
 
-class JourneyTemplateViewSet(viewsets.ModelViewSet):
+class JourneyTemplateViewSet(TenantScopedMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing journey templates.
     Provides CRUD operations for onboarding and offboarding templates.
     """
     queryset = JourneyTemplate.objects.all()
     serializer_class = JourneyTemplateSerializer
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [HasRolePermission]
+    permission_resource = 'journeys'
+    required_permissions = {
+        'add_step': 'edit_journeys',
+        'cache_metrics': 'view_reports',
+    }
+    cursor_ordering = ('journey_type', 'title', 'id')
     
     def get_serializer_class(self):
         if self.action == 'list':
@@ -63,17 +89,20 @@ class JourneyTemplateViewSet(viewsets.ModelViewSet):
         return JourneyTemplateSerializer
     
     def get_queryset(self):
-        queryset = JourneyTemplate.objects.prefetch_related('steps')
+        if self.action == 'retrieve':
+            # Only locates the row; the payload comes from template_cache
+            return self.scope_to_tenant(JourneyTemplate.objects.all())
+        
+        queryset = self.scope_to_tenant(JourneyTemplate.objects.with_counts().select_related('account'))
+        if self.action != 'list':
+            queryset = queryset.prefetch_related(
+                Prefetch('steps', queryset=JourneyStep.objects.select_related('responsible_party'))
+            )
         
         # Filter by search query
         search = self.request.query_params.get('search', None)
         if search:
-            queryset = queryset.filter(
-                Q(title__icontains=search) |
-                Q(description__icontains=search) |
-                Q(department__icontains=search) |
-                Q(business_unit__icontains=search)
-            )
+            queryset = get_search_backend().filter(queryset, search)
         
         # Filter by journey type
         journey_type = self.request.query_params.get('journey_type', None)
@@ -107,6 +136,19 @@ class JourneyTemplateViewSet(viewsets.ModelViewSet):
         
         return queryset.order_by('journey_type',  'title')
     
+    def retrieve(self, request, *args, **kwargs):
+        """Serve the template from the versioned detail cache (boarding.template_cache)."""
+        template = self.get_object()
+        return Response(template_cache.get_template_data(template.pk))
+    
+    @action(detail=False, methods=['get'])
+    def cache_metrics(self, request):
+        """
+        Hit/miss counters of the template detail cache in the worker process
+        that answers; each worker counts separately (see 'pid').
+        """
+        return Response(template_cache.template_cache.metrics())
+    
     def create(self, request, *args, **kwargs):
         """Override create to set created_by."""
         serializer = self.get_serializer(data=request.data)
@@ -135,7 +177,7 @@ class JourneyTemplateViewSet(viewsets.ModelViewSet):
     def add_step(self, request, pk=None):
         """Add a step to this template."""
         template = self.get_object()
-        serializer = JourneyStepSerializer(data=request.data)
+        serializer = JourneyStepSerializer(data=request.data, context=self.get_serializer_context())
         
         if serializer.is_valid():
             step = serializer.save(template=template)
@@ -188,26 +230,28 @@ class JourneyTemplateViewSet(viewsets.ModelViewSet):
     def onboarding(self, request):
         """Get all onboarding templates."""
         templates = self.get_queryset().filter(journey_type='onboarding')
-        serializer = self.get_serializer(templates, many=True)
-        return Response(serializer.data)
+        page = self.paginate_queryset(templates)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
     
     @action(detail=False, methods=['get'])
     def offboarding(self, request):
         """Get all offboarding templates."""
         templates = self.get_queryset().filter(journey_type='offboarding')
-        serializer = self.get_serializer(templates, many=True)
-        return Response(serializer.data)
+        page = self.paginate_queryset(templates)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
     
     @action(detail=False, methods=['get'])
     def departments(self, request):
         """Get all departments with templates."""
-        departments = JourneyTemplate.objects.values_list('department', flat=True).distinct()
+        departments = self.scope_to_tenant(JourneyTemplate.objects.order_by()).values_list('department', flat=True).distinct()
         return Response([dept for dept in departments if dept])
     
     @action(detail=False, methods=['get'])
     def business_units(self, request):
         """Get all business units with templates."""
-        business_units = JourneyTemplate.objects.values_list('business_unit', flat=True).distinct()
+        business_units = self.scope_to_tenant(JourneyTemplate.objects.order_by()).values_list('business_unit', flat=True).distinct()
         return Response([unit for unit in business_units if unit])
     
     # @action(detail=False, methods=['get'])
@@ -234,16 +278,19 @@ class JourneyTemplateViewSet(viewsets.ModelViewSet):
         return Response(JourneyTemplateSerializer(instance).data)
 
 
-class JourneyStepViewSet(viewsets.ModelViewSet):
+class JourneyStepViewSet(TenantScopedMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing journey steps.
     """
     queryset = JourneyStep.objects.all()
     serializer_class = JourneyStepSerializer
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [HasRolePermission]
+    permission_resource = 'journeys'
+    tenant_field = 'template__account'
+    cursor_ordering = ('template_id', 'order', 'id')
     
     def get_queryset(self):
-        queryset = JourneyStep.objects.select_related('template', 'responsible_party')
+        queryset = self.scope_to_tenant(JourneyStep.objects.select_related('template', 'responsible_party'))
         
         # Filter by template
         template_id = self.request.query_params.get('template_id', None)
@@ -263,13 +310,22 @@ class JourneyStepViewSet(viewsets.ModelViewSet):
         return queryset.order_by('template', 'order')
 
 
-class JourneyInstanceViewSet(viewsets.ModelViewSet):
+class JourneyInstanceViewSet(TenantScopedMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing journey instances.
     """
     queryset = JourneyInstance.objects.all()
     serializer_class = JourneyInstanceSerializer
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [HasRolePermission]
+    permission_resource = 'journeys'
+    tenant_field = 'template__account'
+    required_permissions = {
+        'start': 'edit_journeys',
+        'complete': 'edit_journeys',
+        'export': 'export_reports',
+        'export_steps': 'export_reports',
+    }
+    cursor_ordering = ('-created_at', '-id')
     
     def get_serializer_class(self):
         if self.action == 'list':
@@ -279,7 +335,7 @@ class JourneyInstanceViewSet(viewsets.ModelViewSet):
         return JourneyInstanceSerializer
     
     def get_queryset(self):
-        queryset = JourneyInstance.objects.select_related('template', 'user', 'created_by')
+        queryset = self.scope_to_tenant(JourneyInstance.objects.select_related('template', 'user', 'created_by'))
         
         # Filter by user
         user_id = self.request.query_params.get('user_id', None)
@@ -301,17 +357,14 @@ class JourneyInstanceViewSet(viewsets.ModelViewSet):
         if journey_type:
             queryset = queryset.filter(template__journey_type=journey_type)
         
-        # Filter overdue journeys
+        # Filter overdue journeys (flag maintained by sweep_overdue)
         overdue = self.request.query_params.get('overdue', None)
         if overdue is not None:
-            from django.utils import timezone
             if overdue.lower() == 'true':
-                queryset = queryset.filter(
-                    expected_completion_date__lt=timezone.now().date(),
-                    status__in=['not_started', 'in_progress']
-                )
+                queryset = queryset.filter(is_overdue=True)
         
-        return queryset.order_by('-created_at')
+        # Role permission constraints, applied in SQL
+        return scope_queryset(self.request, self, queryset).order_by('-created_at')
     
     def create(self, request, *args, **kwargs):
         """Override create to set created_by."""
@@ -329,6 +382,37 @@ class JourneyInstanceViewSet(viewsets.ModelViewSet):
             headers=headers
         )
     
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """
+        Enroll a cohort in one template.
+        
+        Body: template, user_ids (list), start (default true) and notes.
+        Returns a summary and one result per user id: created,
+        already_enrolled, user_not_found or invalid_id.
+        """
+        serializer = JourneyBulkEnrollSerializer(data=request.data, context=self.get_serializer_context())
+        serializer.is_valid(raise_exception=True)
+        
+        try:
+            report = CohortEnrollmentService.enroll(
+                serializer.validated_data['template'],
+                serializer.validated_data['user_ids'],
+                start=serializer.validated_data['start'],
+                notes=serializer.validated_data['notes'],
+                created_by=request.user,
+                users=self.tenant.filter(User.objects.all(), 'account')
+            )
+        except IntegrityError:
+            # Another request enrolled one of these users since we checked
+            return Response(
+                {"error": "Enrollment conflicted with a concurrent change; please retry."},
+                status=status.HTTP_409_CONFLICT
+            )
+        
+        response_status = status.HTTP_201_CREATED if report['summary']['created'] else status.HTTP_200_OK
+        return Response(report, status=response_status)
+    
     @action(detail=True, methods=['post'])
     def start(self, request, pk=None):
         """Start the journey."""
@@ -361,6 +445,32 @@ class JourneyInstanceViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
     
+    def get_export_format(self):
+        output = self.request.query_params.get('output', 'csv')
+        return output if output in exports.OUTPUT_FORMATS else None
+    
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """Stream the filtered journeys as CSV (default) or NDJSON (?output=ndjson)."""
+        output = self.get_export_format()
+        if output is None:
+            return Response(
+                {"error": "output must be one of: csv, ndjson."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return exports.export_journeys(self.get_queryset(), output)
+    
+    @action(detail=False, methods=['get'])
+    def export_steps(self, request):
+        """Stream one row per step instance of the filtered journeys."""
+        output = self.get_export_format()
+        if output is None:
+            return Response(
+                {"error": "output must be one of: csv, ndjson."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return exports.export_steps(self.get_queryset(), output)
+    
     @action(detail=True, methods=['get'])
     def steps(self, request, pk=None):
         """Get all step instances for this journey."""
@@ -373,40 +483,53 @@ class JourneyInstanceViewSet(viewsets.ModelViewSet):
     def pending(self, request):
         """Get all pending journeys."""
         journeys = self.get_queryset().filter(status='not_started')
-        serializer = self.get_serializer(journeys, many=True)
-        return Response(serializer.data)
+        page = self.paginate_queryset(journeys)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
     
     @action(detail=False, methods=['get'])
     def in_progress(self, request):
         """Get all in-progress journeys."""
         journeys = self.get_queryset().filter(status='in_progress')
-        serializer = self.get_serializer(journeys, many=True)
-        return Response(serializer.data)
+        page = self.paginate_queryset(journeys)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
     
     @action(detail=False, methods=['get'])
     def overdue(self, request):
         """Get all overdue journeys."""
-        from django.utils import timezone
-        journeys = self.get_queryset().filter(
-            expected_completion_date__lt=timezone.now().date(),
-            status__in=['not_started', 'in_progress']
-        )
-        serializer = self.get_serializer(journeys, many=True)
-        return Response(serializer.data)
+        journeys = self.get_queryset().filter(is_overdue=True)
+        page = self.paginate_queryset(journeys)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
 
 
-class JourneyStepInstanceViewSet(viewsets.ModelViewSet):
+class JourneyStepInstanceViewSet(TenantScopedMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing journey step instances.
     """
     queryset = JourneyStepInstance.objects.all()
     serializer_class = JourneyStepInstanceSerializer
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [HasRolePermission]
+    permission_resource = 'journeys'
+    tenant_field = 'journey__template__account'
+    required_permissions = {
+        'complete': 'edit_journeys',
+        # A user's own task list
+        'my_tasks': None,
+    }
+    
+    def get_cursor_ordering(self):
+        if self.action == 'my_tasks':
+            return ('due_date', 'pk')
+        if self.action == 'overdue':
+            return ('due_date', 'id')
+        return ('journey_id', 'step_template__order', 'id')
     
     def get_queryset(self):
-        queryset = JourneyStepInstance.objects.select_related(
+        queryset = self.scope_to_tenant(JourneyStepInstance.objects.select_related(
             'journey__user', 'journey__template', 'step_template', 'assigned_to'
-        )
+        ))
         
         # Filter by journey
         journey_id = self.request.query_params.get('journey_id', None)
@@ -423,17 +546,14 @@ class JourneyStepInstanceViewSet(viewsets.ModelViewSet):
         if status_filter:
             queryset = queryset.filter(status=status_filter)
         
-        # Filter overdue steps
+        # Filter overdue steps (flag maintained by sweep_overdue)
         overdue = self.request.query_params.get('overdue', None)
         if overdue is not None:
-            from django.utils import timezone
             if overdue.lower() == 'true':
-                queryset = queryset.filter(
-                    due_date__lt=timezone.now().date(),
-                    status__in=['pending', 'in_progress']
-                )
+                queryset = queryset.filter(is_overdue=True)
         
-        return queryset.order_by('journey', 'step_template__order')
+        # Role permission constraints, applied in SQL
+        return scope_queryset(self.request, self, queryset).order_by('journey', 'step_template__order')
     
     @action(detail=True, methods=['post'])
     def complete(self, request, pk=None):
@@ -454,21 +574,16 @@ class JourneyStepInstanceViewSet(viewsets.ModelViewSet):
     
     @action(detail=False, methods=['get'])
     def my_tasks(self, request):
-        """Get steps assigned to current user."""
-        steps = self.get_queryset().filter(
-            assigned_to=request.user,
-            status__in=['pending', 'in_progress']
-        ).order_by('due_date')
-        serializer = self.get_serializer(steps, many=True)
-        return Response(serializer.data)
+        """Get open steps assigned to current user, from the task inbox table."""
+        tasks = TaskInboxEntry.objects.filter(assignee=request.user)
+        page = self.paginate_queryset(tasks)
+        serializer = TaskInboxEntrySerializer(page, many=True, context=self.get_serializer_context())
+        return self.get_paginated_response(serializer.data)
     
     @action(detail=False, methods=['get'])
     def overdue(self, request):
         """Get all overdue steps."""
-        from django.utils import timezone
-        steps = self.get_queryset().filter(
-            due_date__lt=timezone.now().date(),
-            status__in=['pending', 'in_progress']
-        )
-        serializer = self.get_serializer(steps, many=True)
-        return Response(serializer.data)
+        steps = self.get_queryset().filter(is_overdue=True)
+        page = self.paginate_queryset(steps)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
@@ -0,0 +1,6 @@
+from django.conf import settings
+
+
+def pytest_configure(config):
+    # Keep cache reads out of the SQL that tests count (e.g. django_assert_num_queries)
+    settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
@@ -11,4 +11,5 @@ class RolesPermissionsConfig(AppConfig):
         try:
             import roles_permissions.signals
         except ImportError:
-            pass
\ No newline at end of file
+            pass
+        import roles_permissions.checks  # noqa: F401
\ No newline at end of file
@@ -0,0 +1,37 @@
+"""
+Startup checks for the permission engine.
+
+Every process keeps its own compiled permission table and learns that a grant
+changed only through the version stamp in the default cache, so that cache
+has to be shared between processes once permissions are enforced.
+"""
+
+from django.conf import settings
+from django.core.checks import Error, Tags, Warning, register
+
+PROCESS_LOCAL_CACHES = {
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+}
+
+
+@register(Tags.caches, Tags.security)
+def check_shared_cache(app_configs, **kwargs):
+    backend = settings.CACHES.get('default', {}).get('BACKEND')
+    if backend not in PROCESS_LOCAL_CACHES:
+        return []
+    hint = 'Set CACHE_BACKEND to db or redis so every worker sees permission changes.'
+    if settings.RBAC_ENFORCE:
+        return [Error(
+            f'RBAC_ENFORCE is on but the default cache ({backend}) is not shared between processes; '
+            'revoked permissions would stay granted in other workers until they restart.',
+            hint=hint,
+            id='roles_permissions.E001',
+        )]
+    if not settings.DEBUG:
+        return [Warning(
+            f'The default cache ({backend}) is not shared between processes.',
+            hint=hint,
+            id='roles_permissions.W001',
+        )]
+    return []
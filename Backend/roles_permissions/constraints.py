@@ -0,0 +1,214 @@
+"""
+Constraint language for RolePermission.constraints.
+
+A constraint is a JSON object whose keys narrow where a granted permission
+applies; all keys must match, and a list value matches any of its items:
+
+    {"account": "own", "department": ["Engineering", "IT"], "journey_type": "onboarding"}
+
+Keys:
+    account       account UUID(s), or "own" for the user's account
+    department    department name(s), or "own" for the user's department
+    journey_type  onboarding / offboarding
+    step_type     JourneyStep.step_type value(s)
+
+compile_constraints() parses and validates a constraint once. The result
+evaluates against a model instance in Python (matches) and translates into
+a Q filter for a queryset of the same model (q), using FIELD_PATHS to find
+each key's field on that model. Keys that don't apply to a model (e.g.
+step_type on a journey) don't restrict it, but a constraint on a model
+missing from FIELD_PATHS matches nothing, so new models fail closed.
+"""
+
+import uuid
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+OWN = 'own'
+
+# Field path of each constraint key, per model label
+FIELD_PATHS = {
+    'boarding.journeyinstance': {
+        'account': 'template__account_id',
+        'department': 'user__department',
+        'journey_type': 'template__journey_type',
+    },
+    'boarding.journeystepinstance': {
+        'account': 'journey__template__account_id',
+        'department': 'journey__user__department',
+        'journey_type': 'journey__template__journey_type',
+        'step_type': 'step_template__step_type',
+    },
+    'boarding.journeystep': {
+        'account': 'template__account_id',
+        'department': 'template__department',
+        'journey_type': 'template__journey_type',
+        'step_type': 'step_type',
+    },
+    'boarding.journeytemplate': {
+        'account': 'account_id',
+        'department': 'department',
+        'journey_type': 'journey_type',
+    },
+    'users.user': {
+        'account': 'account_id',
+        'department': 'department',
+    },
+    'users.useraccount': {
+        'account': 'account_id',
+        'department': 'user__department',
+    },
+    'accounts.account': {
+        'account': 'pk',
+    },
+}
+
+# Keys whose "own" value comes from the user, and the user attribute it reads
+OWN_VALUES = {
+    'account': 'account_id',
+    'department': 'department',
+}
+
+JOURNEY_TYPES = {'onboarding', 'offboarding'}
+
+
+def _resolve(obj, path):
+    """Follow a field path like 'journey__template__account_id' on an instance."""
+    for attribute in path.split('__'):
+        if obj is None:
+            return None
+        obj = getattr(obj, attribute)
+    return obj
+
+
+class Term:
+    """One constraint key: the field must hold one of ``values``."""
+
+    def __init__(self, key, values):
+        self.key = key
+        self.own = OWN in values
+        self.values = frozenset(str(value) for value in values if value != OWN)
+
+    def allowed(self, user):
+        if not self.own:
+            return self.values
+        own_value = getattr(user, OWN_VALUES[self.key], None)
+        if own_value is None:
+            return self.values
+        return self.values | {str(own_value)}
+
+    def matches(self, user, obj, path):
+        value = _resolve(obj, path)
+        return value is not None and str(value) in self.allowed(user)
+
+    def q(self, user, path):
+        return Q(**{f'{path}__in': sorted(self.allowed(user))})
+
+
+class CompiledConstraint:
+    """A parsed constraint object: every term must match."""
+
+    def __init__(self, terms):
+        self.terms = terms
+
+    def _paths(self, model):
+        """(term, field path) pairs for ``model``, or None if it has no mapping."""
+        paths = FIELD_PATHS.get(model._meta.label_lower)
+        if paths is None:
+            return None
+        return [(term, paths[term.key]) for term in self.terms if term.key in paths]
+
+    def matches(self, user, obj):
+        paths = self._paths(type(obj))
+        if paths is None:
+            return False
+        return all(term.matches(user, obj, path) for term, path in paths)
+
+    def allows(self, user, values):
+        """Whether ``values`` (constraint key -> value) pass; keys not given don't restrict."""
+        return all(str(values[term.key]) in term.allowed(user) for term in self.terms if term.key in values)
+
+    def q(self, user, model):
+        paths = self._paths(model)
+        if paths is None:
+            return Q(pk__in=[])
+        condition = Q()
+        for term, path in paths:
+            condition &= term.q(user, path)
+        return condition
+
+
+def compile_constraints(constraints):
+    """
+    Validate a constraints object and compile it, or return None when it is
+    empty (an unconstrained grant). Raises ValidationError on bad input.
+    """
+    if not constraints:
+        return None
+    if not isinstance(constraints, dict):
+        raise ValidationError('Constraints must be a JSON object.')
+
+    terms = []
+    for key, value in constraints.items():
+        if key not in ('account', 'department', 'journey_type', 'step_type'):
+            raise ValidationError(f"Unknown constraint '{key}'.")
+        values = value if isinstance(value, list) else [value]
+        if not values or not all(isinstance(item, str) and item for item in values):
+            raise ValidationError(f"Constraint '{key}' must be a non-empty string or list of strings.")
+        if OWN in values and key not in OWN_VALUES:
+            raise ValidationError(f"Constraint '{key}' does not support \"{OWN}\".")
+        if key == 'journey_type' and not set(values) <= JOURNEY_TYPES:
+            raise ValidationError(f"journey_type must be one of {', '.join(sorted(JOURNEY_TYPES))}.")
+        if key == 'account':
+            # Canonical form, so matches() (string compare) agrees with q() (SQL)
+            try:
+                values = [item if item == OWN else str(uuid.UUID(item)) for item in values]
+            except ValueError:
+                raise ValidationError('account must be an account id (UUID) or "own".')
+        terms.append(Term(key, values))
+    return CompiledConstraint(terms)
+
+
+class Scope:
+    """
+    Where a user may use one permission: unrestricted (constraints is None),
+    nowhere (an empty list), or wherever any of the compiled constraints match.
+    """
+
+    def __init__(self, constraints=None):
+        self.constraints = constraints
+
+    @property
+    def unrestricted(self):
+        return self.constraints is None
+
+    def matches(self, user, obj):
+        if self.constraints is None:
+            return True
+        return any(constraint.matches(user, obj) for constraint in self.constraints)
+
+    def q(self, user, model):
+        if self.constraints is None:
+            return Q()
+        if not self.constraints:
+            return Q(pk__in=[])
+        conditions = [constraint.q(user, model) for constraint in self.constraints]
+        # A constraint with no terms for this model doesn't restrict it
+        if not all(conditions):
+            return Q()
+        condition = conditions[0]
+        for other in conditions[1:]:
+            condition |= other
+        return condition
+
+    def filter(self, queryset, user):
+        if self.constraints is None:
+            return queryset
+        if not self.constraints:
+            return queryset.none()
+        return queryset.filter(self.q(user, queryset.model))
+
+
+UNRESTRICTED = Scope()
+NOWHERE = Scope([])
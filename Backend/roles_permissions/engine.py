@@ -0,0 +1,194 @@
+"""
+Compiled permission table for authorization checks.
+
+The grant graph is small, so each process loads it whole: the active
+permission codenames granted and denied by each active role, and the custom
+permissions granted directly to each user, as frozensets, plus each role grant's
+constraints compiled once (roles_permissions.constraints). A check is then a
+set lookup against the table; the only I/O is reading the version stamp once
+per request, which is a SQL query with CACHE_BACKEND=db (prefer redis where
+that matters). Saving or deleting a Permission, Role or RolePermission, or
+changing a user's custom permissions, bumps a version stamp in the shared
+Django cache (see roles_permissions.signals; roles_permissions.checks refuses
+a per-process cache); a process holding an older table rebuilds it on its
+next check. Within one request the user's merged
+codenames are computed once and kept on the request.
+"""
+
+import logging
+import threading
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+
+from .constraints import NOWHERE, UNRESTRICTED, Scope, compile_constraints
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = 'roles_permissions:engine:version'
+EMPTY = frozenset()
+
+
+class PermissionTable:
+    """
+    Role id -> granted codenames, role id -> denied codenames, user id ->
+    custom codenames and (role id, codename) -> compiled constraint for
+    constrained role grants.
+    """
+
+    def __init__(self, roles, users, constraints=None, version=None, denied=None):
+        self.roles = roles
+        self.users = users
+        self.denied = denied or {}
+        self.constraints = constraints or {}
+        self.version = version
+
+    @classmethod
+    def load(cls, version=None):
+        from .models import RolePermission
+
+        roles = {}
+        denied = {}
+        constraints = {}
+        for role_id, codename, is_granted, raw_constraints in RolePermission.objects.filter(
+            role__is_active=True, permission__is_active=True
+        ).values_list('role_id', 'permission__codename', 'is_granted', 'constraints'):
+            if not is_granted:
+                denied.setdefault(role_id, set()).add(codename)
+                continue
+            try:
+                compiled = compile_constraints(raw_constraints)
+            except ValidationError as e:
+                # Unreadable constraints grant nothing rather than everything,
+                # so the codename is left out of the role altogether
+                logger.warning(
+                    'Ignoring grant of %s to role %s: invalid constraints %r (%s)',
+                    codename, role_id, raw_constraints, '; '.join(e.messages)
+                )
+                continue
+            roles.setdefault(role_id, set()).add(codename)
+            if compiled is not None:
+                constraints[(role_id, codename)] = compiled
+
+        users = {}
+        through = get_user_model().custom_permissions.through
+        for user_id, codename in through.objects.filter(
+            permission__is_active=True
+        ).values_list('user_id', 'permission__codename'):
+            users.setdefault(user_id, set()).add(codename)
+
+        return cls(
+            {role_id: frozenset(codenames) for role_id, codenames in roles.items()},
+            {user_id: frozenset(codenames) for user_id, codenames in users.items()},
+            constraints,
+            version,
+            {role_id: frozenset(codenames) for role_id, codenames in denied.items()}
+        )
+
+    def role_permissions(self, role_id):
+        return self.roles.get(role_id, EMPTY)
+
+    def user_permissions(self, user):
+        """
+        Codenames from the user's role merged with their custom permissions,
+        minus the codenames their role denies (as in UserEffectivePermission).
+        """
+        if not user.is_active:
+            return EMPTY
+        granted = self.roles.get(user.role_id, EMPTY)
+        custom = self.users.get(user.pk)
+        if custom:
+            return (granted | custom) - self.denied.get(user.role_id, EMPTY)
+        return granted
+
+    def scope(self, user, codename):
+        """
+        Scope of ``codename`` for ``user``: unrestricted for custom grants and
+        unconstrained role grants, else the role grant's compiled constraint.
+        """
+        if codename not in self.user_permissions(user):
+            return NOWHERE
+        if codename in self.users.get(user.pk, EMPTY):
+            return UNRESTRICTED
+        compiled = self.constraints.get((user.role_id, codename))
+        if compiled is None:
+            return UNRESTRICTED
+        return Scope([compiled])
+
+
+_table = None
+_lock = threading.Lock()
+
+
+def get_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        # Restart from the clock, not 1, so an evicted stamp never comes back
+        # as a value an older table was built against
+        cache.add(VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def invalidate():
+    """Mark every process's permission table stale."""
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        # No version stored yet, so no table was built against one either
+        pass
+
+
+def permission_table():
+    """Return this process's table, rebuilding it when the version moved."""
+    global _table
+    version = get_version()
+    table = _table
+    if table is None or table.version != version:
+        with _lock:
+            if _table is None or _table.version != version:
+                _table = PermissionTable.load(version)
+            table = _table
+    return table
+
+
+def user_permissions(user, request=None):
+    """
+    Frozenset of the user's codenames. With ``request`` the result is
+    memoized on it, so a request pays for at most one version check.
+    """
+    if request is not None:
+        codenames = getattr(request, '_permission_codenames', None)
+        if codenames is not None:
+            return codenames
+    codenames = permission_table().user_permissions(user)
+    if request is not None:
+        request._permission_codenames = codenames
+    return codenames
+
+
+def permission_scope(user, codename, request=None):
+    """The constraints.Scope where ``user`` may use ``codename``."""
+    if not user or not user.is_authenticated:
+        return NOWHERE
+    if user.is_superuser:
+        return UNRESTRICTED
+    if request is not None:
+        scopes = getattr(request, '_permission_scopes', None)
+        if scopes is None:
+            scopes = request._permission_scopes = {}
+        if codename not in scopes:
+            scopes[codename] = permission_table().scope(user, codename)
+        return scopes[codename]
+    return permission_table().scope(user, codename)
+
+
+def has_permission(user, codename, request=None):
+    """True if ``user`` holds ``codename``; superusers hold every codename."""
+    if not user or not user.is_authenticated:
+        return False
+    if user.is_superuser:
+        return True
+    return codename in user_permissions(user, request)
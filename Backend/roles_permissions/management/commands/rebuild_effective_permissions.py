@@ -0,0 +1,27 @@
+"""
+Management command to rebuild the materialized user_effective_permissions table.
+
+Rows are kept current by roles_permissions.signals; run this after bulk
+imports, raw SQL or queryset.update() calls on users, roles or grants,
+which bypass the signals.
+"""
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from roles_permissions.models import UserEffectivePermission
+
+
+class Command(BaseCommand):
+    help = 'Recompute effective permissions (role grants + custom permissions - role denies) for every user'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Users recomputed per transaction')
+
+    def handle(self, *args, **options):
+        before = UserEffectivePermission.objects.count()
+        user_ids = get_user_model().objects.order_by('pk').values_list('pk', flat=True)
+        UserEffectivePermission.refresh_users(user_ids.iterator(), batch_size=options['batch_size'])
+        after = UserEffectivePermission.objects.count()
+
+        self.stdout.write(self.style.SUCCESS(f"✅ Rebuilt effective permissions: {before} rows before, {after} after"))
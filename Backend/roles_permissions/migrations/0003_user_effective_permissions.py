@@ -0,0 +1,73 @@
+# Generated by Django 4.2.30 on 2026-10-18 04:22
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import zeroqueue.ids
+
+
+def backfill_effective_permissions(apps, schema_editor):
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    RolePermission = apps.get_model('roles_permissions', 'RolePermission')
+    UserEffectivePermission = apps.get_model('roles_permissions', 'UserEffectivePermission')
+
+    granted, denied = {}, {}
+    for role_id, permission_id, codename, is_granted, constraints in RolePermission.objects.filter(
+        role__is_active=True, permission__is_active=True
+    ).values_list('role_id', 'permission_id', 'permission__codename', 'is_granted', 'constraints'):
+        if is_granted:
+            granted.setdefault(role_id, []).append((permission_id, codename, constraints or {}))
+        else:
+            denied.setdefault(role_id, set()).add(permission_id)
+    custom = {}
+    for user_id, permission_id, codename in User.custom_permissions.through.objects.filter(
+        permission__is_active=True
+    ).values_list('user_id', 'permission_id', 'permission__codename'):
+        custom.setdefault(user_id, []).append((permission_id, codename))
+
+    rows = []
+    for user_id, role_id, account_id in User.objects.filter(is_active=True).values_list('pk', 'role_id', 'account_id'):
+        entries = {permission_id: (codename, 'role', constraints) for permission_id, codename, constraints in granted.get(role_id, [])}
+        entries.update({permission_id: (codename, 'custom', {}) for permission_id, codename in custom.get(user_id, [])})
+        for permission_id in denied.get(role_id, ()):
+            entries.pop(permission_id, None)
+        rows.extend(
+            UserEffectivePermission(
+                id=zeroqueue.ids.uuid7(), user_id=user_id, permission_id=permission_id, account_id=account_id,
+                codename=codename, source=source, constraints=constraints
+            )
+            for permission_id, (codename, source, constraints) in entries.items()
+        )
+    UserEffectivePermission.objects.bulk_create(rows, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('accounts', '0004_alter_account_id'),
+        ('roles_permissions', '0002_alter_permission_id_alter_role_id_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserEffectivePermission',
+            fields=[
+                ('id', models.UUIDField(default=zeroqueue.ids.uuid7, editable=False, primary_key=True, serialize=False)),
+                ('codename', models.CharField(max_length=100)),
+                ('source', models.CharField(choices=[('role', 'Role'), ('custom', 'Custom')], help_text='Custom when granted directly to the user, even if the role also grants it', max_length=10)),
+                ('constraints', models.JSONField(blank=True, default=dict, help_text='Constraints of the role grant (custom grants are unconstrained)')),
+                ('account', models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='accounts.account')),
+                ('permission', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='effective_grants', to='roles_permissions.permission')),
+                ('user', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='effective_permissions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'User Effective Permission',
+                'verbose_name_plural': 'User Effective Permissions',
+                'db_table': 'user_effective_permissions',
+                'indexes': [models.Index(fields=['account', 'codename', 'user'], name='user_eff_perm_account_idx')],
+                'unique_together': {('user', 'permission')},
+            },
+        ),
+        migrations.RunPython(backfill_effective_permissions, migrations.RunPython.noop),
+    ]
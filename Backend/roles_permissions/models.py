@@ -1,6 +1,7 @@
-from django.db import models
+from django.conf import settings
+from django.db import models, transaction
 from django.core.exceptions import ValidationError
-import uuid
+from zeroqueue.ids import uuid7
 
 
 class Permission(models.Model):
@@ -9,7 +10,7 @@ class Permission(models.Model):
     Permissions are granular and can be combined to create flexible access control.
     """
     
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     
     # Permission identification
     name = models.CharField(
@@ -95,7 +96,7 @@ class Role(models.Model):
     Roles contain a collection of permissions and define user access levels.
     """
     
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     
     # Role identification
     name = models.CharField(
@@ -180,11 +181,9 @@ class Role(models.Model):
         super().save(*args, **kwargs)
     
     def has_permission(self, permission_codename):
-        """Check if this role has a specific permission."""
-        return self.rolepermission_set.filter(
-            permission__codename=permission_codename,
-            is_granted=True
-        ).exists()
+        """Check if this role has a specific permission (compiled table, no query)."""
+        from .engine import permission_table
+        return permission_codename in permission_table().role_permissions(self.pk)
     
     def get_permissions_by_category(self):
         """Get permissions grouped by category."""
@@ -206,7 +205,7 @@ class RolePermission(models.Model):
     Allows for granted/denied permissions and additional constraints.
     """
     
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     
     role = models.ForeignKey(Role, on_delete=models.CASCADE)
     permission = models.ForeignKey(Permission, on_delete=models.CASCADE)
@@ -237,4 +236,172 @@ class RolePermission(models.Model):
         
     def __str__(self):
         status = "✓" if self.is_granted else "✗"
-        return f"{self.role.name} - {self.permission.name} {status}"
\ No newline at end of file
+        return f"{self.role.name} - {self.permission.name} {status}"
+    
+    def clean(self):
+        from .constraints import compile_constraints
+        try:
+            compile_constraints(self.constraints)
+        except ValidationError as e:
+            raise ValidationError({'constraints': e.messages})
+    
+    def save(self, *args, **kwargs):
+        self.clean()
+        super().save(*args, **kwargs)
+
+
+class UserEffectivePermission(models.Model):
+    """
+    Materialized effective permissions: one row per (user, permission) the
+    user holds, i.e. their role's grants plus their custom permissions, minus
+    the permissions their role denies. The account and codename are copied
+    in so "who holds X in account Y" is a single index lookup.
+    
+    Rows are refreshed per user by roles_permissions.signals whenever a role,
+    role permission, permission, user role/account or custom permission
+    changes; rebuild_effective_permissions recreates the table.
+    """
+    
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
+    
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='effective_permissions',
+        db_index=False  # Covered by the unique (user, permission) index
+    )
+    permission = models.ForeignKey(
+        Permission,
+        on_delete=models.CASCADE,
+        related_name='effective_grants'
+    )
+    account = models.ForeignKey(
+        'accounts.Account',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='+',
+        db_index=False  # Covered by user_eff_perm_account_idx
+    )
+    codename = models.CharField(max_length=100)
+    
+    SOURCE_CHOICES = [
+        ('role', 'Role'),
+        ('custom', 'Custom'),
+    ]
+    
+    source = models.CharField(
+        max_length=10,
+        choices=SOURCE_CHOICES,
+        help_text='Custom when granted directly to the user, even if the role also grants it'
+    )
+    
+    constraints = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text='Constraints of the role grant (custom grants are unconstrained)'
+    )
+    
+    class Meta:
+        db_table = 'user_effective_permissions'
+        verbose_name = 'User Effective Permission'
+        verbose_name_plural = 'User Effective Permissions'
+        unique_together = ['user', 'permission']
+        indexes = [
+            # "Who can <codename> in account X"
+            models.Index(fields=['account', 'codename', 'user'], name='user_eff_perm_account_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.user_id} - {self.codename} ({self.source})"
+    
+    @classmethod
+    def users_with(cls, codename, account=None, **target):
+        """
+        Users holding ``codename``, optionally within one account.
+        
+        ``target`` names what the permission would be used on, by constraint
+        key (journey_type='offboarding', department=..., step_type=...);
+        holders whose grant constraints rule it out are left out, as are
+        holders constrained to other accounts when ``account`` is given.
+        Constraint keys not in ``target`` don't narrow the result.
+        """
+        from types import SimpleNamespace
+        from django.contrib.auth import get_user_model
+        from django.core.exceptions import ValidationError
+        from .constraints import compile_constraints
+        
+        User = get_user_model()
+        holders = cls.objects.filter(codename=codename)
+        if account is not None:
+            holders = holders.filter(account=account)
+            target['account'] = account
+        target = {key: str(value) for key, value in target.items() if value is not None}
+        if not target:
+            return User.objects.filter(pk__in=holders.values('user_id'))
+        
+        user_ids = []
+        for user_id, constraints, account_id, department in holders.values_list(
+            'user_id', 'constraints', 'user__account_id', 'user__department'
+        ).iterator():
+            try:
+                compiled = compile_constraints(constraints)
+            except ValidationError:
+                # The engine grants nothing for an invalid constraint either
+                continue
+            holder = SimpleNamespace(account_id=account_id, department=department)
+            if compiled is None or compiled.allows(holder, target):
+                user_ids.append(user_id)
+        return User.objects.filter(pk__in=user_ids)
+    
+    @classmethod
+    def refresh_users(cls, user_ids, batch_size=500):
+        """Recompute the rows of the given users."""
+        from django.contrib.auth import get_user_model
+        
+        User = get_user_model()
+        user_ids = list(user_ids)
+        for start in range(0, len(user_ids), batch_size):
+            chunk = user_ids[start:start + batch_size]
+            users = list(User.objects.filter(pk__in=chunk, is_active=True).values_list('pk', 'role_id', 'account_id'))
+            role_ids = {role_id for _, role_id, _ in users if role_id}
+            
+            granted, denied = {}, {}
+            for role_id, permission_id, codename, is_granted, constraints in RolePermission.objects.filter(
+                role_id__in=role_ids, role__is_active=True, permission__is_active=True
+            ).values_list('role_id', 'permission_id', 'permission__codename', 'is_granted', 'constraints'):
+                if is_granted:
+                    granted.setdefault(role_id, []).append((permission_id, codename, constraints))
+                else:
+                    denied.setdefault(role_id, set()).add(permission_id)
+            
+            custom = {}
+            for user_id, permission_id, codename in User.custom_permissions.through.objects.filter(
+                user_id__in=chunk, permission__is_active=True
+            ).values_list('user_id', 'permission_id', 'permission__codename'):
+                custom.setdefault(user_id, []).append((permission_id, codename))
+            
+            rows = []
+            for user_id, role_id, account_id in users:
+                entries = {}
+                for permission_id, codename, constraints in granted.get(role_id, []):
+                    entries[permission_id] = (codename, 'role', constraints or {})
+                for permission_id, codename in custom.get(user_id, []):
+                    entries[permission_id] = (codename, 'custom', {})
+                for permission_id in denied.get(role_id, ()):
+                    entries.pop(permission_id, None)
+                rows.extend(
+                    cls(user_id=user_id, permission_id=permission_id, account_id=account_id,
+                        codename=codename, source=source, constraints=constraints)
+                    for permission_id, (codename, source, constraints) in entries.items()
+                )
+            
+            with transaction.atomic():
+                cls.objects.filter(user_id__in=chunk).delete()
+                cls.objects.bulk_create(rows, batch_size=batch_size)
+    
+    @classmethod
+    def refresh_role(cls, role_id):
+        """Recompute the rows of every user holding a role."""
+        from django.contrib.auth import get_user_model
+        cls.refresh_users(get_user_model().objects.filter(role_id=role_id).values_list('pk', flat=True))
@@ -0,0 +1,69 @@
+from django.conf import settings
+from rest_framework.permissions import SAFE_METHODS, BasePermission
+
+from . import engine
+
+METHOD_LEVELS = {'POST': 'create', 'PUT': 'edit', 'PATCH': 'edit', 'DELETE': 'delete'}
+
+
+class HasRolePermission(BasePermission):
+    """
+    Require the permission codename a view declares for the current action.
+
+    Views set ``permission_resource`` ('users' means view_users for reads and
+    create_users / edit_users / delete_users for POST / PUT, PATCH / DELETE)
+    and may override single actions in ``required_permissions``
+    ({action: codename}, or None to only require a login). Checks read the
+    compiled table in roles_permissions.engine; per request they only read
+    its version stamp from the Django cache (one query with the db cache).
+    Constraints on the role grant are checked against single objects here;
+    list views narrow their querysets with scope_queryset(). Codenames are
+    only enforced when RBAC_ENFORCE is on, so roles can be granted before
+    switching it on.
+    """
+    message = 'You do not have permission to perform this action.'
+
+    def required_permission(self, request, view):
+        overrides = getattr(view, 'required_permissions', {})
+        action = getattr(view, 'action', None)
+        if action in overrides:
+            return overrides[action]
+        resource = getattr(view, 'permission_resource', None)
+        if resource is None:
+            return None
+        level = 'view' if request.method in SAFE_METHODS else METHOD_LEVELS.get(request.method, 'edit')
+        return f'{level}_{resource}'
+
+    def has_permission(self, request, view):
+        if not (request.user and request.user.is_authenticated):
+            return False
+        codename = self.required_permission(request, view)
+        if codename is None or not settings.RBAC_ENFORCE:
+            return True
+        return engine.has_permission(request.user, codename, request)
+
+    def has_object_permission(self, request, view, obj):
+        codename = self.required_permission(request, view)
+        if codename is None or not settings.RBAC_ENFORCE:
+            return True
+        return engine.permission_scope(request.user, codename, request).matches(request.user, obj)
+
+
+def scope_queryset(request, view, queryset):
+    """
+    Narrow ``queryset`` to the rows the constraints on the user's grant for
+    this action allow, as a SQL filter.
+    """
+    if not settings.RBAC_ENFORCE:
+        return queryset
+    codename = HasRolePermission().required_permission(request, view)
+    if codename is None:
+        return queryset
+    return engine.permission_scope(request.user, codename, request).filter(queryset, request.user)
+
+
+def permission_required(codename):
+    """HasRolePermission for one fixed codename, for function-based views."""
+    return type(f'Requires_{codename}', (HasRolePermission,), {
+        'required_permission': lambda self, request, view: codename,
+    })
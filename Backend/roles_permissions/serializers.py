@@ -1,4 +1,6 @@
+from django.core.exceptions import ValidationError
 from rest_framework import serializers
+from .constraints import compile_constraints
 from .models import Permission, Role, RolePermission
 
 
@@ -39,6 +41,18 @@ class RolePermissionSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at']
 
 
+def get_granted_permission_count(role):
+    """
+    Count granted permissions, preferring the view's annotation and then any
+    prefetched role permissions before falling back to a COUNT query.
+    """
+    if hasattr(role, 'granted_permission_count'):
+        return role.granted_permission_count
+    if 'rolepermission_set' in getattr(role, '_prefetched_objects_cache', {}):
+        return sum(1 for rp in role.rolepermission_set.all() if rp.is_granted)
+    return role.rolepermission_set.filter(is_granted=True).count()
+
+
 class RoleSerializer(serializers.ModelSerializer):
     permissions_detail = RolePermissionSerializer(
         source='rolepermission_set', 
@@ -66,7 +80,7 @@ class RoleSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
     
     def get_permission_count(self, obj):
-        return obj.rolepermission_set.filter(is_granted=True).count()
+        return get_granted_permission_count(obj)
     
     def validate(self, data):
         # Prevent modification of system roles
@@ -97,7 +111,7 @@ class RoleListSerializer(serializers.ModelSerializer):
         ]
     
     def get_permission_count(self, obj):
-        return obj.rolepermission_set.filter(is_granted=True).count()
+        return get_granted_permission_count(obj)
 
 
 class AssignPermissionSerializer(serializers.Serializer):
@@ -111,4 +125,11 @@ class AssignPermissionSerializer(serializers.Serializer):
             Permission.objects.get(id=value, is_active=True)
         except Permission.DoesNotExist:
             raise serializers.ValidationError("Permission not found or inactive.")
-        return value
\ No newline at end of file
+        return value
+    
+    def validate_constraints(self, value):
+        try:
+            compile_constraints(value)
+        except ValidationError as e:
+            raise serializers.ValidationError(e.messages)
+        return value
@@ -1,7 +1,18 @@
-from django.db.models.signals import post_save, post_migrate
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import post_save, post_delete, pre_delete, post_migrate, m2m_changed
 from django.dispatch import receiver
 from django.apps import apps
 
+from . import engine
+from .models import Permission, Role, RolePermission, UserEffectivePermission
+
+User = get_user_model()
+
+# User fields that feed UserEffectivePermission
+EFFECTIVE_PERMISSION_USER_FIELDS = {'role', 'role_id', 'account', 'account_id', 'is_active'}
+
 
 @receiver(post_save, sender='boarding.JourneyTemplate')
 def journey_template_created(sender, instance, created, **kwargs):
@@ -180,4 +191,80 @@ def create_default_journey_templates(sender, **kwargs):
         print(f"✅ Created default offboarding template: {offboarding_template.title}")
         
     except Exception as e:
-        print(f"❌ Error creating default templates: {e}")
\ No newline at end of file
+        print(f"❌ Error creating default templates: {e}")
+
+
+@receiver(post_save, sender=Permission)
+@receiver(post_delete, sender=Permission)
+@receiver(post_save, sender=Role)
+@receiver(post_delete, sender=Role)
+@receiver(post_save, sender=RolePermission)
+@receiver(post_delete, sender=RolePermission)
+def permission_grants_changed(sender, **kwargs):
+    """Rebuild compiled permission tables after grants change."""
+    transaction.on_commit(engine.invalidate)
+
+
+@receiver(m2m_changed, sender=User.custom_permissions.through)
+def custom_permissions_changed(sender, instance, action, reverse, pk_set=None, **kwargs):
+    """Refresh effective permissions and compiled tables after custom permissions change."""
+    if reverse and action == 'pre_clear':
+        # instance is a Permission; remember who loses it
+        instance._cleared_user_ids = list(instance.users_with_permission.values_list('pk', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        UserEffectivePermission.refresh_users([instance.pk])
+    elif action == 'post_clear':
+        UserEffectivePermission.refresh_users(getattr(instance, '_cleared_user_ids', []))
+    else:
+        UserEffectivePermission.refresh_users(pk_set or [])
+    transaction.on_commit(engine.invalidate)
+
+
+@receiver(post_save, sender=RolePermission)
+@receiver(post_delete, sender=RolePermission)
+def refresh_role_permission_holders(sender, instance, **kwargs):
+    """Refresh effective permissions of the role's users."""
+    UserEffectivePermission.refresh_role(instance.role_id)
+
+
+@receiver(post_save, sender=Role)
+def refresh_role_holders(sender, instance, created=False, **kwargs):
+    """Refresh effective permissions when a role is (de)activated."""
+    if not created:
+        UserEffectivePermission.refresh_role(instance.pk)
+
+
+@receiver(pre_delete, sender=Role)
+def remember_role_holders(sender, instance, **kwargs):
+    # User.role is SET_NULL, so the holders can't be found after the delete
+    instance._holder_ids = list(User.objects.filter(role=instance).values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Role)
+def refresh_former_role_holders(sender, instance, **kwargs):
+    UserEffectivePermission.refresh_users(getattr(instance, '_holder_ids', []))
+
+
+@receiver(post_save, sender=Permission)
+def refresh_permission_holders(sender, instance, created=False, **kwargs):
+    """Refresh effective permissions when a permission is renamed or (de)activated."""
+    if created:
+        return
+    UserEffectivePermission.refresh_users(
+        User.objects.filter(
+            Q(role__rolepermission__permission=instance) | Q(custom_permissions=instance)
+        ).values_list('pk', flat=True).distinct()
+    )
+
+
+@receiver(post_save, sender=User)
+def refresh_user_effective_permissions(sender, instance, created=False, update_fields=None, **kwargs):
+    """Refresh a user's effective permissions when their role, account or status changes."""
+    if created and not instance.role_id:
+        return
+    if update_fields is not None and not EFFECTIVE_PERMISSION_USER_FIELDS & set(update_fields):
+        return
+    UserEffectivePermission.refresh_users([instance.pk])
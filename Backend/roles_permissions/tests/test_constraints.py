@@ -0,0 +1,55 @@
+"""
+Constrained grants restrict journey steps and user-accounts like the other
+mapped models, and apply nowhere on models without a mapping.
+"""
+
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from boarding.models import JourneyStep, JourneyTemplate
+from roles_permissions.constraints import Scope, compile_constraints
+from roles_permissions.models import Role
+from users.models import User, UserAccount
+
+ACCOUNT = uuid.uuid4()
+OTHER_ACCOUNT = uuid.uuid4()
+USER = SimpleNamespace(account_id=ACCOUNT, department='IT')
+
+
+def scope(constraints):
+    return Scope([compile_constraints(constraints)])
+
+
+def step(account_id, journey_type):
+    return JourneyStep(template=JourneyTemplate(account_id=account_id, journey_type=journey_type))
+
+
+def test_journey_step_constraints():
+    onboarding = scope({'journey_type': 'onboarding'})
+    assert onboarding.matches(USER, step(ACCOUNT, 'onboarding'))
+    assert not onboarding.matches(USER, step(ACCOUNT, 'offboarding'))
+
+    own_account = scope({'account': 'own'})
+    assert own_account.matches(USER, step(ACCOUNT, 'onboarding'))
+    assert not own_account.matches(USER, step(OTHER_ACCOUNT, 'onboarding'))
+
+
+def test_user_account_constraints():
+    own_account = scope({'account': 'own'})
+    assert own_account.matches(USER, UserAccount(account_id=ACCOUNT, user=User(department='HR')))
+    assert not own_account.matches(USER, UserAccount(account_id=OTHER_ACCOUNT, user=User(department='HR')))
+
+    own_department = scope({'department': 'own'})
+    assert own_department.matches(USER, UserAccount(account_id=ACCOUNT, user=User(department='IT')))
+    assert not own_department.matches(USER, UserAccount(account_id=ACCOUNT, user=User(department='HR')))
+
+
+@pytest.mark.django_db
+def test_unmapped_model_fails_closed():
+    own_account = scope({'account': 'own'})
+    Role.objects.create(name='unmapped', display_name='Unmapped')
+
+    assert not own_account.matches(USER, Role(name='unmapped'))
+    assert not own_account.filter(Role.objects.all(), USER).exists()
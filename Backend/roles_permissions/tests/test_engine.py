@@ -0,0 +1,32 @@
+"""
+A role grant whose stored constraints can't be compiled grants nothing, for
+object checks and plain codename checks alike.
+"""
+
+import logging
+
+import pytest
+
+from roles_permissions.engine import PermissionTable
+from roles_permissions.models import Permission, Role, RolePermission
+from users.models import User
+
+pytestmark = pytest.mark.django_db
+
+
+def test_invalid_constraints_leave_the_codename_out(caplog):
+    permission, _ = Permission.objects.get_or_create(
+        codename='view_reports', defaults={'name': 'View Reports', 'category': 'reporting', 'level': 'view'}
+    )
+    role = Role.objects.create(name='broken-grant', display_name='Broken Grant')
+    grant = RolePermission.objects.create(role=role, permission=permission)
+    # Written around validation, as an old or hand-edited row would be
+    RolePermission.objects.filter(pk=grant.pk).update(constraints={'account': 'not-a-uuid'})
+    user = User.objects.create_user(username='broken', email='broken@example.com', password='broken-pass-123', role=role)
+
+    with caplog.at_level(logging.WARNING, logger='roles_permissions.engine'):
+        table = PermissionTable.load()
+
+    assert 'view_reports' not in table.user_permissions(user)
+    assert table.scope(user, 'view_reports').constraints == []
+    assert 'invalid constraints' in caplog.text
@@ -1,9 +1,11 @@
-from rest_framework import viewsets, permissions, status
+import uuid
+
+from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.db.models import Q, Count
+from django.db.models import Q, Count, Prefetch
 from django.shortcuts import get_object_or_404
-from .models import Permission, Role, RolePermission
+from .models import Permission, Role, RolePermission, UserEffectivePermission
 from .serializers import (
     PermissionSerializer, 
     RoleSerializer, 
@@ -11,6 +13,9 @@ from .serializers import (
     AssignPermissionSerializer,
     RolePermissionSerializer
 )
+from search.backends import get_search_backend
+from .permissions import HasRolePermission
+from accounts.tenancy import get_tenant
 
 
 class PermissionViewSet(viewsets.ModelViewSet):
@@ -20,7 +25,13 @@ class PermissionViewSet(viewsets.ModelViewSet):
     """
     queryset = Permission.objects.all()
     serializer_class = PermissionSerializer
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [HasRolePermission]
+    permission_resource = 'roles'
+    
+    def get_cursor_ordering(self):
+        if self.action == 'users':
+            return ('last_name', 'first_name', 'id')
+        return ('category', 'level', 'name', 'id')
     
     def get_queryset(self):
         queryset = Permission.objects.all()
@@ -28,11 +39,7 @@ class PermissionViewSet(viewsets.ModelViewSet):
         # Filter by search query
         search = self.request.query_params.get('search', None)
         if search:
-            queryset = queryset.filter(
-                Q(name__icontains=search) |
-                Q(codename__icontains=search) |
-                Q(description__icontains=search)
-            )
+            queryset = get_search_backend().filter(queryset, search)
         
         # Filter by category
         category = self.request.query_params.get('category', None)
@@ -70,6 +77,53 @@ class PermissionViewSet(viewsets.ModelViewSet):
             permissions[category].append(PermissionSerializer(permission).data)
         
         return Response(permissions)
+    
+    @action(detail=True, methods=['get'])
+    def users(self, request, pk=None):
+        """
+        Get users holding this permission, from user_effective_permissions.
+        
+        Limited to the requester's account; superusers may pass ?account_id=.
+        ?journey_type=, ?department= and ?step_type= leave out holders whose
+        grant constraints exclude that target.
+        """
+        permission = self.get_object()
+        tenant = get_tenant(request)
+        if tenant.unrestricted:
+            account_id = request.query_params.get('account_id') or None
+            if account_id is not None:
+                try:
+                    account_id = uuid.UUID(account_id)
+                except ValueError:
+                    return Response(
+                        {'error': 'account_id must be a valid UUID'},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+        else:
+            account_id = tenant.account_id
+        
+        target = {
+            key: request.query_params.get(key)
+            for key in ('journey_type', 'department', 'step_type')
+            if request.query_params.get(key)
+        }
+        users = UserEffectivePermission.users_with(permission.codename, account=account_id, **target)
+        if not tenant.unrestricted and account_id is None:
+            # Not linked to an account: no tenant's users are visible
+            users = users.none()
+        
+        users_data = []
+        for user in self.paginate_queryset(users):
+            users_data.append({
+                'user_id': user.id,
+                'username': user.username,
+                'email': user.email,
+                'first_name': user.first_name,
+                'last_name': user.last_name,
+                'account_id': user.account_id,
+            })
+        
+        return self.get_paginated_response(users_data)
 
 
 class RoleViewSet(viewsets.ModelViewSet):
@@ -79,24 +133,52 @@ class RoleViewSet(viewsets.ModelViewSet):
     """
     queryset = Role.objects.all()
     serializer_class = RoleSerializer
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [HasRolePermission]
+    permission_resource = 'roles'
+    required_permissions = {
+        'assign_permission': 'edit_roles',
+        'remove_permission': 'edit_roles',
+    }
+    
+    def get_cursor_ordering(self):
+        if self.action == 'users':
+            return ('user__last_name', 'user__first_name', 'id')
+        return ('level', 'name', 'id')
     
     def get_serializer_class(self):
         if self.action == 'list':
             return RoleListSerializer
         return RoleSerializer
     
+    @staticmethod
+    def with_permission_counts(queryset, include_permissions=True):
+        """
+        Annotate granted permission counts and, for detail responses, prefetch
+        role permissions with their permission in a single extra query.
+        """
+        queryset = queryset.annotate(
+            granted_permission_count=Count(
+                'rolepermission', filter=Q(rolepermission__is_granted=True)
+            )
+        )
+        if include_permissions:
+            queryset = queryset.prefetch_related(
+                Prefetch(
+                    'rolepermission_set',
+                    queryset=RolePermission.objects.select_related('permission')
+                )
+            )
+        return queryset
+    
     def get_queryset(self):
-        queryset = Role.objects.prefetch_related('rolepermission_set__permission')
+        queryset = self.with_permission_counts(
+            Role.objects.all(), include_permissions=self.action != 'list'
+        )
         
         # Filter by search query
         search = self.request.query_params.get('search', None)
         if search:
-            queryset = queryset.filter(
-                Q(name__icontains=search) |
-                Q(display_name__icontains=search) |
-                Q(description__icontains=search)
-            )
+            queryset = get_search_backend().filter(queryset, search)
         
         # Filter by level
         level = self.request.query_params.get('level', None)
@@ -129,8 +211,7 @@ class RoleViewSet(viewsets.ModelViewSet):
     def permissions(self, request, pk=None):
         """Get all permissions for this role."""
         role = self.get_object()
-        role_permissions = role.rolepermission_set.select_related('permission')
-        serializer = RolePermissionSerializer(role_permissions, many=True)
+        serializer = RolePermissionSerializer(role.rolepermission_set.all(), many=True)
         return Response(serializer.data)
     
     @action(detail=True, methods=['post'])
@@ -152,8 +233,7 @@ class RoleViewSet(viewsets.ModelViewSet):
                 permission=permission,
                 defaults={
                     'is_granted': is_granted,
-                    'constraints': constraints,
-                    'created_by': request.user
+                    'constraints': constraints
                 }
             )
             
@@ -200,7 +280,7 @@ class RoleViewSet(viewsets.ModelViewSet):
         )
         
         users_data = []
-        for ua in user_accounts:
+        for ua in self.paginate_queryset(user_accounts):
             users_data.append({
                 'user_id': ua.user.id,
                 'username': ua.user.username,
@@ -212,13 +292,15 @@ class RoleViewSet(viewsets.ModelViewSet):
                 'assigned_at': ua.created_at
             })
         
-        return Response(users_data)
+        return self.get_paginated_response(users_data)
     
     @action(detail=False, methods=['get'])
     def default(self, request):
         """Get the default role."""
         try:
-            default_role = Role.objects.get(is_default=True, is_active=True)
+            default_role = self.with_permission_counts(Role.objects.all()).get(
+                is_default=True, is_active=True
+            )
             serializer = RoleSerializer(default_role)
             return Response(serializer.data)
         except Role.DoesNotExist:
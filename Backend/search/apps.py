@@ -0,0 +1,13 @@
+from django.apps import AppConfig
+
+
+class SearchConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'search'
+    verbose_name = 'Search Index'
+    
+    def ready(self):
+        # Connect index maintenance signals for the registered models
+        from .signals import connect_signals, connect_suggestion_signals
+        connect_signals()
+        connect_suggestion_signals()
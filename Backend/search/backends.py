@@ -0,0 +1,224 @@
+"""
+Search backends.
+
+All backends share the search_entries table (maintained by search.signals);
+they differ in how they match against it:
+
+- SQLiteFTSBackend: FTS5 index with prefix queries, ranked by bm25.
+- PostgresSearchBackend: tsvector prefix queries plus pg_trgm word similarity.
+- DatabaseSearchBackend: the original ``__icontains`` scan, used when neither
+  index is available.
+
+``SEARCH_BACKEND`` selects a backend by dotted path; by default it follows the
+database vendor.
+"""
+
+import re
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+from .models import SearchEntry
+from .registry import SEARCH_MODELS, build_content, get_account_id, get_config
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize(query):
+    """Split a user query into lowercase word tokens."""
+    return TOKEN_RE.findall((query or '').lower())
+
+
+def icontains_filter(queryset, query):
+    """Substring match across the model's indexed columns (no index used)."""
+    condition = Q()
+    for field in get_config(queryset.model)['fields']:
+        condition |= Q(**{f'{field}__icontains': query})
+    return queryset.filter(condition)
+
+
+class BaseSearchBackend:
+    """Index maintenance shared by every backend."""
+
+    def index_instance(self, instance):
+        config = get_config(type(instance))
+        SearchEntry.objects.update_or_create(
+            model_label=type(instance)._meta.label,
+            object_id=instance.pk,
+            defaults={
+                'content': build_content(instance, config),
+                'account_id': get_account_id(instance, config),
+            }
+        )
+
+    def index_new_instances(self, instances, batch_size=1000):
+        """Add entries for objects created with bulk_create, which sends no signals."""
+        instances = list(instances)
+        if not instances:
+            return
+        config = get_config(type(instances[0]))
+        label = type(instances[0])._meta.label
+        SearchEntry.objects.bulk_create([
+            SearchEntry(
+                model_label=label,
+                object_id=instance.pk,
+                content=build_content(instance, config),
+                account_id=get_account_id(instance, config),
+            )
+            for instance in instances
+        ], batch_size=batch_size)
+    
+    def remove_instance(self, instance):
+        SearchEntry.objects.filter(
+            model_label=type(instance)._meta.label,
+            object_id=instance.pk
+        ).delete()
+
+    def rebuild(self, model, batch_size=1000):
+        """Replace every entry for ``model``; returns the number indexed."""
+        label = model._meta.label
+        config = SEARCH_MODELS[label]
+        columns = config['fields'] + ([config['account_field']] if config['account_field'] else [])
+        SearchEntry.objects.filter(model_label=label).delete()
+
+        batch = []
+        count = 0
+        for obj in model.objects.only('pk', *columns).iterator(chunk_size=batch_size):
+            batch.append(SearchEntry(
+                model_label=label,
+                object_id=obj.pk,
+                content=build_content(obj, config),
+                account_id=get_account_id(obj, config),
+            ))
+            if len(batch) >= batch_size:
+                SearchEntry.objects.bulk_create(batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            SearchEntry.objects.bulk_create(batch)
+            count += len(batch)
+        return count
+
+    def entries(self, model_labels=None, account_id=None):
+        entries = SearchEntry.objects.all()
+        if model_labels is not None:
+            entries = entries.filter(model_label__in=model_labels)
+        if account_id:
+            entries = entries.filter(Q(account_id=account_id) | Q(account_id__isnull=True))
+        return entries
+
+    def match(self, entries, tokens):
+        """Restrict ``entries`` to those matching every token (as a prefix)."""
+        raise NotImplementedError
+
+    def rank(self, entries, tokens):
+        """Annotate ``search_rank``; lower is a better match."""
+        raise NotImplementedError
+
+    def filter(self, queryset, query):
+        """Filter a queryset of a registered model down to matching rows."""
+        tokens = tokenize(query)
+        if not tokens:
+            # Punctuation-only queries have nothing to look up in the index
+            return icontains_filter(queryset, query)
+        entries = self.match(self.entries([queryset.model._meta.label]), tokens)
+        return queryset.filter(pk__in=entries.values('object_id'))
+
+    def search(self, query, model_labels=None, account_id=None, limit=20):
+        """Return the best matching entries, most relevant first."""
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        entries = self.match(self.entries(model_labels, account_id), tokens)
+        return list(self.rank(entries, tokens).order_by('search_rank', 'id')[:limit])
+
+
+class DatabaseSearchBackend(BaseSearchBackend):
+    """Unindexed substring matching; every search scans the table."""
+
+    def match(self, entries, tokens):
+        for token in tokens:
+            entries = entries.filter(content__icontains=token)
+        return entries
+
+    def rank(self, entries, tokens):
+        return entries.annotate(search_rank=RawSQL('0', [], output_field=FloatField()))
+
+    def filter(self, queryset, query):
+        # Search the model's own columns so results don't depend on the index
+        return icontains_filter(queryset, query)
+
+
+class SQLiteFTSBackend(BaseSearchBackend):
+    """FTS5 index over search_entries.content (created by search migration 0001)."""
+
+    table = 'search_entries_fts'
+
+    def fts_query(self, tokens):
+        # Quoted tokens can't be read as FTS5 operators; * makes each a prefix
+        return ' '.join(f'"{token}"*' for token in tokens)
+
+    def match(self, entries, tokens):
+        return entries.filter(id__in=RawSQL(
+            f'SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s',
+            [self.fts_query(tokens)]
+        ))
+
+    def rank(self, entries, tokens):
+        return entries.annotate(search_rank=RawSQL(
+            f'(SELECT rank FROM {self.table} WHERE {self.table} MATCH %s '
+            f'AND rowid = "search_entries"."id")',
+            [self.fts_query(tokens)],
+            output_field=FloatField()
+        ))
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    """
+    tsvector prefix matching with a pg_trgm word-similarity fallback for typos.
+    Both expressions are backed by GIN indexes from search migration 0001.
+    """
+
+    def ts_query(self, tokens):
+        return ' & '.join(f'{token}:*' for token in tokens)
+
+    def match(self, entries, tokens):
+        return entries.filter(RawSQL(
+            "(to_tsvector('simple', \"search_entries\".\"content\") @@ to_tsquery('simple', %s) "
+            "OR %s <%% \"search_entries\".\"content\")",
+            [self.ts_query(tokens), ' '.join(tokens)],
+            output_field=BooleanField()
+        ))
+
+    def rank(self, entries, tokens):
+        return entries.annotate(search_rank=RawSQL(
+            "-(ts_rank(to_tsvector('simple', \"search_entries\".\"content\"), to_tsquery('simple', %s)) "
+            "+ word_similarity(%s, \"search_entries\".\"content\"))",
+            [self.ts_query(tokens), ' '.join(tokens)],
+            output_field=FloatField()
+        ))
+
+
+def fts5_index_exists():
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s",
+            [SQLiteFTSBackend.table]
+        )
+        return cursor.fetchone() is not None
+
+
+@lru_cache(maxsize=None)
+def get_search_backend():
+    """Return the configured search backend instance."""
+    if settings.SEARCH_BACKEND:
+        return import_string(settings.SEARCH_BACKEND)()
+    if connection.vendor == 'postgresql':
+        return PostgresSearchBackend()
+    if connection.vendor == 'sqlite' and fts5_index_exists():
+        return SQLiteFTSBackend()
+    return DatabaseSearchBackend()
@@ -0,0 +1,46 @@
+"""
+Management command to rebuild the search index from the source tables.
+
+Entries are maintained by model signals; run this after bulk imports, raw SQL
+or queryset updates that bypass them.
+"""
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from search.backends import SQLiteFTSBackend, get_search_backend
+from search.registry import SEARCH_MODELS
+
+
+class Command(BaseCommand):
+    help = 'Rebuild search entries for every indexed model (or the ones given)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'models', nargs='*',
+            help=f"Model labels to rebuild (default: all of {', '.join(SEARCH_MODELS)})"
+        )
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows per bulk insert')
+
+    def handle(self, *args, **options):
+        labels = options['models'] or list(SEARCH_MODELS)
+        unknown = [label for label in labels if label not in SEARCH_MODELS]
+        if unknown:
+            raise CommandError(f"Not indexed: {', '.join(unknown)}")
+
+        backend = get_search_backend()
+        self.stdout.write(f"🔍 Using {type(backend).__name__}")
+
+        for label in labels:
+            with transaction.atomic():
+                count = backend.rebuild(apps.get_model(label), batch_size=options['batch_size'])
+            self.stdout.write(f"✅ {label}: indexed {count} rows")
+
+        if isinstance(backend, SQLiteFTSBackend):
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"INSERT INTO {backend.table}({backend.table}) VALUES ('optimize')"
+                )
+
+        self.stdout.write(self.style.SUCCESS("✅ Search index rebuilt"))
@@ -0,0 +1,106 @@
+# Generated by Django 4.2.30 on 2026-10-18 03:53
+
+from django.db import migrations, models
+
+
+# Snapshot of search.registry at the time of this migration
+INDEXED_MODELS = {
+    'users.User': (['username', 'first_name', 'last_name', 'email'], 'account_id'),
+    'boarding.JourneyTemplate': (['title', 'description', 'department', 'business_unit'], 'account_id'),
+    'roles_permissions.Role': (['name', 'display_name', 'description'], None),
+    'roles_permissions.Permission': (['name', 'codename', 'description'], None),
+}
+
+SQLITE_FORWARD = [
+    """CREATE VIRTUAL TABLE search_entries_fts USING fts5(
+        content, content='search_entries', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    """CREATE TRIGGER search_entries_fts_ai AFTER INSERT ON search_entries BEGIN
+        INSERT INTO search_entries_fts(rowid, content) VALUES (new.id, new.content);
+    END""",
+    """CREATE TRIGGER search_entries_fts_ad AFTER DELETE ON search_entries BEGIN
+        INSERT INTO search_entries_fts(search_entries_fts, rowid, content) VALUES ('delete', old.id, old.content);
+    END""",
+    """CREATE TRIGGER search_entries_fts_au AFTER UPDATE OF content ON search_entries BEGIN
+        INSERT INTO search_entries_fts(search_entries_fts, rowid, content) VALUES ('delete', old.id, old.content);
+        INSERT INTO search_entries_fts(rowid, content) VALUES (new.id, new.content);
+    END""",
+]
+
+SQLITE_REVERSE = [
+    'DROP TRIGGER IF EXISTS search_entries_fts_au',
+    'DROP TRIGGER IF EXISTS search_entries_fts_ad',
+    'DROP TRIGGER IF EXISTS search_entries_fts_ai',
+    'DROP TABLE IF EXISTS search_entries_fts',
+]
+
+POSTGRES_FORWARD = [
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    "CREATE INDEX search_entries_tsv_idx ON search_entries USING GIN (to_tsvector('simple', content))",
+    'CREATE INDEX search_entries_trgm_idx ON search_entries USING GIN (content gin_trgm_ops)',
+]
+
+POSTGRES_REVERSE = [
+    'DROP INDEX IF EXISTS search_entries_trgm_idx',
+    'DROP INDEX IF EXISTS search_entries_tsv_idx',
+]
+
+
+def run_vendor_sql(statements_by_vendor):
+    def run(apps, schema_editor):
+        for statement in statements_by_vendor.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+    return run
+
+
+def populate_entries(apps, schema_editor):
+    SearchEntry = apps.get_model('search', 'SearchEntry')
+    for label, (fields, account_field) in INDEXED_MODELS.items():
+        model = apps.get_model(label)
+        SearchEntry.objects.bulk_create([
+            SearchEntry(
+                model_label=label,
+                object_id=obj.pk,
+                content=' '.join(str(getattr(obj, f)) for f in fields if getattr(obj, f)),
+                account_id=getattr(obj, account_field) if account_field else None,
+            )
+            for obj in model.objects.iterator()
+        ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('users', '0011_jobtitle_active_user_count'),
+        ('boarding', '0004_alter_journeytemplate_unique_together_and_more'),
+        ('roles_permissions', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_label', models.CharField(help_text='app_label.ModelName of the indexed object', max_length=100)),
+                ('object_id', models.UUIDField(help_text='Primary key of the indexed object')),
+                ('account_id', models.UUIDField(blank=True, help_text='Account the object belongs to (empty for global objects)', null=True)),
+                ('content', models.TextField(help_text='Indexed text')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Search Entry',
+                'verbose_name_plural': 'Search Entries',
+                'db_table': 'search_entries',
+                'indexes': [models.Index(fields=['model_label', 'account_id'], name='search_entries_scope_idx')],
+                'unique_together': {('model_label', 'object_id')},
+            },
+        ),
+        migrations.RunPython(
+            run_vendor_sql({'sqlite': SQLITE_FORWARD, 'postgresql': POSTGRES_FORWARD}),
+            run_vendor_sql({'sqlite': SQLITE_REVERSE, 'postgresql': POSTGRES_REVERSE}),
+        ),
+        migrations.RunPython(populate_entries, migrations.RunPython.noop),
+    ]
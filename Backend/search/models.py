@@ -0,0 +1,40 @@
+from django.db import models
+
+
+class SearchEntry(models.Model):
+    """
+    One row per searchable object, holding the text the search backends index.
+    
+    The integer primary key doubles as the rowid of the SQLite FTS5 index
+    (search_entries_fts), which is kept in step by triggers; on Postgres the
+    content column carries tsvector and trigram GIN indexes instead.
+    """
+    
+    model_label = models.CharField(
+        max_length=100,
+        help_text='app_label.ModelName of the indexed object'
+    )
+    
+    object_id = models.UUIDField(help_text='Primary key of the indexed object')
+    
+    account_id = models.UUIDField(
+        null=True,
+        blank=True,
+        help_text='Account the object belongs to (empty for global objects)'
+    )
+    
+    content = models.TextField(help_text='Indexed text')
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'search_entries'
+        verbose_name = 'Search Entry'
+        verbose_name_plural = 'Search Entries'
+        unique_together = ['model_label', 'object_id']
+        indexes = [
+            models.Index(fields=['model_label', 'account_id'], name='search_entries_scope_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.model_label}:{self.object_id}"
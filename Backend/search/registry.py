@@ -0,0 +1,39 @@
+"""
+Models covered by the search index and the fields that make up their text.
+"""
+
+SEARCH_MODELS = {
+    'users.User': {
+        'type': 'user',
+        'fields': ['username', 'first_name', 'last_name', 'email'],
+        'account_field': 'account_id',
+    },
+    'boarding.JourneyTemplate': {
+        'type': 'template',
+        'fields': ['title', 'description', 'department', 'business_unit'],
+        'account_field': 'account_id',
+    },
+    'roles_permissions.Role': {
+        'type': 'role',
+        'fields': ['name', 'display_name', 'description'],
+        'account_field': None,
+    },
+    'roles_permissions.Permission': {
+        'type': 'permission',
+        'fields': ['name', 'codename', 'description'],
+        'account_field': None,
+    },
+}
+
+
+def get_config(model):
+    return SEARCH_MODELS.get(model._meta.label)
+
+
+def build_content(obj, config):
+    """Join the indexed field values of ``obj`` into one searchable string."""
+    return ' '.join(str(value) for value in (getattr(obj, f) for f in config['fields']) if value)
+
+
+def get_account_id(obj, config):
+    return getattr(obj, config['account_field']) if config['account_field'] else None
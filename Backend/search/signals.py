@@ -0,0 +1,61 @@
+from django.apps import apps
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+
+from . import suggest
+from .backends import get_search_backend
+from .registry import SEARCH_MODELS
+
+
+def index_instance(sender, instance, created=False, update_fields=None, **kwargs):
+    """Refresh the search entry for a saved object."""
+    config = SEARCH_MODELS[sender._meta.label]
+    indexed = set(config['fields'])
+    if config['account_field']:
+        indexed |= {config['account_field'], config['account_field'].replace('_id', '')}
+    # Saves that only touch other columns (e.g. last_login) leave the entry as is
+    if update_fields is not None and not indexed & set(update_fields):
+        return
+    get_search_backend().index_instance(instance)
+
+
+def remove_instance(sender, instance, **kwargs):
+    """Drop the search entry for a deleted object."""
+    get_search_backend().remove_instance(instance)
+
+
+def connect_signals():
+    for label in SEARCH_MODELS:
+        model = apps.get_model(label)
+        post_save.connect(index_instance, sender=model, dispatch_uid=f'search_index_{label}')
+        post_delete.connect(remove_instance, sender=model, dispatch_uid=f'search_remove_{label}')
+
+
+SUGGEST_HANDLERS = {
+    'users.User': suggest.user_changed,
+    'users.JobTitle': suggest.job_title_changed,
+    'boarding.JourneyTemplate': suggest.template_changed,
+    'boarding.JourneyInstance': suggest.journey_changed,
+}
+SUGGEST_FIELDS = {
+    'users.User': set(suggest.USER_FIELDS) | {'is_active', 'account', 'account_id'},
+    'users.JobTitle': {'title', 'department', 'is_active'},
+    'boarding.JourneyTemplate': set(suggest.TEMPLATE_FIELDS) | {'is_active', 'account', 'account_id'},
+    'boarding.JourneyInstance': {'status', 'user', 'user_id', 'template', 'template_id'},
+}
+
+
+def update_suggestions(sender, instance, update_fields=None, **kwargs):
+    """Patch the in-memory typeahead indexes once the change is committed."""
+    label = sender._meta.label
+    if update_fields is not None and not SUGGEST_FIELDS[label] & set(update_fields):
+        return
+    deleted = 'created' not in kwargs
+    transaction.on_commit(lambda: SUGGEST_HANDLERS[label](instance, deleted=deleted))
+
+
+def connect_suggestion_signals():
+    for label in SUGGEST_HANDLERS:
+        model = apps.get_model(label)
+        post_save.connect(update_suggestions, sender=model, dispatch_uid=f'search_suggest_save_{label}')
+        post_delete.connect(update_suggestions, sender=model, dispatch_uid=f'search_suggest_delete_{label}')
@@ -0,0 +1,300 @@
+"""
+In-memory typeahead index for the search modal.
+
+Each account gets a PrefixIndex: a sorted list of (term, item key) pairs, so a
+prefix lookup is two bisects plus a short scan. Job titles are global and
+live in their own index that every account consults. Indexes are built
+lazily on first use and then patched in place by model signals
+(search.signals). A version stamp in the Django cache tells other processes
+that their copy is stale; they rebuild on the next request.
+"""
+
+import bisect
+import heapq
+import threading
+
+from django.core.cache import cache
+
+from .backends import tokenize
+
+TYPE_ORDER = {'user': 0, 'journey': 1, 'template': 2, 'job_title': 3}
+ACTIVE_JOURNEY_STATUSES = ['not_started', 'in_progress', 'on_hold']
+GLOBAL = 'global'
+ALL_ACCOUNTS = 'all'
+VERSION_KEY = 'search:suggest:version:{}'
+
+
+class PrefixIndex:
+    """Sorted-array prefix index over suggestion items."""
+
+    def __init__(self):
+        self.entries = []
+        self.items = {}
+        self.version = None
+        self.lock = threading.Lock()
+
+    def add(self, item):
+        key = (item['type'], str(item['id']))
+        with self.lock:
+            self._remove(key)
+            terms = set(tokenize(' '.join(filter(None, item.pop('terms')))))
+            self.items[key] = (item, terms, (TYPE_ORDER[item['type']], len(item['label']), item['label']))
+            for term in terms:
+                bisect.insort(self.entries, (term, key))
+
+    def remove(self, key):
+        with self.lock:
+            self._remove(key)
+
+    def _remove(self, key):
+        existing = self.items.pop(key, None)
+        if existing is None:
+            return
+        for term in existing[1]:
+            position = bisect.bisect_left(self.entries, (term, key))
+            if position < len(self.entries) and self.entries[position] == (term, key):
+                del self.entries[position]
+
+    def search(self, tokens, limit):
+        """Top ``limit`` items whose terms start with every token."""
+        first, rest = tokens[0], tokens[1:]
+        with self.lock:
+            start = bisect.bisect_left(self.entries, (first,))
+            end = bisect.bisect_left(self.entries, (first + '\uffff',))
+            candidates = {key for _, key in self.entries[start:end]}
+
+            matches = []
+            for key in candidates:
+                item, terms, rank = self.items[key]
+                if all(any(term.startswith(token) for term in terms) for token in rest):
+                    exact = any(token in terms for token in tokens)
+                    matches.append(((not exact,) + rank, item))
+        return [item for _, item in heapq.nsmallest(limit, matches, key=lambda match: match[0])]
+
+
+def _user_item(user):
+    full_name = f"{user['first_name']} {user['last_name']}".strip()
+    return {
+        'type': 'user',
+        'id': user['id'],
+        'label': full_name or user['username'],
+        'sublabel': user['email'],
+        'terms': [user['username'], user['first_name'], user['last_name'], user['email']],
+    }
+
+
+def _job_title_item(job_title):
+    return {
+        'type': 'job_title',
+        'id': job_title['id'],
+        'label': job_title['title'],
+        'sublabel': job_title['department'],
+        'terms': [job_title['title'], job_title['department']],
+    }
+
+
+def _template_item(template):
+    return {
+        'type': 'template',
+        'id': template['id'],
+        'label': template['title'],
+        'sublabel': template['department'] or template['journey_type'],
+        'journey_type': template['journey_type'],
+        'terms': [template['title'], template['department'], template['business_unit']],
+    }
+
+
+def _journey_item(journey):
+    name = f"{journey['user__first_name']} {journey['user__last_name']}".strip() or journey['user__username']
+    return {
+        'type': 'journey',
+        'id': journey['id'],
+        'label': f"{name} - {journey['template__title']}",
+        'sublabel': journey['status'],
+        'terms': [
+            journey['user__username'], journey['user__first_name'],
+            journey['user__last_name'], journey['template__title'],
+        ],
+    }
+
+
+USER_FIELDS = ['id', 'username', 'first_name', 'last_name', 'email']
+TEMPLATE_FIELDS = ['id', 'title', 'department', 'business_unit', 'journey_type']
+JOURNEY_FIELDS = [
+    'id', 'status', 'template__title',
+    'user__username', 'user__first_name', 'user__last_name',
+]
+
+
+class SuggestionIndexes:
+    """Per-process registry of prefix indexes keyed by account."""
+
+    def __init__(self):
+        self.indexes = {}
+        self.lock = threading.Lock()
+
+    def get_version(self, scope):
+        key = VERSION_KEY.format(scope)
+        version = cache.get(key)
+        if version is None:
+            cache.add(key, 1, timeout=None)
+            version = cache.get(key, 1)
+        return version
+
+    def bump_version(self, scope):
+        try:
+            return cache.incr(VERSION_KEY.format(scope))
+        except ValueError:
+            return None
+
+    def get_index(self, scope):
+        """Return a current index for ``scope``, rebuilding it if stale."""
+        version = self.get_version(scope)
+        index = self.indexes.get(scope)
+        if index is not None and index.version == version:
+            return index
+        with self.lock:
+            index = self.indexes.get(scope)
+            if index is None or index.version != version:
+                index = self.build(scope)
+                index.version = version
+                self.indexes[scope] = index
+        return index
+
+    def build(self, scope):
+        from django.contrib.auth import get_user_model
+        from boarding.models import JourneyInstance, JourneyTemplate
+        from users.models import JobTitle
+
+        index = PrefixIndex()
+        if scope == GLOBAL:
+            for job_title in JobTitle.objects.filter(is_active=True).values('id', 'title', 'department'):
+                index.add(_job_title_item(job_title))
+            return index
+
+        users = get_user_model().objects.filter(is_active=True)
+        templates = JourneyTemplate.objects.filter(is_active=True)
+        journeys = JourneyInstance.objects.filter(status__in=ACTIVE_JOURNEY_STATUSES)
+        if scope != ALL_ACCOUNTS:
+            users = users.filter(account_id=scope)
+            templates = templates.filter(account_id=scope)
+            journeys = journeys.filter(template__account_id=scope)
+
+        for user in users.values(*USER_FIELDS).iterator():
+            index.add(_user_item(user))
+        for template in templates.values(*TEMPLATE_FIELDS).iterator():
+            index.add(_template_item(template))
+        for journey in journeys.values(*JOURNEY_FIELDS).iterator():
+            index.add(_journey_item(journey))
+        return index
+
+    def suggest(self, query, account_id=None, limit=8):
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        scope = str(account_id) if account_id else ALL_ACCOUNTS
+        results = self.get_index(scope).search(tokens, limit) + self.get_index(GLOBAL).search(tokens, limit)
+        results.sort(key=lambda item: (TYPE_ORDER[item['type']], len(item['label'])))
+        return results[:limit]
+
+    def apply(self, scopes, item=None, key=None):
+        """
+        Upsert ``item`` (or remove ``key``) in the already-built indexes for
+        ``scopes``, and bump their versions so other processes rebuild.
+        """
+        for scope in scopes:
+            version = self.bump_version(scope)
+            index = self.indexes.get(scope)
+            if index is None:
+                continue
+            if item is not None:
+                index.add(dict(item, terms=list(item['terms'])))
+            else:
+                index.remove(key)
+            if version is not None and index.version == version - 1:
+                index.version = version
+
+
+suggestion_indexes = SuggestionIndexes()
+
+
+def account_scopes(account_id):
+    return [str(account_id), ALL_ACCOUNTS] if account_id else [ALL_ACCOUNTS]
+
+
+def moved_scopes(instance):
+    """
+    Scopes ``instance`` left since it was loaded (see the models' from_db),
+    which still hold its old entry.
+    """
+    previous = getattr(instance, '_loaded_account_id', instance.account_id)
+    instance._loaded_account_id = instance.account_id
+    if previous == instance.account_id:
+        return []
+    return [scope for scope in account_scopes(previous) if scope not in account_scopes(instance.account_id)]
+
+
+def user_changed(user, deleted=False):
+    from boarding.models import JourneyInstance
+
+    scopes = account_scopes(user.account_id)
+    key = ('user', str(user.pk))
+    suggestion_indexes.apply(moved_scopes(user), key=key)
+    if deleted or not user.is_active:
+        suggestion_indexes.apply(scopes, key=key)
+    else:
+        suggestion_indexes.apply(scopes, item=_user_item({f: getattr(user, f) for f in USER_FIELDS}))
+
+    # Journey labels carry the user's name
+    if not deleted and any(scope in suggestion_indexes.indexes for scope in scopes):
+        for journey in JourneyInstance.objects.filter(
+            user=user, status__in=ACTIVE_JOURNEY_STATUSES
+        ).values(*JOURNEY_FIELDS, 'template__account_id'):
+            suggestion_indexes.apply(
+                account_scopes(journey.pop('template__account_id')), item=_journey_item(journey)
+            )
+
+
+def job_title_changed(job_title, deleted=False):
+    key = ('job_title', str(job_title.pk))
+    if deleted or not job_title.is_active:
+        suggestion_indexes.apply([GLOBAL], key=key)
+    else:
+        suggestion_indexes.apply([GLOBAL], item=_job_title_item(
+            {'id': job_title.pk, 'title': job_title.title, 'department': job_title.department}
+        ))
+
+
+def template_changed(template, deleted=False):
+    scopes = account_scopes(template.account_id)
+    key = ('template', str(template.pk))
+    suggestion_indexes.apply(moved_scopes(template), key=key)
+    if deleted or not template.is_active:
+        suggestion_indexes.apply(scopes, key=key)
+    else:
+        suggestion_indexes.apply(scopes, item=_template_item({f: getattr(template, f) for f in TEMPLATE_FIELDS}))
+
+
+def journey_changed(journey, deleted=False):
+    from boarding.models import JourneyInstance
+
+    key = ('journey', str(journey.pk))
+    row = None
+    if not deleted and journey.status in ACTIVE_JOURNEY_STATUSES:
+        row = JourneyInstance.objects.filter(pk=journey.pk).values(
+            *JOURNEY_FIELDS, 'template__account_id'
+        ).first()
+    if row is None:
+        from boarding.models import JourneyTemplate
+        account_id = JourneyTemplate.objects.filter(pk=journey.template_id).values_list(
+            'account_id', flat=True
+        ).first()
+        suggestion_indexes.apply(account_scopes(account_id), key=key)
+    else:
+        suggestion_indexes.apply(account_scopes(row.pop('template__account_id')), item=_journey_item(row))
+
+
+def invalidate_account(account_id):
+    """Force a rebuild of an account's index, e.g. after a bulk_create that sent no signals."""
+    for scope in account_scopes(account_id):
+        suggestion_indexes.bump_version(scope)
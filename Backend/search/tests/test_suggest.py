@@ -0,0 +1,50 @@
+"""
+Journey suggestions follow status changes made by queryset updates, which
+send no post_save.
+"""
+
+import pytest
+
+from accounts.models import Account
+from boarding.models import JourneyInstance, JourneyStep, JourneyTemplate
+from search.suggest import suggestion_indexes
+from users.models import User
+
+pytestmark = pytest.mark.django_db
+
+
+def journey_suggestions(account):
+    return [item for item in suggestion_indexes.suggest('zelda', account.pk) if item['type'] == 'journey']
+
+
+def test_journey_suggestion_follows_completion_and_reopening(django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        account = Account.objects.create(account_name='Suggest Co')
+        owner = User.objects.create_user(
+            username='zelda', email='zelda@example.com', password='zelda-pass-123',
+            first_name='Zelda', last_name='Hire', account=account
+        )
+        template = JourneyTemplate.objects.create(
+            account=account, journey_type='onboarding', title='Welcome', estimated_duration_days=5
+        )
+        JourneyStep.objects.create(template=template, title='Sign contract', order=1, due_days_from_start=1)
+        journey = JourneyInstance.objects.create(template=template, user=owner)
+        journey.start_journey()
+
+    [item] = journey_suggestions(account)
+    assert item['sublabel'] == 'in_progress'
+
+    step = journey.step_instances.get()
+    with django_capture_on_commit_callbacks(execute=True):
+        step.mark_completed()
+    journey.refresh_from_db()
+    assert journey.status == 'completed'
+    assert journey_suggestions(account) == []
+
+    with django_capture_on_commit_callbacks(execute=True):
+        step.status = 'pending'
+        step.save()
+    journey.refresh_from_db()
+    assert journey.status == 'in_progress'
+    [item] = journey_suggestions(account)
+    assert item['sublabel'] == 'in_progress'
@@ -0,0 +1,90 @@
+from django.apps import apps
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from accounts.tenancy import get_tenant
+
+from .backends import get_search_backend
+from .registry import SEARCH_MODELS
+from .suggest import suggestion_indexes
+
+TYPE_LABELS = {config['type']: label for label, config in SEARCH_MODELS.items()}
+MAX_LIMIT = 50
+MAX_SUGGESTIONS = 20
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def search(request):
+    """
+    Ranked search across users, templates, roles and permissions.
+    
+    Query params: q (required), types (comma-separated, e.g. user,template)
+    and limit (1-50, default 20). Account-bound results are limited to the
+    requesting user's account; users without one get no results.
+    """
+    query = request.query_params.get('q', '').strip()
+    if not query:
+        return Response({'error': 'q is required'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    types = request.query_params.get('types')
+    if types:
+        labels = [TYPE_LABELS[t] for t in types.split(',') if t in TYPE_LABELS]
+    else:
+        labels = list(SEARCH_MODELS)
+    
+    try:
+        limit = max(1, min(int(request.query_params.get('limit', 20)), MAX_LIMIT))
+    except ValueError:
+        limit = 20
+    
+    tenant = get_tenant(request)
+    if not tenant.unrestricted and tenant.account_id is None:
+        # The backends treat account_id=None as every account
+        return Response({'query': query, 'results': []})
+    entries = get_search_backend().search(query, labels, account_id=tenant.account_id, limit=limit)
+    
+    # One query per model to resolve display names
+    objects = {}
+    for label in {entry.model_label for entry in entries}:
+        ids = [entry.object_id for entry in entries if entry.model_label == label]
+        objects[label] = apps.get_model(label).objects.in_bulk(ids)
+    
+    results = []
+    for entry in entries:
+        obj = objects[entry.model_label].get(entry.object_id)
+        if obj is None:
+            continue
+        results.append({
+            'type': SEARCH_MODELS[entry.model_label]['type'],
+            'id': obj.pk,
+            'label': str(obj),
+        })
+    return Response({'query': query, 'results': results})
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def suggest(request):
+    """
+    Typeahead suggestions for the search modal.
+    
+    Query params: q and limit (default 8, max 20). Served from the in-memory
+    prefix indexes in search.suggest, so no query is made once they are warm.
+    """
+    query = request.query_params.get('q', '').strip()
+    if not query:
+        return Response({'query': query, 'results': []})
+    
+    try:
+        limit = max(1, min(int(request.query_params.get('limit', 8)), MAX_SUGGESTIONS))
+    except ValueError:
+        limit = 8
+    
+    tenant = get_tenant(request)
+    if not tenant.unrestricted and tenant.account_id is None:
+        return Response({'query': query, 'results': []})
+    results = suggestion_indexes.suggest(query, account_id=tenant.account_id, limit=limit)
+    return Response({'query': query, 'results': results})
@@ -5,13 +5,14 @@ from django.utils.html import format_html
 from django.urls import reverse, path
 from django.utils import timezone
 from django import forms
+from django.db import transaction
 from .utils import generate_strong_password
 import secrets
 import string
-from .models import User, UserAccount, JobTitle
-from roles_permissions.models import Permission
+from .models import User, UserAccount, JobTitle, EmailOutbox
+from roles_permissions.models import Permission, UserEffectivePermission
 
-from .services import EmailService
+from .services import EmailService, PasswordService
 
 
 class CustomUserPermissionWidget(forms.widgets.CheckboxSelectMultiple):
@@ -190,6 +191,17 @@ class CustomUserCreationForm(forms.ModelForm):
         
         # Add help text for password
         self.fields['username'].help_text = 'Username for login. A strong password will be auto-generated.'
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        account = cleaned_data.get('account')
+        is_active = cleaned_data.get('is_active', True)
+        # Early feedback only; User.save() does the race-safe seat check
+        if account and is_active and not account.can_add_users:
+            raise forms.ValidationError(
+                f"{account.account_name} has reached its limit of {account.max_users} users."
+            )
+        return cleaned_data
 
 
 # def generate_strong_password(length=12):
@@ -448,14 +460,24 @@ class UserAdmin(BaseUserAdmin):
     
     def deactivate_users(self, request, queryset):
         """Admin action to deactivate selected users."""
-        updated = queryset.update(is_active=False, employment_status='inactive')
+        user_ids = list(queryset.values_list('pk', flat=True))
+        with transaction.atomic():
+            updated = queryset.update(is_active=False, employment_status='inactive')
+            User.refresh_active_user_counts(User.objects.filter(pk__in=user_ids))
+            # update() skips post_save, so rebuild their effective permissions too
+            UserEffectivePermission.refresh_users(user_ids)
         self.message_user(request, f"{updated} users were deactivated.")
     
     deactivate_users.short_description = "Deactivate selected users"
     
     def activate_users(self, request, queryset):
         """Admin action to activate selected users."""
-        updated = queryset.update(is_active=True, employment_status='active')
+        user_ids = list(queryset.values_list('pk', flat=True))
+        with transaction.atomic():
+            updated = queryset.update(is_active=True, employment_status='active')
+            User.refresh_active_user_counts(User.objects.filter(pk__in=user_ids))
+            # update() skips post_save, so rebuild their effective permissions too
+            UserEffectivePermission.refresh_users(user_ids)
         self.message_user(request, f"{updated} users were activated.")
     
     activate_users.short_description = "Activate selected users"
@@ -469,13 +491,8 @@ class UserAdmin(BaseUserAdmin):
         print("🔐 BULK PASSWORD RESET INITIATED")
         print("="*70)
         
-        for user in queryset:
-            # Generate new password
-            new_password = generate_strong_password()
-            user.set_password(new_password)
-            user.must_change_password = True
-            user.save()
-            
+        # Hash all new passwords across the worker pool and write them in bulk
+        for user, new_password in PasswordService.reset_passwords(queryset, must_change_password=True):
             # Print each password clearly
             print(f"\n👤 User: {user.username} ({user.get_full_name()})")
             print(f"📧 Email: {user.email}")
@@ -584,25 +601,25 @@ class UserAdmin(BaseUserAdmin):
                     print(f"✅ Password verification successful for {obj.username}")
                 else:
                     print(f"❌ Password verification failed for {obj.username}")
-                # Send email with credentials
+                # Queue email with credentials (committed with the user row)
                 if obj.email:
-                    email_sent = EmailService.send_user_credentials_email(
+                    email_queued = EmailService.send_user_credentials_email(
                         user=obj,
                         password=password,
                         created_by=request.user
                     )
-                    if email_sent:
-                        print(":white_check_mark: Email sent successfully to user's email address")
+                    if email_queued:
+                        print(":white_check_mark: Credentials email queued for delivery")
                         self.message_user(
                             request,
-                            f"User '{obj.username}' created successfully and credentials sent to {obj.email}",
+                            f"User '{obj.username}' created successfully and credentials queued for {obj.email}",
                             level='success'
                         )
                     else:
-                        print(":x: Failed to send email - check email configuration")
+                        print(":x: Failed to queue email - check email configuration")
                         self.message_user(
                             request,
-                            f"User '{obj.username}' created but failed to send email to {obj.email}",
+                            f"User '{obj.username}' created but failed to queue email to {obj.email}",
                             level='warning'
                         )
                 else:
@@ -659,9 +676,7 @@ class UserAdmin(BaseUserAdmin):
         if request.method == 'POST':
             # Generate new password
             new_password = generate_strong_password()
-            user.set_password(new_password)
-            user.must_change_password = True
-            user.save()
+            PasswordService.set_password(user, new_password, must_change_password=True)
             
             # Print password to terminal
             print("\n" + "="*60)
@@ -855,4 +870,70 @@ class UserAccountAdmin(admin.ModelAdmin):
     def get_queryset(self, request):
         return super().get_queryset(request).select_related(
             'user', 'account', 'role'
-        )
\ No newline at end of file
+        )
+
+
+@admin.register(EmailOutbox)
+class EmailOutboxAdmin(admin.ModelAdmin):
+    """Admin for the email outbox and its dead letters."""
+    
+    list_display = [
+        'subject',
+        'to_email',
+        'status',
+        'attempts',
+        'next_attempt_at',
+        'sent_at',
+        'created_at'
+    ]
+    
+    list_filter = [
+        'status',
+        'created_at'
+    ]
+    
+    search_fields = [
+        'to_email',
+        'subject'
+    ]
+    
+    readonly_fields = [
+        'id',
+        'to_email',
+        'from_email',
+        'subject',
+        'user',
+        'status',
+        'attempts',
+        'max_attempts',
+        'next_attempt_at',
+        'claimed_at',
+        'last_error',
+        'sent_at',
+        'created_at',
+        'updated_at'
+    ]
+    
+    # Bodies can contain generated passwords, so they are never shown here
+    exclude = ['body', 'html_body', 'claim_token']
+    
+    ordering = ['-created_at']
+    
+    actions = ['retry_emails']
+    
+    def retry_emails(self, request, queryset):
+        """Admin action to requeue dead or pending emails for immediate delivery."""
+        updated = queryset.filter(
+            status__in=[EmailOutbox.STATUS_DEAD, EmailOutbox.STATUS_PENDING]
+        ).update(
+            status=EmailOutbox.STATUS_PENDING,
+            attempts=0,
+            next_attempt_at=timezone.now(),
+            claim_token=None
+        )
+        self.message_user(request, f"{updated} emails queued for retry.")
+    
+    retry_emails.short_description = "Retry selected emails"
+    
+    def has_add_permission(self, request):
+        return False
@@ -0,0 +1,320 @@
+"""
+Bulk user import from HRIS exports (CSV or NDJSON).
+
+The file is parsed one record at a time and processed in batches: each batch
+is validated against JobTitle/Account lookups that are loaded once, checked
+for existing usernames/emails with one query each, given generated passwords
+hashed in the PasswordService pool, and written with bulk_create in its own
+transaction. Credentials emails go to the outbox rather than being sent, and
+every rejected row is reported with its line number.
+
+bulk_create skips User.save() and the post_save signals, so the active user
+counters, search entries and typeahead indexes are updated here.
+"""
+
+import codecs
+import csv
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+from django.db.models.functions import Lower
+
+from accounts.models import Account
+from search import suggest
+from search.backends import get_search_backend
+
+from .models import JobTitle, User
+from .services import EmailService, PasswordService
+from .utils import generate_strong_password
+
+IMPORT_FORMATS = ('csv', 'ndjson')
+EMPLOYMENT_STATUSES = {value for value, _ in User.EMPLOYMENT_STATUS_CHOICES}
+TRUE_VALUES = {'1', 'true', 'yes', 'y'}
+FALSE_VALUES = {'0', 'false', 'no', 'n'}
+
+
+def iter_records(stream, fmt):
+    """
+    Yield (line number, record dict or None, error) from a binary stream.
+    Records are read lazily, so the file is never loaded into memory whole.
+    Bytes that are not UTF-8 end the file with one rejected row.
+    """
+    text = codecs.iterdecode(stream, 'utf-8-sig')
+    line_number = 0
+    try:
+        if fmt == 'csv':
+            reader = csv.DictReader(text)
+            for record in reader:
+                yield reader.line_num, record, None
+            return
+
+        for line_number, line in enumerate(text, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield line_number, None, f'Invalid JSON: {e}'
+                continue
+            if not isinstance(record, dict):
+                yield line_number, None, 'Each line must be a JSON object'
+                continue
+            yield line_number, record, None
+    except UnicodeDecodeError:
+        if fmt == 'csv':
+            line_number = reader.line_num
+        # The decoder cannot resync mid-file, so the rest of it is rejected
+        yield line_number + 1, None, 'File is not UTF-8 encoded; this and later rows were not imported'
+
+
+def detect_format(filename, default='csv'):
+    extension = (filename or '').rsplit('.', 1)[-1].lower()
+    if extension in ('ndjson', 'jsonl'):
+        return 'ndjson'
+    if extension == 'csv':
+        return 'csv'
+    return default
+
+
+class UserImporter:
+    """Import users from an iterable of records, batch by batch."""
+
+    batch_size = 500
+
+    def __init__(self, created_by=None, account=None, accounts=None, send_emails=True, batch_size=None):
+        self.created_by = created_by
+        self.default_account = account
+        self.send_emails = send_emails
+        self.batch_size = batch_size or self.batch_size
+
+        # Lookups are loaded once for the whole file
+        self.job_titles = {}
+        for job_title in JobTitle.objects.filter(is_active=True):
+            self.job_titles[str(job_title.pk)] = job_title
+            self.job_titles[job_title.title.lower()] = job_title
+        # ``accounts`` limits which accounts rows may name (the importer's tenant)
+        self.accounts = {}
+        for account_row in (Account.objects.all() if accounts is None else accounts):
+            self.accounts[str(account_row.pk)] = account_row
+            self.accounts[account_row.account_name.lower()] = account_row
+
+        self.summary = {'rows': 0, 'created': 0, 'failed': 0, 'emails_queued': 0}
+        self.errors = []
+        self.created = []
+        self.seen_usernames = set()
+        self.seen_emails = set()
+
+    def run(self, records):
+        """Import ``records`` as produced by ``iter_records``; returns the report."""
+        batch = []
+        for line_number, record, error in records:
+            self.summary['rows'] += 1
+            if error:
+                self.reject(line_number, record, [error])
+                continue
+            batch.append((line_number, record))
+            if len(batch) >= self.batch_size:
+                self.import_batch(batch)
+                batch = []
+        if batch:
+            self.import_batch(batch)
+        return self.report()
+
+    def report(self):
+        return {'summary': self.summary, 'errors': self.errors, 'created': self.created}
+
+    def reject(self, line_number, record, errors):
+        self.summary['failed'] += 1
+        self.errors.append({
+            'row': line_number,
+            'username': (record or {}).get('username'),
+            'errors': errors,
+        })
+
+    @staticmethod
+    def clean(value):
+        if value is None:
+            return ''
+        return str(value).strip()
+
+    def parse_bool(self, value, default):
+        if isinstance(value, bool):
+            return value
+        value = self.clean(value).lower()
+        if not value:
+            return default
+        if value in TRUE_VALUES:
+            return True
+        if value in FALSE_VALUES:
+            return False
+        raise ValueError(value)
+
+    def build_user(self, record):
+        """Return (unsaved User, []) or (None, [errors]) for one record."""
+        errors = []
+        username = self.clean(record.get('username'))
+        email = self.clean(record.get('email')).lower()
+
+        if not username:
+            errors.append('username is required')
+        elif len(username) > 150:
+            errors.append('username is longer than 150 characters')
+        elif username in self.seen_usernames:
+            errors.append(f"username '{username}' appears more than once in the file")
+
+        if email:
+            try:
+                validate_email(email)
+            except ValidationError:
+                errors.append(f"'{email}' is not a valid email address")
+            else:
+                if email in self.seen_emails:
+                    errors.append(f"email '{email}' appears more than once in the file")
+
+        job_title = None
+        job_title_key = self.clean(record.get('job_title'))
+        if job_title_key:
+            job_title = self.job_titles.get(job_title_key) or self.job_titles.get(job_title_key.lower())
+            if job_title is None:
+                errors.append(f"Unknown or inactive job title '{job_title_key}'")
+
+        account = self.default_account
+        account_key = self.clean(record.get('account'))
+        if account_key:
+            account = self.accounts.get(account_key) or self.accounts.get(account_key.lower())
+            if account is None:
+                errors.append(f"Unknown account '{account_key}'")
+
+        employment_status = self.clean(record.get('employment_status')) or 'active'
+        if employment_status not in EMPLOYMENT_STATUSES:
+            errors.append(f"Invalid employment_status '{employment_status}'")
+
+        flags = {}
+        for field, default in (('is_active', True), ('is_staff', False)):
+            try:
+                flags[field] = self.parse_bool(record.get(field), default)
+            except ValueError:
+                errors.append(f"{field} must be true or false")
+
+        if errors:
+            return None, errors
+
+        if username:
+            self.seen_usernames.add(username)
+        if email:
+            self.seen_emails.add(email)
+        return User(
+            username=username,
+            email=email,
+            first_name=self.clean(record.get('first_name'))[:150],
+            last_name=self.clean(record.get('last_name'))[:150],
+            department=self.clean(record.get('department')) or (job_title.department if job_title else None),
+            job_title=job_title,
+            account=account,
+            employment_status=employment_status,
+            created_by=self.created_by,
+            **flags
+        ), []
+
+    def import_batch(self, batch):
+        candidates = []
+        for line_number, record in batch:
+            user, errors = self.build_user(record)
+            if errors:
+                self.reject(line_number, record, errors)
+            else:
+                candidates.append((line_number, record, user))
+        if not candidates:
+            return
+
+        # One query each for clashes with users already in the database
+        usernames = [user.username for _, _, user in candidates]
+        emails = [user.email for _, _, user in candidates if user.email]
+        taken_usernames = set(User.objects.filter(username__in=usernames).values_list('username', flat=True))
+        taken_emails = set(
+            User.objects.annotate(email_lower=Lower('email')).filter(
+                email_lower__in=emails
+            ).values_list('email_lower', flat=True)
+        )
+        accepted = []
+        for line_number, record, user in candidates:
+            errors = []
+            if user.username in taken_usernames:
+                errors.append(f"username '{user.username}' already exists")
+            if user.email and user.email in taken_emails:
+                errors.append(f"email '{user.email}' already exists")
+            if errors:
+                self.reject(line_number, record, errors)
+            else:
+                accepted.append((line_number, record, user))
+
+        with transaction.atomic():
+            accepted = self.claim_account_seats(accepted)
+            if not accepted:
+                return
+            users = [user for _, _, user in accepted]
+
+            passwords = [generate_strong_password() for _ in users]
+            for user, encoded in zip(users, PasswordService.hash_passwords(passwords)):
+                PasswordService.apply_hash(user, encoded, must_change_password=True)
+            User.objects.bulk_create(users, batch_size=self.batch_size)
+
+            job_title_deltas = {}
+            for user in users:
+                if user.is_active and user.job_title_id:
+                    job_title_deltas[user.job_title_id] = job_title_deltas.get(user.job_title_id, 0) + 1
+            for job_title_id, delta in job_title_deltas.items():
+                JobTitle.adjust_active_user_count(job_title_id, delta)
+
+            get_search_backend().index_new_instances(users)
+            if self.send_emails:
+                self.summary['emails_queued'] += EmailService.queue_credentials_emails(
+                    zip(users, passwords), created_by=self.created_by
+                )
+
+            account_ids = {user.account_id for user in users}
+            transaction.on_commit(lambda: self.invalidate_suggestions(account_ids))
+
+        self.summary['created'] += len(users)
+        for line_number, _, user in accepted:
+            self.created.append({'row': line_number, 'id': str(user.pk), 'username': user.username})
+
+    @staticmethod
+    def invalidate_suggestions(account_ids):
+        for account_id in account_ids:
+            suggest.invalidate_account(account_id)
+
+    def claim_account_seats(self, accepted):
+        """
+        Reserve max_users seats for the batch's active users, one conditional
+        UPDATE per account. Rows that don't fit are rejected.
+        """
+        by_account = {}
+        for entry in accepted:
+            user = entry[2]
+            if user.is_active and user.account_id:
+                by_account.setdefault(user.account_id, []).append(entry)
+
+        rejected = set()
+        for account_id, entries in by_account.items():
+            if Account.adjust_active_user_count(account_id, len(entries), enforce_limit=True):
+                continue
+            account = Account.objects.only('account_name', 'max_users', 'active_user_count').get(pk=account_id)
+            free = max(0, account.max_users - account.active_user_count)
+            if free and Account.adjust_active_user_count(account_id, free, enforce_limit=True):
+                overflow = entries[free:]
+            else:
+                overflow = entries
+            for line_number, record, user in overflow:
+                self.reject(line_number, record, [f"Account '{account.account_name}' has reached its maximum number of users"])
+                rejected.add(user.pk)
+        return [entry for entry in accepted if entry[2].pk not in rejected]
+
+
+def import_users(stream, fmt='csv', **options):
+    """Parse ``stream`` and import it; returns the report dict."""
+    if fmt not in IMPORT_FORMATS:
+        raise ValueError(f"Unsupported format '{fmt}'")
+    return UserImporter(**options).run(iter_records(stream, fmt))
@@ -0,0 +1,86 @@
+"""
+Management command to benchmark write throughput of the configured database.
+
+Each worker thread replays request-shaped units of work: take a connection
+the way a request would (close_old_connections), create a user and update
+it inside one transaction (which also writes its search entry), then end the
+"request". Run it once per DB_ENGINE / DB_POOL / DB_SQLITE_TUNED setting to
+compare modes; the rows it creates are deleted afterwards.
+"""
+
+import statistics
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, close_old_connections, connection, transaction
+
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = 'Benchmark request throughput under concurrent writes for the configured database'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8, help='Concurrent writer threads')
+        parser.add_argument('--requests', type=int, default=50, help='Requests per thread')
+
+    def handle(self, *args, **options):
+        threads, per_thread = options['threads'], options['requests']
+        prefix = f'dbbench-{uuid.uuid4().hex[:8]}'
+        latencies = []
+        errors = []
+        lock = threading.Lock()
+
+        def request(worker, n):
+            close_old_connections()
+            try:
+                with transaction.atomic():
+                    user = User(username=f'{prefix}-{worker}-{n}', email=f'{prefix}-{worker}-{n}@example.com')
+                    user.save()
+                    user.last_name = 'Benchmark'
+                    user.save(update_fields=['last_name', 'updated_at'])
+            finally:
+                close_old_connections()
+
+        def worker(worker_id):
+            for n in range(per_thread):
+                started = time.perf_counter()
+                try:
+                    request(worker_id, n)
+                except OperationalError as e:
+                    with lock:
+                        errors.append(str(e))
+                    continue
+                with lock:
+                    latencies.append(time.perf_counter() - started)
+            connection.close()
+
+        database = settings.DATABASES['default']
+        self.stdout.write(
+            f"🏁 {database['ENGINE']} (CONN_MAX_AGE={database.get('CONN_MAX_AGE', 0)}): "
+            f"{threads} threads x {per_thread} requests"
+        )
+        workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+        started = time.perf_counter()
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        User.objects.filter(username__startswith=prefix).delete()
+
+        if latencies:
+            latencies.sort()
+            p95 = latencies[int(len(latencies) * 0.95) - 1] if len(latencies) >= 20 else latencies[-1]
+            self.stdout.write(
+                f"   {len(latencies) / elapsed:8.1f} requests/sec   "
+                f"p50 {statistics.median(latencies) * 1000:.1f} ms   p95 {p95 * 1000:.1f} ms"
+            )
+        if errors:
+            self.stdout.write(self.style.ERROR(f"❌ {len(errors)} requests failed, e.g. {errors[0]}"))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"✅ {len(latencies)} requests in {elapsed:.2f}s, no errors"))
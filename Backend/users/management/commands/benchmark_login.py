@@ -0,0 +1,61 @@
+"""
+Management command to benchmark the login credential check.
+
+Compares the legacy CustomLoginView path (check_password() in the view followed
+by dj_rest_auth's authenticate()) with the single-hash LoginSerializer path.
+Everything runs inside a transaction that is rolled back, so no data is kept.
+"""
+
+import time
+
+from django.contrib.auth import authenticate
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import RequestFactory
+
+from users.models import User
+from users.serializers import LoginSerializer
+
+
+class Command(BaseCommand):
+    help = 'Benchmark logins per second for the legacy and single-hash login paths'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20, help='Logins per path')
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        password = 'Bench-Password-123!'
+        request = RequestFactory().post('/api/auth/login/')
+
+        with transaction.atomic():
+            user = User(username='login_benchmark_user', email='login-benchmark@example.com')
+            user.set_password(password)
+            user.save()
+
+            def legacy_login():
+                candidate = User.objects.get(email=user.email)
+                candidate.check_password(password)
+                authenticate(request, username=user.username, password=password)
+
+            def single_hash_login():
+                serializer = LoginSerializer(
+                    data={'username': user.email, 'password': password},
+                    context={'request': request}
+                )
+                serializer.is_valid(raise_exception=True)
+
+            results = {}
+            for name, login in (('legacy', legacy_login), ('single-hash', single_hash_login)):
+                login()  # warm up
+                started = time.perf_counter()
+                for _ in range(iterations):
+                    login()
+                elapsed = time.perf_counter() - started
+                results[name] = iterations / elapsed
+                self.stdout.write(f"{name:>12}: {results[name]:8.2f} logins/sec ({elapsed:.2f}s for {iterations})")
+
+            transaction.set_rollback(True)
+
+        speedup = results['single-hash'] / results['legacy']
+        self.stdout.write(self.style.SUCCESS(f"Single-hash path is {speedup:.2f}x the legacy throughput"))
@@ -0,0 +1,67 @@
+"""
+Management command to import users from an HRIS CSV or NDJSON export.
+
+Rows are processed in batches with bulk inserts; see users.imports.
+"""
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.models import Account
+from users.imports import IMPORT_FORMATS, detect_format, import_users
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = 'Import users from a CSV or NDJSON file, queueing credentials emails'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV or NDJSON file to import')
+        parser.add_argument('--format', choices=IMPORT_FORMATS, help='File format (default: from the file extension)')
+        parser.add_argument('--account', help='Account id or name for rows without an account column')
+        parser.add_argument('--created-by', help='Username recorded as the creator of the imported users')
+        parser.add_argument('--batch-size', type=int, default=500, help='Rows per bulk insert')
+        parser.add_argument('--no-email', action='store_true', help="Don't queue credentials emails")
+
+    def handle(self, *args, **options):
+        fmt = options['format'] or detect_format(options['path'])
+
+        account = None
+        if options['account']:
+            account = Account.objects.filter(account_name__iexact=options['account']).first()
+            if account is None:
+                try:
+                    account = Account.objects.filter(pk=options['account']).first()
+                except ValidationError:
+                    pass
+            if account is None:
+                raise CommandError(f"Account '{options['account']}' not found")
+
+        created_by = None
+        if options['created_by']:
+            created_by = User.objects.filter(username=options['created_by']).first()
+            if created_by is None:
+                raise CommandError(f"User '{options['created_by']}' not found")
+
+        self.stdout.write(f"📥 Importing users from {options['path']} ({fmt})...")
+        try:
+            with open(options['path'], 'rb') as stream:
+                report = import_users(
+                    stream, fmt,
+                    created_by=created_by,
+                    account=account,
+                    send_emails=not options['no_email'],
+                    batch_size=options['batch_size'],
+                )
+        except OSError as e:
+            raise CommandError(str(e))
+
+        for error in report['errors']:
+            self.stdout.write(self.style.ERROR(
+                f"❌ Row {error['row']} ({error['username'] or '-'}): {'; '.join(error['errors'])}"
+            ))
+        summary = report['summary']
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {summary['created']} of {summary['rows']} rows imported, {summary['failed']} failed, "
+            f"{summary['emails_queued']} credentials emails queued"
+        ))
@@ -0,0 +1,40 @@
+"""
+Management command to reconcile the denormalized active user counters.
+
+Account.active_user_count and JobTitle.active_user_count are maintained
+incrementally by User.save(); run this after raw SQL or queryset updates
+that bypass it.
+"""
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F
+
+from accounts.models import Account
+from users.models import JobTitle
+
+
+class Command(BaseCommand):
+    help = 'Recompute active user counters on accounts and job titles'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only report counters that drifted')
+
+    def handle(self, *args, **options):
+        drift = {}
+        for model in (Account, JobTitle):
+            drift[model] = model.objects.annotate(
+                actual_count=model.actual_active_user_count()
+            ).exclude(active_user_count=F('actual_count')).count()
+            self.stdout.write(f"🔍 {model._meta.verbose_name_plural} with drifted counters: {drift[model]}")
+
+        if options['dry_run'] or not any(drift.values()):
+            return
+
+        with transaction.atomic():
+            accounts = Account.recount_active_users()
+            job_titles = JobTitle.recount_active_users()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Reconciled counters for {accounts} accounts and {job_titles} job titles"
+        ))
@@ -0,0 +1,39 @@
+"""
+Management command that delivers emails from the EmailOutbox.
+Run it once from cron, or with --loop as a long-running worker.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from users.services import EmailService
+
+
+class Command(BaseCommand):
+    help = 'Send due emails from the outbox, retrying failures with backoff'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, help='Emails sent per connection (default EMAIL_OUTBOX_BATCH_SIZE)')
+        parser.add_argument('--loop', action='store_true', help='Keep polling the outbox instead of exiting')
+        parser.add_argument('--interval', type=float, default=5.0, help='Seconds to sleep when the outbox is empty')
+
+    def handle(self, *args, **options):
+        batch_size = options.get('batch_size')
+        total_sent = 0
+        while True:
+            stats = EmailService.process_outbox(batch_size=batch_size)
+            processed = sum(stats.values())
+            total_sent += stats['sent']
+            if processed:
+                self.stdout.write(
+                    f"📧 Sent: {stats['sent']}  Retrying: {stats['retried']}  Dead letters: {stats['dead']}"
+                )
+            if options['loop']:
+                if not processed:
+                    time.sleep(options['interval'])
+                continue
+            # One-shot mode drains the outbox, but stops once a batch delivers nothing
+            if not stats['sent']:
+                break
+        self.stdout.write(self.style.SUCCESS(f"Done. {total_sent} emails sent."))
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.30 on 2026-10-18 03:48
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_active_user_count(apps, schema_editor):
+    JobTitle = apps.get_model('users', 'JobTitle')
+    User = apps.get_model('users', 'User')
+    users = User.objects.filter(job_title=OuterRef('pk'), is_active=True).order_by().values('job_title')
+    JobTitle.objects.update(active_user_count=Coalesce(
+        Subquery(users.annotate(n=Count('pk')).values('n'), output_field=IntegerField()),
+        0
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0010_email_outbox'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobtitle',
+            name='active_user_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of active users with this job title'),
+        ),
+        migrations.RunPython(populate_active_user_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.30 on 2026-10-18 04:09
+
+from django.db import migrations, models
+import zeroqueue.ids
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0011_jobtitle_active_user_count'),
+    ]
+
+    # The default is applied in Python, so only the migration state changes;
+    # running AlterField would make SQLite rebuild every table.
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='emailoutbox',
+                    name='id',
+                    field=models.UUIDField(default=zeroqueue.ids.uuid7, editable=False, primary_key=True, serialize=False),
+                ),
+                migrations.AlterField(
+                    model_name='jobtitle',
+                    name='id',
+                    field=models.UUIDField(default=zeroqueue.ids.uuid7, editable=False, primary_key=True, serialize=False),
+                ),
+                migrations.AlterField(
+                    model_name='user',
+                    name='id',
+                    field=models.UUIDField(default=zeroqueue.ids.uuid7, editable=False, primary_key=True, serialize=False),
+                ),
+                migrations.AlterField(
+                    model_name='useraccount',
+                    name='id',
+                    field=models.UUIDField(default=zeroqueue.ids.uuid7, editable=False, primary_key=True, serialize=False),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.30 on 2026-10-18 04:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0012_alter_emailoutbox_id_alter_jobtitle_id_alter_user_id_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['account', 'last_name', 'first_name', 'id'], name='users_account_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='useraccount',
+            index=models.Index(fields=['account', 'user'], name='user_accounts_account_idx'),
+        ),
+    ]
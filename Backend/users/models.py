@@ -1,14 +1,17 @@
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.utils import timezone
-import uuid
+from zeroqueue.ids import uuid7
 
 
 class JobTitle(models.Model):
     """
     Predefined job titles for users and boarding template mapping.
     """
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     
     title = models.CharField(
         max_length=100,
@@ -32,6 +35,13 @@ class JobTitle(models.Model):
         help_text='Whether this job title is available for selection'
     )
     
+    # Denormalized counter maintained by User.save() and the user post_delete signal
+    active_user_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text='Number of active users with this job title'
+    )
+    
     # boarding_template_title = models.CharField(
     #     max_length=100,
     #     blank=True,
@@ -62,7 +72,34 @@ class JobTitle(models.Model):
     @property
     def user_count(self):
         """Return number of users with this job title."""
-        return self.users.filter(is_active=True).count()
+        return self.active_user_count
+    
+    @classmethod
+    def adjust_active_user_count(cls, job_title_id, delta):
+        """Atomically move active_user_count by ``delta``."""
+        queryset = cls.objects.filter(pk=job_title_id)
+        if delta < 0:
+            queryset = queryset.filter(active_user_count__gte=-delta)
+        return bool(queryset.update(active_user_count=F('active_user_count') + delta))
+    
+    @classmethod
+    def actual_active_user_count(cls):
+        """Subquery expression counting active users per job title."""
+        users = User.objects.filter(
+            job_title=OuterRef('pk'), is_active=True
+        ).order_by().values('job_title')
+        return Coalesce(
+            Subquery(users.annotate(n=Count('pk')).values('n'), output_field=IntegerField()),
+            0
+        )
+    
+    @classmethod
+    def recount_active_users(cls, job_title_ids=None):
+        """Recompute active_user_count from the users table; returns rows updated."""
+        queryset = cls.objects.all()
+        if job_title_ids is not None:
+            queryset = queryset.filter(pk__in=job_title_ids)
+        return queryset.update(active_user_count=cls.actual_active_user_count())
 
 
 class User(AbstractUser):
@@ -72,7 +109,7 @@ class User(AbstractUser):
     """
     
     # Override the primary key to use UUID
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     
     # Enhanced user information
     # employee_id = models.CharField(
@@ -212,6 +249,10 @@ class User(AbstractUser):
         verbose_name = 'User'
         verbose_name_plural = 'Users'
         ordering = ['last_name', 'first_name', 'username']
+        indexes = [
+            # Tenant-scoped user lists, in the API's cursor order
+            models.Index(fields=['account', 'last_name', 'first_name', 'id'], name='users_account_name_idx'),
+        ]
         
     def __str__(self):
         if self.first_name and self.last_name:
@@ -269,12 +310,11 @@ class User(AbstractUser):
         return self.has_role_in_account('admin', account)
     
     def get_permissions_for_account(self, account):
-        """Get all permissions for user in a specific account."""
-        if self.account == account and self.role and self.is_active:
-            return self.role.rolepermission_set.filter(is_granted=True).values_list(
-                'permission__codename', flat=True
-            )
-        return []
+        """Get all permission codenames (role and custom) for user in a specific account."""
+        if account is not None and self.account_id == account.pk and self.is_active:
+            from roles_permissions.engine import user_permissions
+            return user_permissions(self)
+        return frozenset()
     
     def set_password(self, raw_password):
         """Override to track password change time."""
@@ -282,6 +322,82 @@ class User(AbstractUser):
         self.password_changed_at = timezone.now()
         self.must_change_password = False
     
+    COUNTER_FIELDS = {'is_active', 'account', 'account_id', 'job_title', 'job_title_id'}
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember what the row counted towards so save() can apply deltas
+        if {'is_active', 'account_id', 'job_title_id'}.issubset(field_names):
+            instance._loaded_counter_state = instance.counter_state()
+        # Lets boarding.signals refresh the template this user moved away from
+        if 'template_id' in field_names:
+            instance._loaded_template_id = instance.template_id
+        # Lets search.suggest drop the user from the account it moved away from
+        if 'account_id' in field_names:
+            instance._loaded_account_id = instance.account_id
+        return instance
+    
+    def counter_state(self):
+        """Return the (account_id, job_title_id) this user counts towards, if active."""
+        if not self.is_active:
+            return (None, None)
+        return (self.account_id, self.job_title_id)
+    
+    def save(self, *args, **kwargs):
+        """
+        Save and keep the active user counters on Account and JobTitle in step.
+        
+        New active users claim an account seat with a conditional UPDATE, which
+        is what enforces max_users; a full account raises ValidationError and
+        rolls the insert back.
+        """
+        update_fields = kwargs.get('update_fields')
+        track = update_fields is None or bool(self.COUNTER_FIELDS & set(update_fields))
+        creating = self._state.adding
+        previous = (None, None) if creating else getattr(self, '_loaded_counter_state', None)
+        
+        if not track or previous is None:
+            super().save(*args, **kwargs)
+            return
+        
+        from accounts.models import Account
+        
+        current = self.counter_state()
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            
+            old_account, old_job_title = previous
+            new_account, new_job_title = current
+            if old_account != new_account:
+                if old_account:
+                    Account.adjust_active_user_count(old_account, -1)
+                if new_account and not Account.adjust_active_user_count(
+                    new_account, 1, enforce_limit=creating
+                ):
+                    raise ValidationError(
+                        'This account has reached its maximum number of users.'
+                    )
+            if old_job_title != new_job_title:
+                if old_job_title:
+                    JobTitle.adjust_active_user_count(old_job_title, -1)
+                if new_job_title:
+                    JobTitle.adjust_active_user_count(new_job_title, 1)
+        
+        self._loaded_counter_state = current
+    
+    @classmethod
+    def refresh_active_user_counts(cls, users):
+        """
+        Recount the counters touched by ``users`` after a queryset update,
+        which bypasses save().
+        """
+        from accounts.models import Account
+        
+        rows = list(users.order_by().values_list('account_id', 'job_title_id').distinct())
+        Account.recount_active_users({account for account, _ in rows if account})
+        JobTitle.recount_active_users({job_title for _, job_title in rows if job_title})
+    
     # def save(self, *args, **kwargs):
     #     """Override save to ensure proper database transactions."""
     #     # Ensure employee_id is uppercase if provided
@@ -298,7 +414,7 @@ class UserAccount(models.Model):
     Represents a user's membership in a company account.
     """
     
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     
     # Relationships
     user = models.ForeignKey(User, on_delete=models.CASCADE)
@@ -375,6 +491,9 @@ class UserAccount(models.Model):
         verbose_name_plural = 'User Accounts'
         unique_together = ['user', 'account']
         ordering = ['account__account_name', 'user__last_name', 'user__first_name']
+        indexes = [
+            models.Index(fields=['account', 'user'], name='user_accounts_account_idx'),
+        ]
         
     def __str__(self):
         return f"{self.user.get_full_name()} @ {self.account.account_name} ({self.role})"
@@ -455,4 +574,70 @@ class UserAccount(models.Model):
         self.is_active = False
         self.user.employment_status = 'terminated'
         self.user.save()
-        self.save()
\ No newline at end of file
+        self.save()
+
+class EmailOutbox(models.Model):
+    """
+    Durable queue of outgoing emails.
+    Rows are written inside the request transaction and delivered later by
+    the ``send_queued_emails`` management command.
+    """
+    
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
+    
+    STATUS_PENDING = 'pending'
+    STATUS_SENDING = 'sending'
+    STATUS_SENT = 'sent'
+    STATUS_DEAD = 'dead'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_SENDING, 'Sending'),
+        (STATUS_SENT, 'Sent'),
+        (STATUS_DEAD, 'Dead Letter'),
+    ]
+    
+    # Message
+    to_email = models.EmailField(help_text='Recipient address')
+    from_email = models.CharField(max_length=254, blank=True)
+    subject = models.CharField(max_length=255)
+    body = models.TextField(blank=True, help_text='Plain text body (cleared once delivered)')
+    html_body = models.TextField(blank=True, help_text='HTML alternative (cleared once delivered)')
+    
+    # Delivery state
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default=STATUS_PENDING,
+        help_text='Delivery status of this email'
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    claim_token = models.UUIDField(null=True, blank=True, editable=False)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    
+    # Audit fields
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    user = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='queued_emails',
+        help_text='User this email is about'
+    )
+    
+    class Meta:
+        db_table = 'email_outbox'
+        verbose_name = 'Queued Email'
+        verbose_name_plural = 'Email Outbox'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='email_outbox_due_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.subject} -> {self.to_email} ({self.status})"
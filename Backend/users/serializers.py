@@ -1,8 +1,12 @@
-from rest_framework import serializers
+from rest_framework import serializers, exceptions
 from django.contrib.auth.password_validation import validate_password
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.validators import validate_email
+from dj_rest_auth.serializers import LoginSerializer as BaseLoginSerializer
 from .models import User, UserAccount, JobTitle
 from .utils import generate_strong_password
 from roles_permissions.serializers import PermissionSerializer
+from accounts.tenancy import TenantScopedSerializerMixin
 
 
 class JobTitleSerializer(serializers.ModelSerializer):
@@ -122,9 +126,11 @@ class UserListSerializer(serializers.ModelSerializer):
         ]
     
 
-class UserCreateSerializer(serializers.ModelSerializer):
+class UserCreateSerializer(TenantScopedSerializerMixin, serializers.ModelSerializer):
     """Serializer for creating users with auto-generated passwords."""
     
+    tenant_account_field = 'account'
+    
     class Meta:
         model = User
         fields = [
@@ -139,6 +145,15 @@ class UserCreateSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Selected job title is not active.")
         return value
     
+    def validate(self, attrs):
+        """Refuse active users for an account with no free seats."""
+        account = attrs.get('account')
+        if account is not None and attrs.get('is_active', True) and not account.can_add_users:
+            raise serializers.ValidationError(
+                {'account': ['This account has reached its maximum number of users.']}
+            )
+        return attrs
+    
     def create(self, validated_data):
         # Generate strong password
         password = generate_strong_password()
@@ -157,9 +172,11 @@ class UserCreateSerializer(serializers.ModelSerializer):
         return user
 
 
-class UserAccountSerializer(serializers.ModelSerializer):
+class UserAccountSerializer(TenantScopedSerializerMixin, serializers.ModelSerializer):
     """Full UserAccount serializer."""
     
+    tenant_fields = {'user': 'account', 'account': 'pk'}
+    
     user_name = serializers.CharField(source='user.get_full_name', read_only=True)
     account_name = serializers.CharField(source='account.account_name', read_only=True)
     role_name = serializers.CharField(source='role.display_name', read_only=True)
@@ -182,9 +199,11 @@ class UserAccountSerializer(serializers.ModelSerializer):
         ]
 
 
-class UserAccountCreateSerializer(serializers.ModelSerializer):
+class UserAccountCreateSerializer(TenantScopedSerializerMixin, serializers.ModelSerializer):
     """Serializer for creating UserAccount relationships."""
     
+    tenant_fields = {'user': 'account', 'account': 'pk'}
+    
     class Meta:
         model = UserAccount
         fields = [
@@ -217,6 +236,45 @@ class UserAccountCreateSerializer(serializers.ModelSerializer):
         return data
 
 
+class LoginSerializer(BaseLoginSerializer):
+    """
+    Login serializer that resolves the user once and verifies the hash once.
+
+    The stock serializer goes through ``authenticate()``, which repeats the
+    user lookup and password check that ``CustomLoginView`` needs anyway.
+    """
+
+    backend = 'django.contrib.auth.backends.ModelBackend'
+
+    def get_user_by_identifier(self, identifier):
+        """Look up a user by email when the identifier looks like one, else by username."""
+        try:
+            validate_email(identifier)
+        except DjangoValidationError:
+            return User.objects.filter(username=identifier).first()
+        return User.objects.filter(email__iexact=identifier).first()
+
+    def get_auth_user(self, username, email, password):
+        identifier = email or username
+        if not identifier or not password:
+            msg = 'Must include either "username" or "email" and "password".'
+            raise exceptions.ValidationError(msg)
+
+        user = self.get_user_by_identifier(identifier)
+        if user is None:
+            # Run the hasher once anyway so unknown users take as long as
+            # wrong passwords (same mitigation as ModelBackend).
+            User().set_password(password)
+            return None
+
+        if not user.check_password(password):
+            return None
+
+        # django_login() needs to know which backend "authenticated" the user
+        user.backend = self.backend
+        return user
+
+
 class PasswordChangeSerializer(serializers.Serializer):
     """Serializer for password change."""
     
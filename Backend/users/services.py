@@ -1,68 +1,361 @@
-from django.core.mail import send_mail, EmailMultiAlternatives
+from django.core.mail import send_mail, EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.db.models import Q
 from django.template.loader import render_to_string
 from django.utils.html import strip_tags
 from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.utils import timezone
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import atexit
+import uuid
+from datetime import timedelta
+import threading
 import logging
 logger = logging.getLogger(__name__)
+
+
+def _init_password_worker():
+    """Make sure Django is configured inside freshly spawned pool workers."""
+    import django
+    django.setup()
+
+
+def _hash_password(raw_password):
+    """Hash a password inside a pool worker."""
+    return make_password(raw_password)
+
+
+class PasswordService:
+    """
+    Service class for password hashing.
+
+    Hashing is CPU bound, so it runs in a bounded process pool instead of on
+    the request thread. The pool size comes from PASSWORD_HASH_WORKERS; set it
+    to 0 to hash inline (useful in tests and management shells).
+    """
+    _executor = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_executor(cls):
+        """Return the shared process pool, creating it on first use."""
+        workers = getattr(settings, 'PASSWORD_HASH_WORKERS', 0)
+        if workers <= 0:
+            return None
+        with cls._lock:
+            if cls._executor is None:
+                # spawn rather than fork: the web process is multi-threaded
+                cls._executor = ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_password_worker,
+                )
+                atexit.register(cls.shutdown)
+        return cls._executor
+
+    @classmethod
+    def shutdown(cls):
+        with cls._lock:
+            if cls._executor is not None:
+                cls._executor.shutdown(wait=False, cancel_futures=True)
+                cls._executor = None
+
+    @classmethod
+    def hash_password(cls, raw_password):
+        """Return the encoded hash for a single password."""
+        executor = cls.get_executor()
+        if executor is None:
+            return make_password(raw_password)
+        return executor.submit(_hash_password, raw_password).result()
+
+    @classmethod
+    def hash_passwords(cls, raw_passwords):
+        """Return encoded hashes for many passwords, spread across the pool."""
+        raw_passwords = list(raw_passwords)
+        executor = cls.get_executor()
+        if executor is None:
+            return [make_password(raw) for raw in raw_passwords]
+        workers = getattr(settings, 'PASSWORD_HASH_WORKERS', 1)
+        chunksize = max(1, len(raw_passwords) // (workers * 4))
+        return list(executor.map(_hash_password, raw_passwords, chunksize=chunksize))
+
+    @staticmethod
+    def apply_hash(user, encoded_password, must_change_password):
+        """Set an already-encoded password on a user without re-hashing."""
+        now = timezone.now()
+        user.password = encoded_password
+        user.password_changed_at = now
+        user.must_change_password = must_change_password
+        user.updated_at = now
+
+    @classmethod
+    def set_password(cls, user, raw_password, must_change_password=False):
+        """
+        Hash and store a new password for one user.
+        Only the password columns are written; the hash is not re-verified.
+        """
+        cls.apply_hash(user, cls.hash_password(raw_password), must_change_password)
+        user.save(update_fields=['password', 'password_changed_at', 'must_change_password', 'updated_at'])
+        return user
+
+    @classmethod
+    def reset_passwords(cls, users, must_change_password=True, batch_size=500):
+        """
+        Generate and store fresh passwords for many users.
+        Returns a list of (user, raw_password) tuples.
+        """
+        from .models import User
+        from .utils import generate_strong_password
+
+        users = list(users)
+        raw_passwords = [generate_strong_password() for _ in users]
+        for user, encoded in zip(users, cls.hash_passwords(raw_passwords)):
+            cls.apply_hash(user, encoded, must_change_password)
+        User.objects.bulk_update(
+            users,
+            ['password', 'password_changed_at', 'must_change_password', 'updated_at'],
+            batch_size=batch_size,
+        )
+        return list(zip(users, raw_passwords))
+
 class EmailService:
-    """Service class for handling email operations."""
+    """
+    Service class for handling email operations.
+
+    Emails are not sent on the request thread. ``queue_email`` writes a row to
+    the EmailOutbox inside the caller's transaction and ``process_outbox``
+    (run by the ``send_queued_emails`` command) delivers due rows over one
+    shared connection per batch, retrying with exponential backoff and moving
+    rows that keep failing to the dead-letter state.
+    """
+    @staticmethod
+    def is_configured():
+        """Return False when the SMTP backend is selected without credentials."""
+        if settings.EMAIL_BACKEND != 'django.core.mail.backends.smtp.EmailBackend':
+            return True
+        if not settings.EMAIL_HOST_USER:
+            logger.error("EMAIL_HOST_USER not set in environment variables")
+            print(":x: EMAIL_HOST_USER not set in environment variables")
+            return False
+        if not settings.EMAIL_HOST_PASSWORD:
+            logger.error("EMAIL_HOST_PASSWORD not set in environment variables")
+            print(":x: EMAIL_HOST_PASSWORD not set in environment variables")
+            return False
+        return True
+
+    @staticmethod
+    def render_user_credentials_email(user, password, created_by=None):
+        """Return (subject, text_content, html_content) for a credentials email."""
+        # Get email configuration - use getattr to avoid AttributeError
+        email_templates = getattr(settings, 'EMAIL_TEMPLATES', {})
+        email_config = email_templates.get('USER_CREATED', {})
+        subject = email_config.get('subject', 'Welcome to ZeroQueue - Your Account Details')
+        # Context for email templates
+        context = {
+            'user': user,
+            'password': password,
+            'created_by': created_by,
+            'site_url': 'http://localhost:5173',  # Vite runs on port 5173
+            'support_email': settings.ADMIN_EMAIL,
+        }
+        # Render HTML and text templates
+        html_content = render_to_string('emails/user_created.html', context)
+        text_content = render_to_string('emails/user_created.txt', context)
+        return subject, text_content, html_content
+
+    @staticmethod
+    def queue_email(to_email, subject, body, html_body='', user=None):
+        """Add an email to the outbox. Returns the EmailOutbox row."""
+        from .models import EmailOutbox
+        return EmailOutbox.objects.create(
+            to_email=to_email,
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            subject=subject,
+            body=body,
+            html_body=html_body,
+            user=user,
+            max_attempts=getattr(settings, 'EMAIL_OUTBOX_MAX_ATTEMPTS', 5),
+        )
+
+    @staticmethod
+    def queue_credentials_emails(users_and_passwords, created_by=None, batch_size=500):
+        """
+        Queue credentials emails for many new users with bulk INSERTs.
+        Users without an email address are skipped. Returns the number queued.
+        """
+        from .models import EmailOutbox
+        if not EmailService.is_configured():
+            return 0
+        max_attempts = getattr(settings, 'EMAIL_OUTBOX_MAX_ATTEMPTS', 5)
+        rows = []
+        for user, password in users_and_passwords:
+            if not user.email:
+                continue
+            subject, text_content, html_content = EmailService.render_user_credentials_email(
+                user, password, created_by
+            )
+            rows.append(EmailOutbox(
+                to_email=user.email,
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                subject=subject,
+                body=text_content,
+                html_body=html_content,
+                user=user,
+                max_attempts=max_attempts,
+            ))
+        EmailOutbox.objects.bulk_create(rows, batch_size=batch_size)
+        return len(rows)
+
     @staticmethod
     def send_user_credentials_email(user, password, created_by=None):
         """
-        Send email with user credentials to newly created user.
+        Queue email with user credentials to newly created user.
         Args:
             user: User instance
             password: Plain text password
             created_by: User who created this account (optional)
         Returns:
-            bool: True if email sent successfully, False otherwise
+            bool: True if email was queued successfully, False otherwise
         """
         try:
-            # Debug: Print email configuration
-            print(f"Email Config Debug:")
-            print(f"EMAIL_HOST_USER: {settings.EMAIL_HOST_USER}")
-            print(f"EMAIL_HOST_PASSWORD: {'*' * len(settings.EMAIL_HOST_PASSWORD) if settings.EMAIL_HOST_PASSWORD else 'NOT SET'}")
-            print(f"DEFAULT_FROM_EMAIL: {settings.DEFAULT_FROM_EMAIL}")
             # Check if email configuration is valid
-            if not settings.EMAIL_HOST_USER:
-                logger.error("EMAIL_HOST_USER not set in environment variables")
-                print(":x: EMAIL_HOST_USER not set in environment variables")
-                return False
-            if not settings.EMAIL_HOST_PASSWORD:
-                logger.error("EMAIL_HOST_PASSWORD not set in environment variables")
-                print(":x: EMAIL_HOST_PASSWORD not set in environment variables")
+            if not EmailService.is_configured():
                 return False
-            # Get email configuration - use getattr to avoid AttributeError
-            email_templates = getattr(settings, 'EMAIL_TEMPLATES', {})
-            email_config = email_templates.get('USER_CREATED', {})
-            subject = email_config.get('subject', 'Welcome to ZeroQueue - Your Account Details')
-            # Context for email templates
-            context = {
-                'user': user,
-                'password': password,
-                'created_by': created_by,
-                'site_url': 'http://localhost:5173',  # Vite runs on port 5173
-                'support_email': settings.ADMIN_EMAIL,
-            }
-            # Render HTML and text templates
-            html_content = render_to_string('emails/user_created.html', context)
-            text_content = render_to_string('emails/user_created.txt', context)
-            
-            # Create email message with HTML alternative
-            email = EmailMultiAlternatives(
-                subject=subject,
-                body=text_content,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                to=[user.email],
+            subject, text_content, html_content = EmailService.render_user_credentials_email(
+                user, password, created_by
             )
-            email.attach_alternative(html_content, "text/html")
-            email.send()
+            # Own savepoint: a failed insert must not doom the caller's
+            # transaction (and with it the user row) after we report False
+            with transaction.atomic():
+                EmailService.queue_email(
+                    to_email=user.email,
+                    subject=subject,
+                    body=text_content,
+                    html_body=html_content,
+                    user=user,
+                )
             
-            logger.info(f"User credentials email sent successfully to {user.email}")
-            print(f":white_check_mark: User credentials email sent successfully to {user.email}")
+            logger.info(f"User credentials email queued for {user.email}")
+            print(f":white_check_mark: User credentials email queued for {user.email}")
             return True
         except Exception as e:
-            logger.error(f"Failed to send user credentials email to {user.email}: {str(e)}")
-            print(f":x: Failed to send user credentials email to {user.email}: {str(e)}")
+            logger.error(f"Failed to queue user credentials email to {user.email}: {str(e)}")
+            print(f":x: Failed to queue user credentials email to {user.email}: {str(e)}")
             return False
 
+    @staticmethod
+    def get_retry_delay(attempts):
+        """Exponential backoff, capped at EMAIL_OUTBOX_MAX_BACKOFF_SECONDS."""
+        base = getattr(settings, 'EMAIL_OUTBOX_BACKOFF_SECONDS', 60)
+        cap = getattr(settings, 'EMAIL_OUTBOX_MAX_BACKOFF_SECONDS', 3600)
+        return timedelta(seconds=min(cap, base * (2 ** max(0, attempts - 1))))
+
+    @staticmethod
+    def claim_batch(batch_size):
+        """
+        Atomically claim up to ``batch_size`` due emails for this worker.
+        Rows stuck in 'sending' longer than EMAIL_OUTBOX_CLAIM_TIMEOUT_SECONDS
+        (e.g. a crashed worker) are claimable again.
+        """
+        from .models import EmailOutbox
+        now = timezone.now()
+        stale_before = now - timedelta(
+            seconds=getattr(settings, 'EMAIL_OUTBOX_CLAIM_TIMEOUT_SECONDS', 600)
+        )
+        claimable = EmailOutbox.objects.filter(
+            Q(status=EmailOutbox.STATUS_PENDING, next_attempt_at__lte=now) |
+            Q(status=EmailOutbox.STATUS_SENDING, claimed_at__lt=stale_before)
+        )
+        candidate_ids = list(
+            claimable.order_by('next_attempt_at').values_list('id', flat=True)[:batch_size]
+        )
+        if not candidate_ids:
+            return []
+        token = uuid.uuid4()
+        # The status/claimed_at filter is re-applied so two workers never
+        # claim the same row.
+        claimable.filter(id__in=candidate_ids).update(
+            status=EmailOutbox.STATUS_SENDING,
+            claim_token=token,
+            claimed_at=now,
+            updated_at=now,
+        )
+        return list(EmailOutbox.objects.filter(claim_token=token).order_by('next_attempt_at'))
+
+    @staticmethod
+    def process_outbox(batch_size=None, connection=None):
+        """
+        Deliver one batch of due emails over a single connection.
+        Returns a dict with sent/retried/dead counts.
+        """
+        from .models import EmailOutbox
+        batch_size = batch_size or getattr(settings, 'EMAIL_OUTBOX_BATCH_SIZE', 50)
+        stats = {'sent': 0, 'retried': 0, 'dead': 0}
+        batch = EmailService.claim_batch(batch_size)
+        if not batch:
+            return stats
+
+        connection = connection or get_connection(fail_silently=False)
+        try:
+            connection.open()
+        except Exception as e:
+            # Relay unreachable: every claimed row goes back for a retry
+            for item in batch:
+                EmailService._record_failure(item, e, stats)
+            return stats
+
+        try:
+            for item in batch:
+                message = EmailMultiAlternatives(
+                    subject=item.subject,
+                    body=item.body,
+                    from_email=item.from_email or settings.DEFAULT_FROM_EMAIL,
+                    to=[item.to_email],
+                    connection=connection,
+                )
+                if item.html_body:
+                    message.attach_alternative(item.html_body, "text/html")
+                try:
+                    message.send()
+                except Exception as e:
+                    EmailService._record_failure(item, e, stats)
+                else:
+                    # Bodies may carry generated credentials; drop them once delivered
+                    now = timezone.now()
+                    EmailOutbox.objects.filter(pk=item.pk).update(
+                        status=EmailOutbox.STATUS_SENT,
+                        attempts=item.attempts + 1,
+                        sent_at=now,
+                        claim_token=None,
+                        body='',
+                        html_body='',
+                        last_error='',
+                        updated_at=now,
+                    )
+                    stats['sent'] += 1
+        finally:
+            connection.close()
+        return stats
+
+    @staticmethod
+    def _record_failure(item, error, stats):
+        """Schedule a retry for a failed email, or dead-letter it."""
+        from .models import EmailOutbox
+        item.attempts += 1
+        item.last_error = str(error)
+        item.claim_token = None
+        if item.attempts >= item.max_attempts:
+            item.status = EmailOutbox.STATUS_DEAD
+            stats['dead'] += 1
+            logger.error(f"Email {item.id} to {item.to_email} moved to dead letters: {error}")
+        else:
+            item.status = EmailOutbox.STATUS_PENDING
+            item.next_attempt_at = timezone.now() + EmailService.get_retry_delay(item.attempts)
+            stats['retried'] += 1
+            logger.warning(f"Email {item.id} to {item.to_email} failed, will retry: {error}")
+        item.save(update_fields=[
+            'attempts', 'last_error', 'claim_token', 'status',
+            'next_attempt_at', 'updated_at'
+        ])
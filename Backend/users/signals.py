@@ -1,4 +1,4 @@
-from django.db.models.signals import post_save, post_migrate
+from django.db.models.signals import post_save, post_delete, post_migrate
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
 from django.apps import apps
@@ -23,6 +23,19 @@ def user_created_handler(sender, instance, created, **kwargs):
             pass
 
 
+@receiver(post_delete, sender=User)
+def user_deleted_handler(sender, instance, **kwargs):
+    """Release the deleted user's slot in the active user counters."""
+    from accounts.models import Account
+    from .models import JobTitle
+    
+    account_id, job_title_id = getattr(instance, '_loaded_counter_state', instance.counter_state())
+    if account_id:
+        Account.adjust_active_user_count(account_id, -1)
+    if job_title_id:
+        JobTitle.adjust_active_user_count(job_title_id, -1)
+
+
 @receiver(post_migrate)
 def create_default_admin_user(sender, **kwargs):
     """Create default admin user after migration."""
@@ -40,7 +53,6 @@ def create_default_admin_user(sender, **kwargs):
             defaults={
                 'description': 'Manages IT infrastructure and systems',
                 'department': 'IT',
-                'boarding_template_title': 'IT Infrastructure Onboarding',
                 'is_active': True
             }
         )
@@ -52,7 +64,6 @@ def create_default_admin_user(sender, **kwargs):
             last_name='Administrator',
             is_staff=True,
             is_superuser=True,
-            employee_id='ADMIN001',
             job_title=admin_job_title,
             department='IT',
             employment_status='active'
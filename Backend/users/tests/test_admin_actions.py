@@ -0,0 +1,37 @@
+"""
+The bulk (de)activate admin actions update users with a queryset UPDATE and
+must still rebuild their effective permissions.
+"""
+
+from unittest import mock
+
+import pytest
+from django.contrib import admin
+from django.test import RequestFactory
+
+from roles_permissions.models import Permission, Role, RolePermission, UserEffectivePermission
+from users.admin import UserAdmin
+from users.models import User
+
+pytestmark = pytest.mark.django_db
+
+
+def test_deactivate_and_activate_refresh_effective_permissions():
+    permission, _ = Permission.objects.get_or_create(
+        codename='view_reports', defaults={'name': 'View Reports', 'category': 'reporting', 'level': 'view'}
+    )
+    role = Role.objects.create(name='report-reader', display_name='Report Reader')
+    RolePermission.objects.create(role=role, permission=permission)
+    user = User.objects.create_user(
+        username='reader', email='reader@example.com', password='reader-pass-123', role=role
+    )
+    assert UserEffectivePermission.users_with('view_reports').filter(pk=user.pk).exists()
+
+    user_admin = UserAdmin(User, admin.site)
+    request = RequestFactory().post('/admin/users/user/')
+    with mock.patch.object(user_admin, 'message_user'):
+        user_admin.deactivate_users(request, User.objects.filter(pk=user.pk))
+        assert not UserEffectivePermission.users_with('view_reports').filter(pk=user.pk).exists()
+
+        user_admin.activate_users(request, User.objects.filter(pk=user.pk))
+        assert UserEffectivePermission.users_with('view_reports').filter(pk=user.pk).exists()
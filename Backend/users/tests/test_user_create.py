@@ -0,0 +1,76 @@
+"""
+Creating a user in an account with no free seats is a 400, whether the
+serializer catches it or a concurrent request fills the account first, and a
+credentials email that fails to queue does not lose the user.
+"""
+
+from unittest import mock
+
+import pytest
+from rest_framework.test import APIClient
+
+from accounts.models import Account
+from users.models import EmailOutbox, User
+from users.services import EmailService
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def client():
+    admin = User.objects.create_superuser(username='seat-admin', email='seat-admin@example.com', password='seat-pass-123')
+    client = APIClient()
+    client.force_authenticate(admin)
+    return client
+
+
+@pytest.fixture
+def full_account():
+    account = Account.objects.create(account_name='Full Co', max_users=1)
+    User.objects.create_user(username='only-seat', email='only-seat@example.com', password='only-pass-123', account=account)
+    account.refresh_from_db()
+    assert account.active_user_count == 1
+    return account
+
+
+def create_user(client, account):
+    # New users join the requester's account; X-Account-Id scopes the superuser to it
+    return client.post('/api/users/', {
+        'username': 'one-too-many', 'email': 'one-too-many@example.com',
+    }, format='json', HTTP_X_ACCOUNT_ID=str(account.pk))
+
+
+def test_full_account_is_rejected(client, full_account):
+    response = create_user(client, full_account)
+
+    assert response.status_code == 400
+    assert 'account' in response.data
+    assert not User.objects.filter(username='one-too-many').exists()
+
+
+def test_seat_taken_after_validation_is_rejected(client, full_account):
+    # As if another request took the last seat between validate() and save()
+    with mock.patch.object(Account, 'can_add_users', new_callable=mock.PropertyMock, return_value=True):
+        response = create_user(client, full_account)
+
+    assert response.status_code == 400
+    assert 'account' in response.data
+    assert not User.objects.filter(username='one-too-many').exists()
+
+
+def test_failed_email_queue_keeps_the_user(client):
+    account = Account.objects.create(account_name='Mail Co')
+
+    def broken_queue_email(**kwargs):
+        # A database-level failure (NOT NULL) inside the outbox insert
+        return EmailOutbox.objects.create(to_email=None, subject='', body='')
+
+    with mock.patch.object(EmailService, 'is_configured', return_value=True), \
+            mock.patch.object(EmailService, 'queue_email', side_effect=broken_queue_email):
+        response = client.post('/api/users/', {
+            'username': 'no-mail', 'email': 'no-mail@example.com',
+        }, format='json', HTTP_X_ACCOUNT_ID=str(account.pk))
+
+    assert response.status_code == 201
+    assert User.objects.filter(username='no-mail').exists()
+    assert not EmailOutbox.objects.exists()
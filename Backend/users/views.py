@@ -4,7 +4,7 @@ from rest_framework.response import Response
 from django.core.validators import validate_email
 from django.core.exceptions import ValidationError
 from rest_framework.permissions import AllowAny
-from django.db.models import Q
+from django.db import transaction
 from django.shortcuts import get_object_or_404
 from django.contrib.auth import authenticate
 from django.utils import timezone
@@ -16,11 +16,17 @@ from .serializers import (
     UserCreateSerializer,
     UserAccountSerializer,
     UserAccountCreateSerializer,
-    PasswordChangeSerializer
+    PasswordChangeSerializer,
+    LoginSerializer
 )
-from .services import EmailService
+from .services import EmailService, PasswordService
+from .imports import IMPORT_FORMATS, detect_format, import_users
+from accounts.models import Account
 from django.views.decorators.csrf import ensure_csrf_cookie
 from django.http import JsonResponse
+from search.backends import get_search_backend
+from roles_permissions.permissions import HasRolePermission
+from accounts.tenancy import TenantScopedMixin
 
 
 class CustomLoginView(LoginView):
@@ -76,35 +82,41 @@ class CustomLoginView(LoginView):
     #     return super().post(request, *args, **kwargs)
 
 
+    serializer_class = LoginSerializer
+
     def post(self, request, *args, **kwargs):
-        username = request.data.get('username')
-        password = request.data.get('password')
-        if username and password:
-            try:
-                validate_email(username)
-                user = User.objects.get(email=username)
-            except ValidationError:
-                user = User.objects.get(username=username)
-            except User.DoesNotExist:
-                user = None
+        # LoginSerializer resolves the user and checks the hash exactly once;
+        # the must_change_password gate then runs on the already-verified user
+        # before dj_rest_auth issues the token/session.
+        self.request = request
+        self.serializer = self.get_serializer(data=self.request.data)
+        self.serializer.is_valid(raise_exception=True)
 
-            if user and user.check_password(password) and user.is_active:
-                if user.must_change_password:
-                    return Response({
-                        "error": "You must change your password before logging in.",
-                        "must_reset_password": True,
-                        "redirect_url": "/set-password"
-                    }, status=status.HTTP_403_FORBIDDEN)
-        return super().post(request, *args, **kwargs)
+        if self.serializer.validated_data['user'].must_change_password:
+            return Response({
+                "error": "You must change your password before logging in.",
+                "must_reset_password": True,
+                "redirect_url": "/set-password"
+            }, status=status.HTTP_403_FORBIDDEN)
+
+        self.login()
+        return self.get_response()
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(TenantScopedMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing users.
     Provides CRUD operations and user management features.
     """
     queryset = User.objects.all()
     serializer_class = UserSerializer
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [HasRolePermission]
+    permission_resource = 'users'
+    required_permissions = {
+        'admin_reset_password': 'edit_users',
+        'deactivate': 'edit_users',
+        'activate': 'edit_users',
+    }
+    cursor_ordering = ('last_name', 'first_name', 'id')
     
     def get_permissions(self):
         """Override permissions for specific actions."""
@@ -123,17 +135,12 @@ class UserViewSet(viewsets.ModelViewSet):
         return UserSerializer
     
     def get_queryset(self):
-        queryset = User.objects.select_related('account', 'role')
+        queryset = self.scope_to_tenant(User.objects.select_related('account', 'role'))
         
         # Filter by search query
         search = self.request.query_params.get('search', None)
         if search:
-            queryset = queryset.filter(
-                Q(username__icontains=search) |
-                Q(first_name__icontains=search) |
-                Q(last_name__icontains=search) |
-                Q(email__icontains=search) 
-            )
+            queryset = get_search_backend().filter(queryset, search)
         
         # Filter by employment status
         employment_status = self.request.query_params.get('employment_status', None)
@@ -162,9 +169,24 @@ class UserViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         
-        user = serializer.save()
-        user.created_by = request.user
-        user.save()
+        # The user row and its queued credentials email commit together;
+        # delivery happens later in the send_queued_emails worker. If queueing
+        # fails, only the email is rolled back and email_queued is False.
+        try:
+            with transaction.atomic():
+                user = serializer.save()
+                user.created_by = request.user
+                user.save()
+                email_queued = False
+                if user.email and hasattr(user, '_generated_password'):
+                    email_queued = EmailService.send_user_credentials_email(
+                        user=user,
+                        password=user._generated_password,
+                        created_by=request.user
+                    )
+        except ValidationError as e:
+            # A concurrent request took the account's last seat after validate()
+            return Response({'account': e.messages}, status=status.HTTP_400_BAD_REQUEST)
         
         # Print password to terminal if generated
         if hasattr(user, '_generated_password'):
@@ -177,28 +199,74 @@ class UserViewSet(viewsets.ModelViewSet):
             print(f"Full Name: {user.get_full_name()}")
             print(f"Generated Password: {user._generated_password}")
             print(f"Generated Password: {password}")
-
-            print(f"Employee ID: {user.employee_id or 'Not set'}")
             print(f"Created by: {request.user.username}")
             print("⚠️  User must change password on first login")
             print("="*60 + "\n")
-            # Send email with credentials
             if user.email:
-                email_sent = EmailService.send_user_credentials_email(
-                    user=user,
-                    password=password,
-                    created_by=request.user
-                )
-                if email_sent:
-                    print(":white_check_mark: Email sent successfully to user's email address")
+                if email_queued:
+                    print(":white_check_mark: Credentials email queued for delivery")
                 else:
-                    print(":x: Failed to send email - check email configuration")
+                    print(":x: Failed to queue email - check email configuration")
             else:
                 print(":warning:  No email address provided - email not sent")
 
         headers = self.get_success_headers(serializer.data)
         return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
     
+    @action(detail=False, methods=['post'], url_path='import',
+            permission_classes=[permissions.IsAdminUser])
+    def import_users(self, request):
+        """
+        Import users from an uploaded CSV or NDJSON file (multipart field ``file``).
+        
+        Optional fields: format (csv/ndjson, otherwise taken from the file
+        name), account (default account id for rows without one) and
+        send_emails (default true). Returns a summary, the created users and
+        the rejected rows with their errors.
+        """
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'error': 'file is required'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        fmt = request.data.get('format') or detect_format(upload.name)
+        if fmt not in IMPORT_FORMATS:
+            return Response(
+                {'error': f"format must be one of: {', '.join(IMPORT_FORMATS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # Rows may only name the requester's account (any account for superusers)
+        accounts = self.tenant.filter(Account.objects.all(), 'pk')
+        account = None
+        account_id = request.data.get('account')
+        if account_id:
+            try:
+                account = accounts.filter(pk=account_id).first()
+            except ValidationError:
+                account = None
+            if account is None:
+                return Response({'error': 'Account not found'}, status=status.HTTP_400_BAD_REQUEST)
+        elif not self.tenant.unrestricted:
+            account = accounts.first()
+            if account is None:
+                return Response(
+                    {'error': 'Your user is not linked to an account'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        
+        send_emails = str(request.data.get('send_emails', 'true')).lower() not in ('0', 'false', 'no')
+        report = import_users(
+            upload, fmt,
+            created_by=request.user,
+            account=account,
+            accounts=accounts,
+            send_emails=send_emails
+        )
+        print(f"📥 User import by {request.user.username}: {report['summary']['created']} created, "
+              f"{report['summary']['failed']} failed")
+        response_status = status.HTTP_201_CREATED if report['summary']['created'] else status.HTTP_200_OK
+        return Response(report, status=response_status)
+    
     @action(detail=True, methods=['get'])
     def account(self, request, pk=None):
         """Get account information for this user."""
@@ -341,22 +409,13 @@ class UserViewSet(viewsets.ModelViewSet):
             }, status=status.HTTP_400_BAD_REQUEST)
 
         try:
-            # Apply new password and flags
-            user.set_password(new_password)
-            user.must_change_password = False
-            user.password_changed_at = timezone.now()
-            user.save()
-
-            # Double-check
-            user.refresh_from_db()
-            if not user.check_password(new_password):
-                raise Exception("Password verification failed after save")
+            # Hash off the request thread and write only the password columns
+            PasswordService.set_password(user, new_password, must_change_password=False)
 
             # Log success
             print(f"\n🔐 PASSWORD RESET by user: {user.username}")
             print(f"Email: {user.email}")
             print(f"Reset at: {timezone.now()}")
-            print(f"New password verification: ✅")
             print(f"Database save: ✅\n")
 
             return Response({
@@ -391,23 +450,15 @@ class UserViewSet(viewsets.ModelViewSet):
             }, status=status.HTTP_400_BAD_REQUEST)
         
         try:
-            # Set new password
-            user.set_password(new_password)
-            user.must_change_password = True  # Force user to change on next login
-            user.save()
-            
-            # Verify the password was set correctly
-            user.refresh_from_db()
-            if not user.check_password(new_password):
-                raise Exception("Password verification failed after save")
+            # Force user to change on next login
+            PasswordService.set_password(user, new_password, must_change_password=True)
             
             # Log password reset
             print(f"\n🔐 ADMIN PASSWORD RESET by {request.user.username}")
             print(f"Target User: {user.username} ({user.get_full_name()})")
             print(f"New Password: {new_password}")
             print(f"Reset at: {timezone.now()}")
-            print(f"Must change on login: ✅")
-            print(f"Database save verification: ✅\n")
+            print(f"Must change on login: ✅\n")
             
             return Response({
                 "message": f"Password reset successfully for {user.get_full_name()}.",
@@ -452,14 +503,24 @@ class UserViewSet(viewsets.ModelViewSet):
     #     return Response(serializer.data)
 
 
-class UserAccountViewSet(viewsets.ModelViewSet):
+class UserAccountViewSet(TenantScopedMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing user-account relationships.
     Handles onboarding and offboarding processes.
     """
     queryset = UserAccount.objects.all()
     serializer_class = UserAccountSerializer
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [HasRolePermission]
+    permission_resource = 'users'
+    required_permissions = {
+        'start_onboarding': 'edit_onboarding',
+        'complete_onboarding': 'complete_onboarding',
+        'pending_onboarding': 'view_onboarding',
+        'start_offboarding': 'edit_offboarding',
+        'complete_offboarding': 'complete_offboarding',
+        'pending_offboarding': 'view_offboarding',
+    }
+    cursor_ordering = ('account__account_name', 'user__last_name', 'id')
     
     def get_serializer_class(self):
         if self.action == 'create':
@@ -467,7 +528,7 @@ class UserAccountViewSet(viewsets.ModelViewSet):
         return UserAccountSerializer
     
     def get_queryset(self):
-        queryset = UserAccount.objects.select_related('user', 'account', 'role')
+        queryset = self.scope_to_tenant(UserAccount.objects.select_related('user', 'account', 'role'))
         
         # Filter by user
         user_id = self.request.query_params.get('user_id', None)
@@ -568,8 +629,9 @@ class UserAccountViewSet(viewsets.ModelViewSet):
             is_active=True
         )
         
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
     
     @action(detail=False, methods=['get'])
     def pending_offboarding(self, request):
@@ -579,8 +641,9 @@ class UserAccountViewSet(viewsets.ModelViewSet):
             offboarding_completed_at__isnull=True
         )
         
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
 
 @ensure_csrf_cookie
 def csrf(request):
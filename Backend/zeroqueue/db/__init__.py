@@ -0,0 +1,8 @@
+"""
+Database backends used by settings.DATABASES.
+
+- zeroqueue.db.sqlite3: Django's SQLite backend plus PRAGMAs applied on
+  connect (WAL, synchronous, busy_timeout) and BEGIN IMMEDIATE transactions.
+- zeroqueue.db.postgresql: Django's PostgreSQL backend drawing connections
+  from a psycopg_pool.ConnectionPool (psycopg 3).
+"""
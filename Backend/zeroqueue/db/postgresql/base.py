@@ -0,0 +1,94 @@
+"""
+PostgreSQL backend that checks connections out of a psycopg_pool.ConnectionPool.
+
+Django 4.2 has no built-in pooling, so every request either opens a new
+connection (CONN_MAX_AGE = 0) or pins one per worker thread. Here "opening"
+a connection borrows one from a per-process pool and "closing" returns it,
+which keeps the number of server connections bounded by the pool size no
+matter how many threads are serving requests. Requires psycopg 3 and
+psycopg-pool.
+
+OPTIONS["pool"] takes min_size, max_size, timeout (seconds to wait for a
+free connection) and max_idle; use CONN_MAX_AGE = 0 with this backend so
+connections go back to the pool at the end of each request.
+"""
+
+import threading
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.postgresql import base
+
+try:
+    from psycopg_pool import ConnectionPool
+except ImportError as e:
+    raise ImproperlyConfigured(
+        "The zeroqueue.db.postgresql backend requires psycopg 3 and psycopg-pool: "
+        "pip install 'psycopg[binary]' psycopg-pool"
+    ) from e
+
+if not base.is_psycopg3:
+    raise ImproperlyConfigured("The zeroqueue.db.postgresql backend requires psycopg 3, not psycopg2.")
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    _pools = {}
+    _pools_lock = threading.Lock()
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        params.pop('pool', None)
+        return params
+
+    @property
+    def pool(self):
+        # Keyed by database name as well: test setup connects to "postgres"
+        # under the same alias
+        key = (self.alias, self.settings_dict['NAME'])
+        pool = self._pools.get(key)
+        if pool is None:
+            with self._pools_lock:
+                pool = self._pools.get(key)
+                if pool is None:
+                    options = self.settings_dict['OPTIONS'].get('pool', {})
+                    pool = ConnectionPool(
+                        kwargs=self.get_connection_params(),
+                        min_size=options.get('min_size', 1),
+                        max_size=options.get('max_size', 10),
+                        timeout=options.get('timeout', 30),
+                        max_idle=options.get('max_idle', 600),
+                        name=f'zeroqueue-{self.alias}',
+                        open=True,
+                    )
+                    self._pools[key] = pool
+        return pool
+
+    def get_new_connection(self, conn_params):
+        options = self.settings_dict['OPTIONS']
+        isolation_level = options.get('isolation_level')
+        if isolation_level is None:
+            self.isolation_level = base.IsolationLevel.READ_COMMITTED
+        else:
+            try:
+                self.isolation_level = base.IsolationLevel(isolation_level)
+            except ValueError:
+                raise ImproperlyConfigured(
+                    f"Invalid transaction isolation level {isolation_level} "
+                    f"specified. Use one of the psycopg.IsolationLevel values."
+                )
+        connection = self.pool.getconn()
+        if isolation_level is not None:
+            connection.isolation_level = self.isolation_level
+        return connection
+
+    def _close(self):
+        if self.connection is not None:
+            # putconn rolls back anything left open before reuse
+            with self.wrap_database_errors:
+                self.pool.putconn(self.connection)
+
+    @classmethod
+    def close_pools(cls):
+        with cls._pools_lock:
+            for pool in cls._pools.values():
+                pool.close()
+            cls._pools.clear()
@@ -0,0 +1,34 @@
+"""
+SQLite backend tuned for concurrent web traffic.
+
+OPTIONS understood on top of Django's sqlite3 backend:
+
+- ``pragmas``: dict of PRAGMA name -> value run on every new connection.
+  WAL lets readers continue while one writer commits, synchronous=NORMAL
+  avoids an fsync per commit (safe in WAL mode), and busy_timeout makes a
+  blocked writer wait instead of failing with "database is locked".
+- ``transaction_mode``: "IMMEDIATE" starts atomic blocks with BEGIN IMMEDIATE,
+  so a transaction takes the write lock up front rather than failing when it
+  tries to upgrade a read lock mid-way.
+"""
+
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        params.pop('pragmas', None)
+        params.pop('transaction_mode', None)
+        return params
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in self.settings_dict['OPTIONS'].get('pragmas', {}).items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        mode = self.settings_dict['OPTIONS'].get('transaction_mode')
+        self.cursor().execute(f'BEGIN {mode}' if mode else 'BEGIN')
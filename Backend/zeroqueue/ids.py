@@ -0,0 +1,48 @@
+"""
+Time-ordered UUIDs (version 7, RFC 9562) for primary keys.
+
+A UUIDv7 starts with the 48-bit Unix time in milliseconds, so keys generated
+later sort later and new rows land at the right-hand edge of the primary key
+B-tree instead of on random pages. Within one millisecond the 12-bit rand_a
+field is used as a counter (seeded randomly each millisecond), which keeps
+keys from one process strictly increasing.
+
+Existing uuid4 keys stay valid: both are 128-bit UUIDs in the same column.
+"""
+
+import os
+import threading
+import time
+import uuid
+
+_lock = threading.Lock()
+_last_ms = 0
+_counter = 0
+
+
+def uuid7():
+    """Return a new time-ordered UUID."""
+    global _last_ms, _counter
+    with _lock:
+        now_ms = time.time_ns() // 1_000_000
+        if now_ms > _last_ms:
+            _last_ms = now_ms
+            # Start low in the counter space so a burst rarely overflows it
+            _counter = int.from_bytes(os.urandom(2), 'big') & 0x3FF
+        else:
+            _counter += 1
+            if _counter > 0xFFF:
+                # Counter exhausted (or the clock went back): borrow the next millisecond
+                _last_ms += 1
+                _counter = 0
+        timestamp_ms, counter = _last_ms, _counter
+
+    rand_b = int.from_bytes(os.urandom(8), 'big') & 0x3FFF_FFFF_FFFF_FFFF
+    value = (
+        (timestamp_ms & 0xFFFF_FFFF_FFFF) << 80
+        | 0x7 << 76
+        | counter << 64
+        | 0b10 << 62
+        | rand_b
+    )
+    return uuid.UUID(int=value)
@@ -0,0 +1,168 @@
+"""
+Keyset (cursor) pagination for the API.
+
+Every page is fetched with ``WHERE (ordering) > (last row) ORDER BY ordering
+LIMIT page_size + 1``, so the cost of a page does not grow with how deep into
+the table the client is. DRF's CursorPagination only keys on the first
+ordering field and falls back to OFFSET for ties; here the cursor carries the
+values of every ordering field and the primary key is always appended as a
+unique tiebreaker, which matters because our UUID primary keys are random.
+
+Views choose the ordering with a ``cursor_ordering`` attribute, or a
+``get_cursor_ordering()`` method when it depends on the action. Ordering
+fields must be non-nullable columns (related paths like ``user__last_name``
+are fine); the rows are read back with plain attribute access, so keep those
+relations in ``select_related``.
+"""
+
+import base64
+import datetime
+import json
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetCursorPagination(BasePagination):
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    invalid_cursor_message = 'Invalid cursor'
+    ordering = ('-pk',)
+
+    def get_page_size(self, request):
+        default = min(settings.REST_FRAMEWORK.get('PAGE_SIZE') or 50, settings.API_MAX_PAGE_SIZE)
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return default
+        if page_size <= 0:
+            return default
+        return min(page_size, settings.API_MAX_PAGE_SIZE)
+
+    def get_ordering(self, view):
+        """Return [(field, descending), ...] ending with the primary key."""
+        if hasattr(view, 'get_cursor_ordering'):
+            ordering = view.get_cursor_ordering()
+        else:
+            ordering = getattr(view, 'cursor_ordering', self.ordering)
+
+        parsed = [(field.lstrip('-'), field.startswith('-')) for field in ordering]
+        if parsed[-1][0] not in ('pk', 'id'):
+            parsed.append(('pk', parsed[-1][1]))
+        return parsed
+
+    def get_model_field(self, model, path):
+        """The model field an ordering path such as ``user__last_name`` ends on."""
+        field = None
+        for name in path.split('__'):
+            field = model._meta.pk if name == 'pk' else model._meta.get_field(name)
+            model = field.related_model
+        return field
+
+    def decode_cursor(self, request, model):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None, False
+
+        try:
+            data = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            values, reverse = data['v'], bool(data['r'])
+            if not isinstance(values, list) or len(values) != len(self.ordering_fields):
+                raise ValueError('cursor does not match the ordering')
+            # Typed values, so a tampered cursor fails here and not in the query
+            values = [
+                self.get_model_field(model, field).to_python(value)
+                for (field, _), value in zip(self.ordering_fields, values)
+            ]
+        except (TypeError, ValueError, KeyError, UnicodeEncodeError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return values, reverse
+
+    def encode_cursor(self, values, reverse):
+        data = json.dumps({'v': values, 'r': reverse}, separators=(',', ':'))
+        encoded = base64.urlsafe_b64encode(data.encode('ascii')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def keyset_filter(self, values, reverse):
+        """
+        Build (a > x) OR (a = x AND b > y) OR ... for the ordering fields,
+        flipping the comparison for descending fields and backwards paging.
+        """
+        condition = Q()
+        equal = Q()
+        for (field, descending), value in zip(self.ordering_fields, values):
+            lookup = 'lt' if descending != reverse else 'gt'
+            condition |= equal & Q(**{f'{field}__{lookup}': value})
+            equal &= Q(**{field: value})
+        return condition
+
+    def row_values(self, row):
+        values = []
+        for field, _ in self.ordering_fields:
+            value = row
+            for attr in field.split('__'):
+                value = getattr(value, attr)
+            if isinstance(value, (datetime.date, datetime.datetime, datetime.time)):
+                value = value.isoformat()
+            elif isinstance(value, uuid.UUID):
+                value = str(value)
+            values.append(value)
+        return values
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.ordering_fields = self.get_ordering(view)
+
+        values, reverse = self.decode_cursor(request, queryset.model)
+        if values is not None:
+            queryset = queryset.filter(self.keyset_filter(values, reverse))
+
+        order_by = [
+            f"{'-' if descending != reverse else ''}{field}"
+            for field, descending in self.ordering_fields
+        ]
+        rows = list(queryset.order_by(*order_by)[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+
+        has_next = has_more if not reverse else True
+        has_previous = values is not None if not reverse else has_more
+
+        self.next_link = None
+        self.previous_link = None
+        if rows and has_next:
+            self.next_link = self.encode_cursor(self.row_values(rows[-1]), False)
+        if rows and has_previous:
+            self.previous_link = self.encode_cursor(self.row_values(rows[0]), True)
+        elif has_previous:
+            # Paged backwards past the first row; restart from the top
+            self.previous_link = remove_query_param(self.base_url, self.cursor_query_param)
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.next_link),
+            ('previous', self.previous_link),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
@@ -13,6 +13,7 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 from pathlib import Path
 import os
 from dotenv import load_dotenv
+from django.core.exceptions import ImproperlyConfigured
 import os 
 load_dotenv()
 
@@ -60,6 +61,7 @@ LOCAL_APPS = [
     'roles_permissions',
     'boarding',
     'agent', 
+    'search',
 ]
 SITE_ID = 1  # Required for django-allauth
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
@@ -72,6 +74,7 @@ MIDDLEWARE = [
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'allauth.account.middleware.AccountMiddleware',  # Required for allauth
+    'accounts.tenancy.TenantMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -98,19 +101,86 @@ WSGI_APPLICATION = 'zeroqueue.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-        'OPTIONS': {
-            'timeout': 30,  # Increase timeout for slow operations
+# DB_ENGINE selects "sqlite" (default) or "postgresql"; see zeroqueue/db/ and
+# the Database section of the README.
+DB_ENGINE = os.getenv('DB_ENGINE', 'sqlite').lower()
+
+if DB_ENGINE in ('postgres', 'postgresql'):
+    DB_POOL = os.getenv('DB_POOL', 'True').lower() == 'true'
+    DATABASES = {
+        'default': {
+            'ENGINE': 'zeroqueue.db.postgresql' if DB_POOL else 'django.db.backends.postgresql',
+            'NAME': os.getenv('DB_NAME', 'zeroqueue'),
+            'USER': os.getenv('DB_USER', 'zeroqueue'),
+            'PASSWORD': os.getenv('DB_PASSWORD', ''),
+            'HOST': os.getenv('DB_HOST', 'localhost'),
+            'PORT': os.getenv('DB_PORT', '5432'),
+            # Pooled connections go back to the pool after each request;
+            # without the pool, keep one persistent connection per thread
+            'CONN_MAX_AGE': 0 if DB_POOL else int(os.getenv('DB_CONN_MAX_AGE', '60')),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'pool': {
+                    'min_size': int(os.getenv('DB_POOL_MIN_SIZE', '2')),
+                    'max_size': int(os.getenv('DB_POOL_MAX_SIZE', '20')),
+                    'timeout': float(os.getenv('DB_POOL_TIMEOUT', '10')),
+                },
+            } if DB_POOL else {},
         }
     }
-}
-
-# Database connection settings
-DATABASE_CONNECTION_POOLING = False  # Disable for development
-CONN_MAX_AGE = 0  # Close connections immediately to avoid locks
+elif DB_ENGINE == 'sqlite':
+    DB_SQLITE_TUNED = os.getenv('DB_SQLITE_TUNED', 'True').lower() == 'true'
+    DATABASES = {
+        'default': {
+            'ENGINE': 'zeroqueue.db.sqlite3',
+            'NAME': os.getenv('DB_NAME', str(BASE_DIR / 'db.sqlite3')),
+            'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', '60')),
+            'OPTIONS': {
+                'timeout': 30,  # Seconds to wait for the write lock
+                'pragmas': {
+                    'journal_mode': 'WAL',
+                    'synchronous': 'NORMAL',
+                    'busy_timeout': int(os.getenv('DB_SQLITE_BUSY_TIMEOUT_MS', '30000')),
+                } if DB_SQLITE_TUNED else {},
+                'transaction_mode': 'IMMEDIATE' if DB_SQLITE_TUNED else None,
+            },
+        }
+    }
+else:
+    raise ImproperlyConfigured(f"Unsupported DB_ENGINE '{DB_ENGINE}' (use sqlite or postgresql)")
+
+# Cache
+# Dashboard analytics, the permission table, template details and search
+# suggestions are invalidated through version stamps kept in this cache, so
+# every worker process must share it. CACHE_BACKEND is "db" (default; the
+# table is created by migrate, and each cache read is a SQL query), "redis"
+# (REDIS_URL; recommended for production) or "locmem", which is private to
+# one process and only fits a single-process dev server.
+CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'db').lower()
+
+if CACHE_BACKEND == 'db':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'zeroqueue_cache',
+            'OPTIONS': {'MAX_ENTRIES': int(os.getenv('CACHE_MAX_ENTRIES', '20000'))},
+        }
+    }
+elif CACHE_BACKEND == 'redis':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL', 'redis://127.0.0.1:6379/1'),
+        }
+    }
+elif CACHE_BACKEND == 'locmem':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+else:
+    raise ImproperlyConfigured(f"Unsupported CACHE_BACKEND '{CACHE_BACKEND}' (use db, redis or locmem)")
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -130,6 +200,10 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Password hashing runs in a bounded process pool (see users.services.PasswordService).
+# Set to 0 to hash inline on the calling thread.
+PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', str(min(4, os.cpu_count() or 1))))
+
 # Internationalization
 # https://docs.djangoproject.com/en/4.2/topics/i18n/
 
@@ -229,8 +303,33 @@ REST_FRAMEWORK = {
         'rest_framework.renderers.JSONRenderer',
         'rest_framework.renderers.BrowsableAPIRenderer',
     ],
+    # Keyset pagination; clients follow the next/previous links
+    'DEFAULT_PAGINATION_CLASS': 'zeroqueue.pagination.KeysetCursorPagination',
+    'PAGE_SIZE': int(os.getenv('API_PAGE_SIZE', '50')),
 }
 
+# Upper bound for the ?page_size= query parameter
+API_MAX_PAGE_SIZE = int(os.getenv('API_MAX_PAGE_SIZE', '500'))
+
+# Search backend (dotted path); empty picks FTS5 on SQLite, tsvector/trigram on Postgres
+SEARCH_BACKEND = os.getenv('SEARCH_BACKEND', '')
+
+# Enforce role permission codenames on the API (roles_permissions.permissions.HasRolePermission)
+RBAC_ENFORCE = os.getenv('RBAC_ENFORCE', 'False').lower() == 'true'
+
+# Limit API querysets to the requester's account (accounts.tenancy)
+TENANT_SCOPING = os.getenv('TENANT_SCOPING', 'True').lower() == 'true'
+
+# Journey template detail cache (boarding.template_cache): templates held per
+# process and for how many seconds, and seconds payloads stay in the shared
+# Django cache
+TEMPLATE_CACHE_LRU_SIZE = int(os.getenv('TEMPLATE_CACHE_LRU_SIZE', '256'))
+TEMPLATE_CACHE_LOCAL_TTL = int(os.getenv('TEMPLATE_CACHE_LOCAL_TTL', '60'))
+TEMPLATE_CACHE_TIMEOUT = int(os.getenv('TEMPLATE_CACHE_TIMEOUT', '3600'))
+
+# Largest cohort accepted by /api/boarding/instances/bulk/
+BULK_ENROLLMENT_MAX_USERS = int(os.getenv('BULK_ENROLLMENT_MAX_USERS', '5000'))
+
 # dj-rest-auth settings (simplified)
 REST_USE_JWT = False  # Use tokens instead of JWT for simplicity
 REST_AUTH_SERIALIZERS = {
@@ -264,6 +363,12 @@ EMAIL_TEMPLATES = {
         'text_template': 'emails/password_reset.txt',
     },
 }
+# Email outbox (users.models.EmailOutbox), delivered by `manage.py send_queued_emails`
+EMAIL_OUTBOX_BATCH_SIZE = int(os.getenv('EMAIL_OUTBOX_BATCH_SIZE', '50'))
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv('EMAIL_OUTBOX_MAX_ATTEMPTS', '5'))
+EMAIL_OUTBOX_BACKOFF_SECONDS = int(os.getenv('EMAIL_OUTBOX_BACKOFF_SECONDS', '60'))
+EMAIL_OUTBOX_MAX_BACKOFF_SECONDS = int(os.getenv('EMAIL_OUTBOX_MAX_BACKOFF_SECONDS', '3600'))
+EMAIL_OUTBOX_CLAIM_TIMEOUT_SECONDS = int(os.getenv('EMAIL_OUTBOX_CLAIM_TIMEOUT_SECONDS', '600'))
 # Print email configuration for debugging (remove in production)
 print(f"Email Configuration:")
 print(f"EMAIL_BACKEND: {EMAIL_BACKEND}")
@@ -27,5 +27,6 @@ urlpatterns = [
     path('api/users/', include('users.urls')),
     path('api/roles/', include('roles_permissions.urls')),
     path('api/boarding/', include('boarding.urls')),
+    path('api/search/', include('search.urls')),
     path('accounts/', include('allauth.urls')),
 ]
\ No newline at end of file
@@ -1,5 +1,5 @@
 /* filepath: /Users/happyfox/Documents/GitHub/zeroq/frontend/src/components/searchModal/SearchModal.jsx */
-import { useState } from 'react';
+import { useEffect, useState } from 'react';
 import {
   Modal,
   Box,
@@ -23,14 +23,58 @@ import {
   IconArrowDown,
   IconCornerDownLeft,
   IconHome,
+  IconUser,
+  IconBriefcase,
+  IconTemplate,
 } from '@tabler/icons-react';
 import { useNavigate } from 'react-router-dom';
+import ApiService from '../../utils/api';
 import styles from './SearchModal.module.css';
 
+const suggestionIcons = {
+  user: IconUser,
+  journey: IconRoad,
+  template: IconTemplate,
+  job_title: IconBriefcase,
+};
+
 export function SearchModal({ opened, onClose }) {
   const [searchValue, setSearchValue] = useState('');
+  const [suggestions, setSuggestions] = useState([]);
   const navigate = useNavigate();
 
+  // Fetch typeahead suggestions once the user pauses typing
+  useEffect(() => {
+    const query = searchValue.trim();
+    if (!query) {
+      setSuggestions([]);
+      return undefined;
+    }
+    let cancelled = false;
+    const timer = setTimeout(async () => {
+      try {
+        const data = await ApiService.getSearchSuggestions(query);
+        if (!cancelled) setSuggestions(data.results || []);
+      } catch (error) {
+        if (!cancelled) setSuggestions([]);
+      }
+    }, 150);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [searchValue]);
+
+  const openSuggestion = (suggestion) => {
+    if (suggestion.type === 'template') {
+      const form = suggestion.journey_type === 'offboarding' ? 'offboarding-form' : 'onboarding-form';
+      navigate(`/${form}/update/${suggestion.id}`);
+    } else {
+      navigate('/dashboard/employee-journeys');
+    }
+    if (onClose) onClose();
+  };
+
   const homeItem = { label: 'Home', icon: IconHome };
   const hrItems = [
     { label: 'Employee Journeys', icon: IconRoad },
@@ -49,7 +93,7 @@ export function SearchModal({ opened, onClose }) {
   );
 
   // Adjust modal height based on results
-  const resultCount = filteredHome.length + filteredHrItems.length;
+  const resultCount = filteredHome.length + filteredHrItems.length + suggestions.length;
   const modalHeight = resultCount === 0
     ? 220
     : Math.min(120 + resultCount * 56, 600); // 56px per item, min 120px, max 600px
@@ -138,8 +182,36 @@ export function SearchModal({ opened, onClose }) {
                 </Stack>
               </Box>
             )}
+            {/* Typeahead section */}
+            {suggestions.length > 0 && (
+              <Box>
+                <Text size="sm" fw={600} c="dimmed" className={styles.sectionTitle}>
+                  Results
+                </Text>
+                <Stack gap={2}>
+                  {suggestions.map((suggestion) => {
+                    const Icon = suggestionIcons[suggestion.type] || IconSearch;
+                    return (
+                      <UnstyledButton
+                        key={`${suggestion.type}-${suggestion.id}`}
+                        className={styles.searchResultItem}
+                        onClick={() => openSuggestion(suggestion)}
+                      >
+                        <Group gap="sm">
+                          <Icon size={16} />
+                          <Text size="sm">{suggestion.label}</Text>
+                          {suggestion.sublabel && (
+                            <Text size="xs" c="dimmed">{suggestion.sublabel}</Text>
+                          )}
+                        </Group>
+                      </UnstyledButton>
+                    );
+                  })}
+                </Stack>
+              </Box>
+            )}
             {/* No results */}
-            {filteredHome.length === 0 && filteredHrItems.length === 0 && (
+            {resultCount === 0 && (
               <Box p="md">
                 <Text size="sm" c="dimmed" ta="center">
                   No results found.
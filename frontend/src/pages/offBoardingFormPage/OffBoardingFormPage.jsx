@@ -79,7 +79,7 @@ const OffBoardingFormPage = () => {
       try {
         const accountData = await ApiService.getAccounts();
         console.log('Fetched account data:', accountData);
-        setAccount(accountData);
+        setAccount(accountData.results || accountData);
       } catch (error) {
         console.error('Failed to fetch account data:', error);
         setError('Failed to load account data');
@@ -96,23 +96,20 @@ const OffBoardingFormPage = () => {
 
   const fetchUsers = async () => {
     try {
-      const res = await fetch('http://localhost:8000/api/users/', {
+      // Follow the pagination `next` links so every user is listed
+      const users = await ApiService.fetchAllPages('http://localhost:8000/api/users/?page_size=500', {
         headers: {
           'Authorization': `Token ${localStorage.getItem('authToken')}`,
           'Content-Type': 'application/json',
         },
         credentials: 'include',
       });
-      if (res.ok) {
-        const data = await res.json();
-        const users = Array.isArray(data) ? data : data.results || [];
-        setUserOptions(
-          users.map(user => ({
-            value: user.username,
-            label: user.username,
-          }))
-        );
-      }
+      setUserOptions(
+        users.map(user => ({
+          value: user.username,
+          label: user.username,
+        }))
+      );
     } catch (err) {
       // fallback: do nothing, keep default options
     }
@@ -70,7 +70,7 @@ const UpdateOffBoardingFormPage = () => {
     const fetchInitialData = async () => {
       try {
         const accountData = await ApiService.getAccounts();
-        setAccount(accountData);
+        setAccount(accountData.results || accountData);
         await fetchUsers();
         if (templateId) {
           await fetchTemplateData();
@@ -138,23 +138,20 @@ const UpdateOffBoardingFormPage = () => {
 
   const fetchUsers = async () => {
     try {
-      const res = await fetch('http://localhost:8000/api/users/', {
+      // Follow the pagination `next` links so every user is listed
+      const users = await ApiService.fetchAllPages('http://localhost:8000/api/users/?page_size=500', {
         headers: {
           'Authorization': `Token ${localStorage.getItem('authToken')}`,
           'Content-Type': 'application/json',
         },
         credentials: 'include',
       });
-      if (res.ok) {
-        const data = await res.json();
-        const users = Array.isArray(data) ? data : data.results || [];
-        setUserOptions(
-          users.map(user => ({
-            value: user.username,
-            label: user.username,
-          }))
-        );
-      }
+      setUserOptions(
+        users.map(user => ({
+          value: user.username,
+          label: user.username,
+        }))
+      );
     } catch (err) {
       // fallback: do nothing, keep default options
     }
@@ -95,24 +95,20 @@ const OnBoardingFormPage = () => {
 
   const fetchUsers = async () => {
     try {
-      const res = await fetch('http://localhost:8000/api/users/', {
+      // Follow the pagination `next` links so every user is listed
+      const users = await ApiService.fetchAllPages('http://localhost:8000/api/users/?page_size=500', {
         headers: {
           'Authorization': `Token ${localStorage.getItem('authToken')}`,
           'Content-Type': 'application/json',
         },
         credentials: 'include',
       });
-      if (res.ok) {
-        const data = await res.json();
-        // If paginated, use data.results, else use data directly
-        const users = Array.isArray(data) ? data : data.results || [];
-        setUserOptions(
-          users.map(user => ({
-            value: user.username,
-            label: user.username,
-          }))
-        );
-      }
+      setUserOptions(
+        users.map(user => ({
+          value: user.username,
+          label: user.username,
+        }))
+      );
     } catch (err) {
       // fallback: do nothing, keep default options
     }
@@ -72,7 +72,7 @@ const UpdateFormPage = () => {
       try {
         const accountData = await ApiService.getAccounts();
         console.log('Fetched account data:', accountData);
-        setAccount(accountData);
+        setAccount(accountData.results || accountData);
         
         if (templateId) {
           await fetchTemplateData();
@@ -148,23 +148,20 @@ const UpdateFormPage = () => {
 
   const fetchUsers = async () => {
     try {
-      const res = await fetch('http://localhost:8000/api/users/', {
+      // Follow the pagination `next` links so every user is listed
+      const users = await ApiService.fetchAllPages('http://localhost:8000/api/users/?page_size=500', {
         headers: {
           'Authorization': `Token ${localStorage.getItem('authToken')}`,
           'Content-Type': 'application/json',
         },
         credentials: 'include',
       });
-      if (res.ok) {
-        const data = await res.json();
-        const users = Array.isArray(data) ? data : data.results || [];
-        setUserOptions(
-          users.map(user => ({
-            value: user.username,
-            label: user.username,
-          }))
-        );
-      }
+      setUserOptions(
+        users.map(user => ({
+          value: user.username,
+          label: user.username,
+        }))
+      );
     } catch (err) {
       // fallback: do nothing, keep default options
     }
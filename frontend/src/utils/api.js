@@ -52,10 +52,43 @@ static async getCSRFToken() {
     return headers;
   }
 
+  // List endpoints use keyset pagination ({next, previous, results}); these
+  // follow `next` until the last page and return every row as one array.
+  static async requestAll(endpoint, options = {}) {
+    let page = await this.request(endpoint, options);
+    if (!page || Array.isArray(page) || !Array.isArray(page.results)) {
+      return page;
+    }
+    const rows = [...page.results];
+    while (page.next) {
+      page = await this.request(page.next, options);
+      rows.push(...page.results);
+    }
+    return rows;
+  }
+
+  static async fetchAllPages(url, init = {}) {
+    const rows = [];
+    let next = url;
+    while (next) {
+      const res = await fetch(next, init);
+      if (!res.ok) {
+        throw new Error(`HTTP error! status: ${res.status}`);
+      }
+      const data = await res.json();
+      if (Array.isArray(data)) {
+        return data;
+      }
+      rows.push(...(data.results || []));
+      next = data.next;
+    }
+    return rows;
+  }
+
   // Journey Templates
   static async getJourneyTemplates(params = {}) {
-    const queryParams = new URLSearchParams(params).toString();
-    return this.request(`/boarding/templates/?${queryParams}`);
+    const queryParams = new URLSearchParams({ page_size: 500, ...params }).toString();
+    return this.requestAll(`/boarding/templates/?${queryParams}`);
   }
 
   static async createJourneyTemplate(data) {
@@ -106,7 +139,8 @@ static async getCSRFToken() {
   }
 
   static async request(endpoint, options = {}) {
-    const url = `${API_BASE_URL}${endpoint}`;
+    // Pagination `next` links arrive as absolute URLs
+    const url = endpoint.startsWith('http') ? endpoint : `${API_BASE_URL}${endpoint}`;
     
     const headers = await this.getAuthHeaders();
     
@@ -154,7 +188,7 @@ static async getCSRFToken() {
 
   // Accounts
   static async getAccounts() {
-    return this.request('/accounts/');
+    return this.requestAll('/accounts/?page_size=500');
   }
 
   // Departments and Business Units
@@ -170,6 +204,12 @@ static async getCSRFToken() {
     return this.request('/users/userdata/');
   }
 
+  // Search
+  static async getSearchSuggestions(query, limit = 8) {
+    const queryParams = new URLSearchParams({ q: query, limit }).toString();
+    return this.request(`/search/suggest/?${queryParams}`);
+  }
+
   // Authentication
   static async login(credentials) {
     return this.request('/auth/login/', {